@@ -0,0 +1,114 @@
+"""
+Benchmarks save_scraped_data_to_db against the previous per-page implementation
+(SELECT ... LIKE on every page followed by one INSERT per row) on a local SQLite stand-in.
+
+Usage:
+    python benchmarks/dedup_insert_benchmark.py [--existing 10000 100000 1000000] [--pages 50] [--rows-per-page 20]
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "legislation.act.gov.au"))
+from core.database import NAVIGATION_PATH_DEPTH, save_scraped_data_to_db  # noqa: E402
+
+
+TABLE = "l1_scan_benchmark"
+PARENT_URL_ID = "benchmark-parent"
+NAVIGATION_PATH_PARTS = ["Home", "Benchmark Journey", "Letter-A"]
+
+
+def create_table(engine, existing_rows):
+    """Creates the stand-in destination table and fills it with `existing_rows` rows under the journey's prefix."""
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        connection.execute(text(f"""
+            CREATE TABLE {TABLE} (
+                id TEXT PRIMARY KEY, parent_url_id TEXT, book_name TEXT, book_year_number TEXT,
+                book_url TEXT UNIQUE, navigation_path TEXT, date_collected TIMESTAMP, is_active INTEGER
+            )
+        """))
+        path = "/".join(NAVIGATION_PATH_PARTS) + "/Page/0"
+        batch_size = 50000
+        for start in range(0, existing_rows, batch_size):
+            connection.execute(
+                text(f"INSERT INTO {TABLE} (id, parent_url_id, book_name, book_url, navigation_path, date_collected, is_active) "
+                     "VALUES (:id, :parent_url_id, :book_name, :book_url, :navigation_path, :date_collected, 1)"),
+                [{"id": str(uuid.uuid4()), "parent_url_id": PARENT_URL_ID, "book_name": f"Existing {n}",
+                  "book_url": f"https://example.org/existing/{n}", "navigation_path": path, "date_collected": datetime.now()}
+                 for n in range(start, min(start + batch_size, existing_rows))]
+            )
+
+
+def legacy_save(engine, scraped_data, page_num):
+    """The previous implementation: re-reads existing URLs for every page and inserts rows one at a time."""
+    human_readable_path = "/".join(NAVIGATION_PATH_PARTS) + f"/Page/{page_num}"
+    with engine.connect() as connection:
+        with connection.begin():
+            path_prefix = "/".join(NAVIGATION_PATH_PARTS[:NAVIGATION_PATH_DEPTH]) + "%"
+            existing_urls_query = text(f"SELECT book_url FROM {TABLE} WHERE parent_url_id = :parent_url_id AND navigation_path LIKE :path_prefix")
+            existing_urls = {row[0] for row in connection.execute(existing_urls_query, {"parent_url_id": PARENT_URL_ID, "path_prefix": path_prefix}).fetchall()}
+            records_to_insert = [item for item in scraped_data if item.get('link') not in existing_urls]
+            query = text(f"""
+                INSERT INTO {TABLE} (id, parent_url_id, book_name, book_url, navigation_path, date_collected, is_active)
+                VALUES (:id, :parent_url_id, :book_name, :book_url, :navigation_path, :date_collected, :is_active)
+            """)
+            for item in records_to_insert:
+                connection.execute(query, {
+                    "id": str(uuid.uuid4()), "parent_url_id": PARENT_URL_ID, "book_name": item.get('title'),
+                    "book_url": item.get('link'), "navigation_path": human_readable_path,
+                    "date_collected": datetime.now(), "is_active": 1,
+                })
+            return len(records_to_insert)
+
+
+def make_pages(pages, rows_per_page, run_name):
+    """Builds scraped pages where every page repeats one already-saved URL, like overlapping result lists do."""
+    result = []
+    for page in range(pages):
+        rows = [{"title": f"{run_name} {page}-{n}", "link": f"https://example.org/{run_name}/{page}/{n}"} for n in range(rows_per_page)]
+        rows.append({"title": "Existing 0", "link": "https://example.org/existing/0"})
+        result.append(rows)
+    return result
+
+
+def run(engine, save_page, pages):
+    started = time.perf_counter()
+    inserted = sum(save_page(scraped_data, page_num) for page_num, scraped_data in enumerate(pages, start=1))
+    return inserted, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--existing", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--rows-per-page", type=int, default=20)
+    parser.add_argument("--db", default="sqlite:///l1_dedup_benchmark.db")
+    args = parser.parse_args()
+
+    engine = create_engine(args.db)
+    print(f"{'existing rows':>14} | {'implementation':<14} | {'inserted':>8} | {'seconds':>8} | {'rows/s':>9}")
+    for existing_rows in args.existing:
+        create_table(engine, existing_rows)
+        legacy_pages = make_pages(args.pages, args.rows_per_page, f"legacy-{existing_rows}")
+        new_pages = make_pages(args.pages, args.rows_per_page, f"new-{existing_rows}")
+        dedup_cache = {}
+        candidates = [
+            ("legacy", lambda data, page: legacy_save(engine, data, page), legacy_pages),
+            ("dedup cache", lambda data, page: save_scraped_data_to_db(engine, data, PARENT_URL_ID, NAVIGATION_PATH_PARTS, page, TABLE, dedup_cache), new_pages),
+        ]
+        for name, save_page, pages in candidates:
+            inserted, seconds = run(engine, save_page, pages)
+            print(f"{existing_rows:>14,} | {name:<14} | {inserted:>8} | {seconds:>8.2f} | {inserted / seconds:>9,.0f}")
+
+    engine.dispose()
+    if args.db.startswith("sqlite:///"):
+        os.remove(args.db[len("sqlite:///"):])
+
+
+if __name__ == "__main__":
+    main()
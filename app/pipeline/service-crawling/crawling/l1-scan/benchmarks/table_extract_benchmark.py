@@ -0,0 +1,99 @@
+"""
+Benchmarks bulk table extraction (one execute_script call per page) against the per-element
+scraping loop (one find_element per cell) on saved result-table HTML fixtures.
+
+Requires a local Chrome/chromedriver. Fixtures mimic the legislation.nsw.gov.au results table
+and are written to a temporary directory.
+
+Usage:
+    python benchmarks/table_extract_benchmark.py [--rows 100 500 1000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from urllib.parse import urljoin
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "legislation.act.gov.au"))
+from core.table_extract import extract_rows  # noqa: E402
+
+
+CONTAINER_XPATH = "//table[@id='results']/tbody"
+ROW_XPATH = "./tr"
+COLUMNS = [
+    {"name": "title", "xpath": ".//td[1]/a", "type": "text"},
+    {"name": "link", "xpath": ".//td[1]/a", "type": "href"},
+    {"name": "number", "xpath": ".//td[2]", "type": "text"},
+    {"name": "year", "xpath": ".//td[3]", "type": "text"},
+]
+
+
+def write_fixture(directory, row_count):
+    """Writes a results page with `row_count` rows; every tenth row has no year cell."""
+    rows = []
+    for n in range(row_count):
+        year_cell = "" if n % 10 == 9 else f"<td>{1900 + n % 120}</td>"
+        rows.append(f"<tr><td><a href='/view/html/inforce/current/act-{n}'>Example Act {n}</a></td><td>No {n}</td>{year_cell}</tr>")
+    path = os.path.join(directory, f"results_{row_count}.html")
+    with open(path, "w") as f:
+        f.write(f"<html><body><table id='results'><tbody>{''.join(rows)}</tbody></table></body></html>")
+    return path
+
+
+def per_element_extract(driver, rows, base_url):
+    """The per-cell scraping loop used before bulk extraction."""
+    scraped_data = []
+    for row in rows:
+        row_data = {}
+        for column_config in COLUMNS:
+            col_name, col_xpath, col_type = column_config['name'], column_config['xpath'], column_config.get('type', 'text')
+            try:
+                element = row.find_element(By.XPATH, col_xpath)
+                if col_type == 'text':
+                    row_data[col_name] = element.text
+                elif col_type == 'href':
+                    row_data[col_name] = urljoin(base_url, element.get_attribute('href'))
+            except NoSuchElementException:
+                row_data[col_name] = None
+        scraped_data.append(row_data)
+    return scraped_data
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 500, 1000])
+    args = parser.parse_args()
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    driver = webdriver.Chrome(options=options)
+
+    print(f"{'rows':>6} | {'per-element (s)':>15} | {'bulk (s)':>9} | {'speed-up':>8} | identical")
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for row_count in args.rows:
+                driver.get("file://" + write_fixture(directory, row_count))
+                base_url = driver.current_url
+                rows = driver.find_element(By.XPATH, CONTAINER_XPATH).find_elements(By.XPATH, ROW_XPATH)
+
+                slow, slow_seconds = timed(lambda: per_element_extract(driver, rows, base_url))
+                fast, fast_seconds = timed(lambda: extract_rows(driver, rows, COLUMNS, base_url))
+                print(f"{row_count:>6} | {slow_seconds:>15.2f} | {fast_seconds:>9.3f} | {slow_seconds / fast_seconds:>7.0f}x | {slow == fast}")
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
-import time
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException, StaleElementReferenceException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 from core.scraping import perform_click, scrape_configured_data
+from core.waits import settle_after_step, wait_for_in_viewport
+from core.worker_pool import in_letter_shard
 
 
 def process_alphabet_loop(driver, step, db_engine, parent_url_id, navigation_path_parts, job_state, destination_table, journey_state=None):
@@ -36,6 +37,8 @@ def process_alphabet_loop(driver, step, db_engine, parent_url_id, navigation_pat
         print(f"  - Resuming alphabet loop from index {start_index}.")
 
     for i in range(start_index, num_links):
+        if not in_letter_shard(i, job_state):
+            continue
         try:
             current_alphabet_links = WebDriverWait(driver, 20).until(
                 EC.presence_of_all_elements_located((By.XPATH, target_xpath))
@@ -50,9 +53,9 @@ def process_alphabet_loop(driver, step, db_engine, parent_url_id, navigation_pat
             print(f"\n--- Processing alphabet link {i+1}/{num_links} (Letter: '{letter_text}') ---")
             
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", link_to_click)
-            time.sleep(0.5)
+            wait_for_in_viewport(driver, link_to_click)
             link_to_click.click()
-            time.sleep(1)
+            settle_after_step(driver, step)
 
             letter_path_parts = navigation_path_parts + [f"Letter-{letter_text}"]
             
@@ -79,7 +82,7 @@ def process_step(driver, step, db_engine, parent_url_id, navigation_path_parts,
 
     if action == 'click':
         perform_click(driver, step.get('target'))
-        time.sleep(2) 
+        settle_after_step(driver, step)
         return True
     
     elif action == 'alphabet_loop':
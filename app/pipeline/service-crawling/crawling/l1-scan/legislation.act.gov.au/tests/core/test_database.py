@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+
+from core.database import filter_new_records, insert_rows, save_scraped_data_to_db
+
+TABLE = "l1_scan_test"
+PARENT_URL_ID = "parent-1"
+NAVIGATION_PATH_PARTS = ["Home", "In force", "Letter-A"]
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text(f"""
+            CREATE TABLE {TABLE} (
+                id TEXT PRIMARY KEY, parent_url_id TEXT, book_name TEXT, book_year_number TEXT,
+                book_url TEXT, navigation_path TEXT, date_collected TIMESTAMP, is_active INTEGER
+            )
+        """))
+    return engine
+
+
+def saved_names(engine):
+    with engine.connect() as connection:
+        return sorted(row[0] for row in connection.execute(text(f"SELECT book_name FROM {TABLE}")))
+
+
+def test_filter_drops_saved_and_repeated_links():
+    scraped = [{'title': 'A', 'link': 'https://a'}, {'title': 'B', 'link': 'https://b'}, {'title': 'B again', 'link': 'https://b'}]
+
+    assert filter_new_records(scraped, {'https://a'}) == [{'title': 'B', 'link': 'https://b'}]
+
+def test_filter_keeps_every_record_without_a_link():
+    scraped = [{'title': 'A', 'link': None}, {'title': 'B', 'link': ''}, {'title': 'C', 'link': None}]
+
+    assert filter_new_records(scraped, {None, ''}) == scraped
+
+def test_records_without_links_are_not_deduplicated_across_pages(engine):
+    dedup_cache = {}
+    first_page = [{'title': 'A', 'link': 'https://a'}, {'title': 'No link 1', 'link': None}]
+    second_page = [{'title': 'A', 'link': 'https://a'}, {'title': 'No link 2', 'link': None}]
+
+    assert save_scraped_data_to_db(engine, first_page, PARENT_URL_ID, NAVIGATION_PATH_PARTS, 1, TABLE, dedup_cache) == 2
+    assert save_scraped_data_to_db(engine, second_page, PARENT_URL_ID, NAVIGATION_PATH_PARTS, 2, TABLE, dedup_cache) == 1
+
+    assert saved_names(engine) == ['A', 'No link 1', 'No link 2']
+    assert None not in next(iter(dedup_cache.values()))
+
+def test_insert_rows_fails_on_bad_rows_instead_of_skipping_them(engine):
+    """
+    A rejected row fails the statement (and with it the page's transaction) rather than being dropped silently.
+    """
+    row = {'id': 'row-1', 'parent_url_id': PARENT_URL_ID, 'book_name': 'A', 'book_url': 'https://a'}
+
+    with engine.begin() as connection:
+        assert insert_rows(connection, TABLE, [row]) == 1
+    with pytest.raises(IntegrityError):
+        with engine.begin() as connection:
+            insert_rows(connection, TABLE, [{**row, 'book_name': 'B'}])
+
+    assert saved_names(engine) == ['A']
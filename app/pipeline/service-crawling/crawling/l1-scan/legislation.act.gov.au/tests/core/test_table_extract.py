@@ -0,0 +1,42 @@
+from unittest.mock import MagicMock
+
+from selenium.common.exceptions import WebDriverException
+
+from core.table_extract import extract_rows
+
+BASE_URL = "https://legislation.act.gov.au/results?letter=A"
+COLUMNS = [
+    {'name': 'title', 'xpath': './td[1]', 'type': 'text'},
+    {'name': 'link', 'xpath': './td[1]/a', 'type': 'href'},
+]
+
+
+def driver_returning(rows):
+    driver = MagicMock()
+    driver.execute_script.return_value = rows
+    return driver
+
+
+def test_relative_links_are_joined_to_the_page_url():
+    driver = driver_returning([{'title': 'Act A', 'link': '/a/1'}])
+
+    assert extract_rows(driver, [object()], COLUMNS, BASE_URL) == [
+        {'title': 'Act A', 'link': 'https://legislation.act.gov.au/a/1'}
+    ]
+
+def test_row_without_anchor_keeps_no_link():
+    driver = driver_returning([{'title': 'Act A', 'link': 'https://legislation.act.gov.au/a/1'}, {'title': 'Repealed', 'link': None}])
+
+    rows = extract_rows(driver, [object(), object()], COLUMNS, BASE_URL)
+
+    assert rows[1] == {'title': 'Repealed', 'link': None}
+    assert rows[0]['link'] == 'https://legislation.act.gov.au/a/1'
+
+def test_script_failure_falls_back_to_per_element_scraping():
+    driver = MagicMock()
+    driver.execute_script.side_effect = WebDriverException("stale element")
+
+    assert extract_rows(driver, [object()], COLUMNS, BASE_URL) is None
+
+def test_row_count_mismatch_falls_back_to_per_element_scraping():
+    assert extract_rows(driver_returning([{'title': 'Act A', 'link': None}]), [object(), object()], COLUMNS, BASE_URL) is None
@@ -6,6 +6,7 @@ from datetime import datetime
 
 
 NAVIGATION_PATH_DEPTH = int(os.getenv("NAVIGATION_PATH_DEPTH", 3)) # Duplicate checking
+INSERT_BATCH_SIZE = int(os.getenv("INSERT_BATCH_SIZE", 500)) # Rows per multi-row INSERT statement
 
 def get_parent_url_details(engine, parent_url_id):
     """Connects to the database and fetches the base_url for the given ID."""
@@ -21,7 +22,63 @@ def get_parent_url_details(engine, parent_url_id):
         print(f"  - FATAL ERROR: Could not query database: {e}")
         return None
 
-def save_scraped_data_to_db(engine, scraped_data, parent_url_id, navigation_path_parts, page_num, destination_table):
+def load_existing_urls(connection, destination_table, parent_url_id, path_prefix, dedup_cache=None):
+    """
+    Returns the set of book_urls already saved under a navigation path prefix.
+    With a `dedup_cache` (a dict kept for the lifetime of a journey) the table is only scanned
+    once per prefix; callers keep the returned set up to date as they insert rows.
+    """
+    if dedup_cache is not None and path_prefix in dedup_cache:
+        return dedup_cache[path_prefix]
+
+    existing_urls_query = text(f"SELECT book_url FROM {destination_table} WHERE parent_url_id = :parent_url_id AND navigation_path LIKE :path_prefix")
+    existing_urls_result = connection.execute(existing_urls_query, {"parent_url_id": parent_url_id, "path_prefix": path_prefix}).fetchall()
+    existing_urls = {row[0] for row in existing_urls_result if row[0]}
+    print(f"  - Loaded {len(existing_urls)} existing URLs for path prefix '{path_prefix}'.")
+
+    if dedup_cache is not None:
+        dedup_cache[path_prefix] = existing_urls
+    return existing_urls
+
+def insert_rows(connection, destination_table, rows, batch_size=INSERT_BATCH_SIZE):
+    """
+    Inserts a list of row dicts (all with the same keys) using multi-row INSERT statements of
+    `batch_size` rows. Duplicates are filtered out beforehand by filter_new_records.
+    Returns the number of rows inserted.
+    """
+    if not rows: return 0
+    columns = list(rows[0].keys())
+    inserted = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        values_clauses, params = [], {}
+        for n, row in enumerate(batch):
+            values_clauses.append("(" + ", ".join(f":{column}_{n}" for column in columns) + ")")
+            params.update({f"{column}_{n}": row[column] for column in columns})
+        query = text(f"INSERT INTO {destination_table} ({', '.join(columns)}) VALUES {', '.join(values_clauses)}")
+        result = connection.execute(query, params)
+        inserted += result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(batch)
+    return inserted
+
+def filter_new_records(scraped_data, existing_urls):
+    """
+    Drops records whose link is already saved, or repeated earlier on the same page.
+    Records without a link are always kept: there is no URL to tell them apart by.
+    """
+    seen_on_page = set()
+    records_to_insert = []
+    for item in scraped_data:
+        link = item.get('link')
+        if not link:
+            records_to_insert.append(item)
+            continue
+        if link in existing_urls or link in seen_on_page:
+            continue
+        seen_on_page.add(link)
+        records_to_insert.append(item)
+    return records_to_insert
+
+def save_scraped_data_to_db(engine, scraped_data, parent_url_id, navigation_path_parts, page_num, destination_table, dedup_cache=None):
     """Saves a list of scraped links to the specified destination table."""
     if not scraped_data: return 0
     
@@ -36,24 +93,15 @@ def save_scraped_data_to_db(engine, scraped_data, parent_url_id, navigation_path
                 path_prefix_parts = navigation_path_parts[:NAVIGATION_PATH_DEPTH]
                 path_prefix = "/".join(path_prefix_parts) + "%"
                 
-                existing_urls_query_str = f"SELECT book_url FROM {destination_table} WHERE parent_url_id = :parent_url_id AND navigation_path LIKE :path_prefix"
-                existing_urls_query = text(existing_urls_query_str)
-                
-                existing_urls_result = connection.execute(existing_urls_query, {"parent_url_id": parent_url_id, "path_prefix": path_prefix}).fetchall()
-                existing_urls = {row[0] for row in existing_urls_result}
-                records_to_insert = [item for item in scraped_data if item.get('link') not in existing_urls]
+                existing_urls = load_existing_urls(connection, destination_table, parent_url_id, path_prefix, dedup_cache)
+                records_to_insert = filter_new_records(scraped_data, existing_urls)
                 
                 if not records_to_insert:
                     print(f"  - All {len(scraped_data)} scraped records for this page already exist. Nothing to insert.")
                     return 0
                 print(f"  - Found {len(records_to_insert)} new records to insert.")
 
-                insert_query_str = f"""
-                    INSERT INTO {destination_table} (id, parent_url_id, book_name, book_url, navigation_path, date_collected, is_active, book_version, book_act_no, book_effective_date, book_registered_date)
-                    VALUES (:id, :parent_url_id, :book_name, :book_url, :navigation_path, :date_collected, :is_active, :book_version, :book_act_no, :book_effective_date, :book_registered_date)
-                """
-                query = text(insert_query_str)
-
+                rows = []
                 for item in records_to_insert:
                     # Get the registered date as simple text
                     book_registered_date_val = (item.get('registered_date') or '').strip() or None
@@ -74,9 +122,14 @@ def save_scraped_data_to_db(engine, scraped_data, parent_url_id, navigation_path
                         "book_effective_date": book_effective_date_val,
                         "book_registered_date": book_registered_date_val
                     }
-                    connection.execute(query, params)
-                print(f"  - Successfully saved {len(records_to_insert)} new records to '{destination_table}'.")
-                return len(records_to_insert)
+                    rows.append(params)
+
+                inserted = insert_rows(connection, destination_table, rows)
+
+            # Only remember the URLs once the transaction has committed.
+            existing_urls.update(item.get('link') for item in records_to_insert if item.get('link'))
+            print(f"  - Successfully saved {inserted} new records to '{destination_table}'.")
+            return inserted
     except Exception as e:
         print(f"  - FATAL ERROR: Failed during database save operation: {e}")
         return 0
\ No newline at end of file
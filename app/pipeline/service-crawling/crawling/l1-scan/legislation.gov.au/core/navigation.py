@@ -1,10 +1,11 @@
-import time
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException, StaleElementReferenceException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 from core.scraping import perform_click, scrape_configured_data
+from core.worker_pool import in_letter_shard
+from core.waits import settle_after_step, wait_for_in_viewport
 
 
 def click_next_button_if_enabled(driver):
@@ -34,7 +35,7 @@ def click_next_button_if_enabled(driver):
         # If not disabled, proceed with the click.
         print("  - 'Next' button is enabled. Proceeding to click.")
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button_element)
-        time.sleep(0.5)
+        wait_for_in_viewport(driver, button_element)
         driver.execute_script("arguments[0].click();", button_element)
         print("  - Click successful.")
         return True # This will continue the pagination loop.
@@ -67,12 +68,12 @@ def process_next_button_pagination_loop(driver, step, db_engine, parent_url_id,
             # If it exists, click it.
             print("  - 'Next' button is enabled. Proceeding to click.")
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
-            time.sleep(0.5)
+            wait_for_in_viewport(driver, next_button)
             driver.execute_script("arguments[0].click();", next_button)
 
             print("  - Successfully navigated to next page.")
             page_counter += 1
-            time.sleep(2) # Wait for next page to load
+            settle_after_step(driver, step) # Wait for next page to load
         except TimeoutException:
             # If the enabled button is not found after waiting, we are on the last page.
             print("  - Enabled 'Next' button not found. Pagination complete.")
@@ -106,6 +107,8 @@ def process_alphabet_loop(driver, step, db_engine, parent_url_id, navigation_pat
         return False
 
     for i in range(num_links):
+        if not in_letter_shard(i, job_state):
+            continue
         print(f"\n--- Processing alphabet link {i+1}/{num_links} ---")
         try:
             current_alphabet_links = WebDriverWait(driver, 20).until(
@@ -6,6 +6,8 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException,
 from urllib.parse import urljoin
 
 from core.database import save_scraped_data_to_db
+from core.table_extract import extract_rows
+from core.waits import wait_for_in_viewport
 
 
 def scrape_configured_data(driver, container_xpath, scraping_config, db_engine, parent_url_id, navigation_path_parts, page_num, job_state, destination_table):
@@ -30,24 +32,26 @@ def scrape_configured_data(driver, container_xpath, scraping_config, db_engine,
         if not rows: 
             return True
 
-        scraped_data = []
         base_url = driver.current_url 
-        for row in rows:
-            row_data = {}
-            for column_config in scraping_config['columns']:
-                col_name, col_xpath, col_type = column_config['name'], column_config['xpath'], column_config.get('type', 'text')
-                try:
-                    element = row.find_element(By.XPATH, col_xpath)
-                    if col_type == 'text':
-                        row_data[col_name] = element.text
-                    elif col_type == 'href':
-                        row_data[col_name] = urljoin(base_url, element.get_attribute('href'))
-                except NoSuchElementException:
-                    row_data[col_name] = None
-            scraped_data.append(row_data)
+        scraped_data = extract_rows(driver, rows, scraping_config['columns'], base_url)
+        if scraped_data is None:
+            scraped_data = []
+            for row in rows:
+                row_data = {}
+                for column_config in scraping_config['columns']:
+                    col_name, col_xpath, col_type = column_config['name'], column_config['xpath'], column_config.get('type', 'text')
+                    try:
+                        element = row.find_element(By.XPATH, col_xpath)
+                        if col_type == 'text':
+                            row_data[col_name] = element.text
+                        elif col_type == 'href':
+                            row_data[col_name] = urljoin(base_url, element.get_attribute('href'))
+                    except NoSuchElementException:
+                        row_data[col_name] = None
+                scraped_data.append(row_data)
         
         if scraped_data:
-            new_records = save_scraped_data_to_db(db_engine, scraped_data, parent_url_id, navigation_path_parts, page_num, destination_table)
+            new_records = save_scraped_data_to_db(db_engine, scraped_data, parent_url_id, navigation_path_parts, page_num, destination_table, job_state.setdefault('dedup_cache', {}))
             job_state['records_saved'] += new_records
         return True
     except TimeoutException:
@@ -78,7 +82,7 @@ def perform_click(driver, target, is_pagination=False):
             
             # Scroll the element into the middle of the view for good measure.
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-            time.sleep(0.5)
+            wait_for_in_viewport(driver, element)
             
             element_text = element.text.strip()
             print(f"  - Force-clicking element with XPath: {target['value']} (Text: '{element_text}') using JavaScript.")
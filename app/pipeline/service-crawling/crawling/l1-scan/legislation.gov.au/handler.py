@@ -1,6 +1,7 @@
 import json
 import os
 import time
+from functools import partial
 
 # Import the database engine creator from your utils file
 from utils.aws_utils import create_db_engine
@@ -9,12 +10,14 @@ from core.config_loader import load_config
 from core.audit_log import create_audit_log_entry, update_audit_log_entry
 from core.database import get_parent_url_details
 from core.config_loader import load_config
-from core.driver import initialize_driver
 from core.navigation import process_step
+from core.waits import begin_wait_report
+from core.worker_pool import CRAWLER_WORKERS, DriverPool, plan_journey_tasks, run_tasks_in_pool, summarize_results, task_label
 
 # --- Configuration ---
 # The sitemap file name is now passed dynamically
 MAX_RETRIES = 3 # Maximum number of times to retry a failed journey
+MAX_JOURNEY_RETRIES = 3
 NAVIGATION_PATH_DEPTH = int(os.getenv("NAVIGATION_PATH_DEPTH", 3))
     
 # --- Lambda Handler ---
@@ -54,68 +57,78 @@ def run_crawler(parent_url_id, sitemap_file_name, destination_table):
     audit_log_id = create_audit_log_entry(db_engine, job_name)
     if not audit_log_id: return
 
-    job_state = {'records_saved': 0}
+    tasks = plan_journey_tasks(config['crawler_config']['journeys'])
+    print(f"\nRunning {len(tasks)} journey task(s) on {CRAWLER_WORKERS} pooled browser worker(s).")
+
+    records_saved = 0
     final_status = 'success'
-    
-    # --- KEY CHANGE: Added journey retry loop ---
-    MAX_JOURNEY_RETRIES = 3
+    pool = DriverPool(CRAWLER_WORKERS)
 
     try:
-        for i, journey in enumerate(config['crawler_config']['journeys']):
-            journey_succeeded = False
-            for attempt in range(MAX_JOURNEY_RETRIES):
-                driver = None
-                try:
-                    if attempt > 0:
-                        print(f"\n--- RETRYING Journey '{journey['journey_id']}' (Attempt {attempt + 1}/{MAX_JOURNEY_RETRIES}) ---")
-                        time.sleep(5) # Wait before retrying
-
-                    driver = initialize_driver()
-                    
-                    navigation_path_parts = ["Home"]
-                    if journey.get('description'):
-                        navigation_path_parts.append(journey['description'])
-
-                    print(f"\n=================================================")
-                    print(f"Starting Journey: {journey['description']} ({journey['journey_id']})")
-                    print(f"=================================================")
-                    
-                    driver.get(base_url)
-                    
-                    for step in journey['steps']:
-                        if not process_step(driver, step, db_engine, parent_url_id, navigation_path_parts, job_state, destination_table):
-                            # This will raise an exception to be caught below, triggering a retry
-                            raise Exception(f"Step failed in Journey '{journey['journey_id']}'")
-                    
-                    # If all steps complete without error, mark as success and break the retry loop
-                    journey_succeeded = True
-                    print(f"\n✅ Journey '{journey['journey_id']}' completed successfully.")
-                    break
-
-                except Exception as e:
-                    print(f"\n!!! An exception occurred during Journey '{journey['journey_id']}' on attempt {attempt + 1}: {e}")
-                
-                finally:
-                    if driver:
-                        print(f"Closing WebDriver for attempt {attempt + 1}.")
-                        driver.quit()
-            
-            if not journey_succeeded:
-                print(f"\n❌ Journey '{journey['journey_id']}' failed after {MAX_JOURNEY_RETRIES} attempts.")
-                final_status = 'failed'
+        journey_fn = partial(run_journey, pool, base_url, db_engine, parent_url_id, destination_table)
+        results = run_tasks_in_pool(tasks, journey_fn, CRAWLER_WORKERS)
+        records_saved, errors = summarize_results(results)
+        if errors:
+            final_status = 'failed'
 
     except Exception as e:
         print(f"  - An uncaught exception terminated the crawler run: {e}")
         final_status = 'failed'
     
     finally:
-        message = f"Job finished. Processed {job_state['records_saved']} new records."
+        pool.close()
+        message = f"Job finished. Processed {records_saved} new records."
         if final_status == 'failed':
-            message = f"Job finished with failures. Processed {job_state['records_saved']} new records."
+            message = f"Job finished with failures. Processed {records_saved} new records."
         update_audit_log_entry(db_engine, audit_log_id, final_status, message)
         print("\nAll journeys finished.")
 
 
+def run_journey(pool, base_url, db_engine, parent_url_id, destination_table, i, journey, letter_shard):
+    """
+    Runs a single journey (or one letter shard of it) on a pooled driver, retrying failed attempts.
+    Returns a dict with 'succeeded', 'records_saved' and 'error'.
+    """
+    label = task_label(journey, letter_shard)
+    wait_report = begin_wait_report(label)
+    job_state = {'records_saved': 0, 'letter_shard': letter_shard}
+
+    for attempt in range(MAX_JOURNEY_RETRIES):
+        try:
+            if attempt > 0:
+                print(f"\n--- RETRYING Journey '{label}' (Attempt {attempt + 1}/{MAX_JOURNEY_RETRIES}) ---")
+                time.sleep(5) # Wait before retrying
+
+            with pool.driver() as driver:
+                navigation_path_parts = ["Home"]
+                if journey.get('description'):
+                    navigation_path_parts.append(journey['description'])
+
+                print(f"\n=================================================")
+                print(f"Starting Journey: {journey['description']} ({label})")
+                print(f"=================================================")
+                
+                driver.get(base_url)
+                
+                for step in journey['steps']:
+                    if not process_step(driver, step, db_engine, parent_url_id, navigation_path_parts, job_state, destination_table):
+                        # This will raise an exception to be caught below, triggering a retry
+                        raise Exception(f"Step failed in Journey '{label}'")
+            
+            # If all steps complete without error, mark as success and stop retrying
+            print(f"\n✅ Journey '{label}' completed successfully.")
+            print(f"\n{wait_report.summary()}")
+            return {'succeeded': True, 'records_saved': job_state['records_saved'], 'error': None}
+
+        except Exception as e:
+            print(f"\n!!! An exception occurred during Journey '{label}' on attempt {attempt + 1}: {e}")
+
+    print(f"\n❌ Journey '{label}' failed after {MAX_JOURNEY_RETRIES} attempts.")
+    error = f"Journey '{label}' failed after {MAX_JOURNEY_RETRIES} attempts."
+    print(f"\n{wait_report.summary()}")
+    return {'succeeded': False, 'records_saved': job_state['records_saved'], 'error': error}
+
+
 if __name__ == "__main__":
     parent_url_id_for_testing = "493df9a1-e971-451e-8bf0-de5092019ef1" 
     sitemap_for_testing = "sitemap_legislation_gov_au.json"
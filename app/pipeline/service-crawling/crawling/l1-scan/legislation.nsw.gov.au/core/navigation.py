@@ -1,8 +1,9 @@
-import time
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from selenium.webdriver.common.by import By
 
 from core.scraping import perform_click, scrape_configured_data
+from core.worker_pool import in_letter_shard
+from core.waits import settle_after_step
 
 
 def process_next_button_pagination_loop(driver, step, db_engine, parent_url_id, navigation_path_parts, job_state, destination_table):
@@ -26,7 +27,7 @@ def process_next_button_pagination_loop(driver, step, db_engine, parent_url_id,
             break
         
         page_counter += 1
-        time.sleep(2)
+        settle_after_step(driver, step)
     return True
 
 
@@ -47,6 +48,8 @@ def process_alphabet_loop(driver, step, db_engine, parent_url_id, navigation_pat
         return False
 
     for i, url in enumerate(alphabet_urls):
+        if not in_letter_shard(i, job_state):
+            continue
         print(f"\n--- Processing alphabet link {i+1}/{len(alphabet_urls)}: {url} ---")
         try:
             driver.get(url)
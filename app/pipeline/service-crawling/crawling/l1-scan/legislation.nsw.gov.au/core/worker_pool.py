@@ -0,0 +1,172 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from selenium.common.exceptions import WebDriverException
+
+from core.driver import initialize_driver
+
+
+CRAWLER_WORKERS = int(os.getenv("CRAWLER_WORKERS", 4)) # Number of browsers (and journeys) running at once
+LOOP_SHARDS = int(os.getenv("LOOP_SHARDS", CRAWLER_WORKERS)) # Letter shards per alphabet/url loop journey
+SHARDABLE_LOOP_ACTIONS = ('alphabet_loop', 'url_loop')
+
+
+class DriverPool:
+    """
+    A bounded pool of reusable WebDriver sessions.
+    Drivers are created lazily (never more than `size`), handed out to one worker at a time
+    and reset between journeys instead of being quit, so Chrome only starts once per worker.
+    """
+
+    def __init__(self, size=CRAWLER_WORKERS):
+        self.size = max(1, size)
+        self._idle = []
+        self._created = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Returns an idle driver, starting a new one if the pool is below its size, otherwise waits."""
+        with self._condition:
+            while not self._idle and self._created >= self.size:
+                self._condition.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+
+        try:
+            return initialize_driver()
+        except Exception:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, driver, discard=False):
+        """Returns a driver to the pool after resetting its session, or quits it if it is unusable."""
+        if not discard and reset_driver_session(driver):
+            with self._condition:
+                self._idle.append(driver)
+                self._condition.notify()
+            return
+
+        print("  - Discarding pooled WebDriver; a fresh one will be started on demand.")
+        quit_driver(driver)
+        with self._condition:
+            self._created -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def driver(self):
+        """Context manager that checks a driver out of the pool and always gives it back."""
+        driver = self.acquire()
+        discard = False
+        try:
+            yield driver
+        except WebDriverException:
+            discard = True
+            raise
+        finally:
+            self.release(driver, discard=discard)
+
+    def close(self):
+        """Quits every idle driver. Call once all workers have finished."""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        print(f"\nClosing {len(idle)} pooled WebDriver(s).")
+        for driver in idle:
+            quit_driver(driver)
+
+
+def reset_driver_session(driver):
+    """Clears cookies, storage and extra tabs so the next journey starts from a clean session."""
+    try:
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        try:
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except WebDriverException:
+            pass # Storage is not accessible on some pages (e.g. about:blank)
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+        return True
+    except WebDriverException as e:
+        print(f"  - WARNING: Could not reset WebDriver session: {e}")
+        return False
+
+
+def quit_driver(driver):
+    """Quits a driver, ignoring errors from browsers that have already crashed."""
+    try:
+        driver.quit()
+    except Exception as e:
+        print(f"  - WARNING: Error while quitting WebDriver: {e}")
+
+
+def plan_journey_tasks(journeys, loop_shards=LOOP_SHARDS):
+    """
+    Expands the sitemap journeys into independent tasks.
+    A journey whose last step is an alphabet/url loop is split into `loop_shards` tasks,
+    each of which replays the journey but only visits every n-th letter of the loop.
+    Returns a list of (journey_index, journey, letter_shard) tuples.
+    """
+    tasks = []
+    for i, journey in enumerate(journeys):
+        steps = journey.get('steps', [])
+        if loop_shards > 1 and steps and steps[-1].get('action') in SHARDABLE_LOOP_ACTIONS:
+            tasks.extend((i, journey, (shard, loop_shards)) for shard in range(loop_shards))
+        else:
+            tasks.append((i, journey, None))
+    return tasks
+
+
+def task_label(journey, letter_shard):
+    """Human readable name of a journey task, used in log lines."""
+    label = journey.get('journey_id', journey.get('description', 'journey'))
+    if letter_shard:
+        label += f" [shard {letter_shard[0] + 1}/{letter_shard[1]}]"
+    return label
+
+
+def in_letter_shard(index, job_state):
+    """Returns True if the loop item at `index` belongs to the letter shard of the current task."""
+    letter_shard = job_state.get('letter_shard')
+    if not letter_shard:
+        return True
+    shard_index, shard_count = letter_shard
+    return index % shard_count == shard_index
+
+
+def run_tasks_in_pool(tasks, task_fn, workers=CRAWLER_WORKERS):
+    """
+    Runs `task_fn(*task)` for every task on a thread pool of `workers` threads and
+    returns the results in completion order. Exceptions are returned, not raised.
+    """
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="crawler") as executor:
+        futures = {executor.submit(task_fn, *task): task for task in tasks}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"  - A crawler task raised an unhandled exception: {e}")
+                results.append(e)
+    return results
+
+
+def summarize_results(results):
+    """Aggregates task results into (records_saved, error_messages)."""
+    records_saved = 0
+    errors = []
+    for result in results:
+        if isinstance(result, Exception):
+            errors.append(str(result))
+            continue
+        records_saved += result['records_saved']
+        if not result['succeeded']:
+            errors.append(result['error'])
+    return records_saved, errors
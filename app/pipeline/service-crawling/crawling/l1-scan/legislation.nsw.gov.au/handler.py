@@ -1,5 +1,6 @@
 import json
 import os
+from functools import partial
 
 # Import the database engine creator from your utils file
 from utils.aws_utils import create_db_engine
@@ -8,8 +9,9 @@ from core.config_loader import load_config
 from core.audit_log import create_audit_log_entry, update_audit_log_entry
 from core.database import get_parent_url_details
 from core.config_loader import load_config
-from core.driver import initialize_driver
 from core.navigation import process_step
+from core.waits import begin_wait_report
+from core.worker_pool import CRAWLER_WORKERS, DriverPool, plan_journey_tasks, run_tasks_in_pool, summarize_results, task_label
 
 # --- Configuration ---
 # The sitemap file name is now passed dynamically
@@ -51,47 +53,21 @@ def run_crawler(parent_url_id, sitemap_file_name, destination_table):
     audit_log_id = create_audit_log_entry(db_engine, job_name)
     if not audit_log_id: return
 
-    job_state = {'records_saved': 0}
+    tasks = plan_journey_tasks(config['crawler_config']['journeys'])
+    print(f"\nRunning {len(tasks)} journey task(s) on {CRAWLER_WORKERS} pooled browser worker(s).")
+
+    records_saved = 0
     final_status = 'success'
     final_error_message = None
+    pool = DriverPool(CRAWLER_WORKERS)
     
     try:
-        for i, journey in enumerate(config['crawler_config']['journeys']):
-            driver = None
-            try:
-                driver = initialize_driver()
-                
-                navigation_path_parts = ["Home"]
-                if journey.get('description'):
-                    navigation_path_parts.append(journey['description'])
-
-                print(f"\n=================================================")
-                print(f"Starting Journey: {journey['description']} ({journey['journey_id']})")
-                print(f"=================================================")
-                
-                driver.get(base_url)
-                
-                journey_succeeded = True
-                for step in journey['steps']:
-                    if not process_step(driver, step, db_engine, parent_url_id, navigation_path_parts, job_state, destination_table):
-                        print(f"\n!!! Step failed in Journey '{journey['journey_id']}'. Halting this journey. !!!")
-                        journey_succeeded = False
-                        final_status = 'failed'
-                        final_error_message = f"Journey '{journey['journey_id']}' failed."
-                        break
-                
-                if journey_succeeded:
-                    print(f"\n✅ Journey '{journey['journey_id']}' completed successfully.")
-
-            except Exception as e:
-                print(f"\n!!! An unexpected exception occurred during Journey '{journey['journey_id']}': {e}")
-                final_status = 'failed'
-                final_error_message = str(e)
-            
-            finally:
-                if driver:
-                    print(f"Closing WebDriver for Journey '{journey['journey_id']}'.")
-                    driver.quit()
+        journey_fn = partial(run_journey, pool, base_url, db_engine, parent_url_id, destination_table)
+        results = run_tasks_in_pool(tasks, journey_fn, CRAWLER_WORKERS)
+        records_saved, errors = summarize_results(results)
+        if errors:
+            final_status = 'failed'
+            final_error_message = errors[-1]
 
     except Exception as e:
         print(f"  - An uncaught exception terminated the crawler run: {e}")
@@ -99,12 +75,54 @@ def run_crawler(parent_url_id, sitemap_file_name, destination_table):
         final_error_message = str(e)
     
     finally:
-        message = f"Successfully processed {job_state['records_saved']} new records."
+        pool.close()
+        message = f"Successfully processed {records_saved} new records."
         if final_status == 'failed':
-            message = f"Job failed. Processed {job_state['records_saved']} new records. Last error: {final_error_message}"
+            message = f"Job failed. Processed {records_saved} new records. Last error: {final_error_message}"
         update_audit_log_entry(db_engine, audit_log_id, final_status, message)
         print("\nAll journeys finished.")
 
+def run_journey(pool, base_url, db_engine, parent_url_id, destination_table, i, journey, letter_shard):
+    """
+    Runs a single journey (or one letter shard of it) on a pooled driver.
+    Returns a dict with 'succeeded', 'records_saved' and 'error'.
+    """
+    label = task_label(journey, letter_shard)
+    wait_report = begin_wait_report(label)
+    job_state = {'records_saved': 0, 'letter_shard': letter_shard}
+    result = {'succeeded': True, 'records_saved': 0, 'error': None}
+
+    try:
+        with pool.driver() as driver:
+            navigation_path_parts = ["Home"]
+            if journey.get('description'):
+                navigation_path_parts.append(journey['description'])
+
+            print(f"\n=================================================")
+            print(f"Starting Journey: {journey['description']} ({label})")
+            print(f"=================================================")
+            
+            driver.get(base_url)
+            
+            for step in journey['steps']:
+                if not process_step(driver, step, db_engine, parent_url_id, navigation_path_parts, job_state, destination_table):
+                    print(f"\n!!! Step failed in Journey '{label}'. Halting this journey. !!!")
+                    result['succeeded'] = False
+                    result['error'] = f"Journey '{label}' failed."
+                    break
+            
+            if result['succeeded']:
+                print(f"\n✅ Journey '{label}' completed successfully.")
+
+    except Exception as e:
+        print(f"\n!!! An unexpected exception occurred during Journey '{label}': {e}")
+        result['succeeded'] = False
+        result['error'] = str(e)
+
+    result['records_saved'] = job_state['records_saved']
+    print(f"\n{wait_report.summary()}")
+    return result
+
 if __name__ == "__main__":
     # This block is for local testing. It simulates the Lambda event.
     parent_url_id_for_testing = "df8edd0e-0f69-484a-930b-67dc6072013b"
@@ -1,11 +1,12 @@
 from selenium.webdriver.support.ui import WebDriverWait
-import time
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from urllib.parse import urljoin
 
 from core.database import save_scraped_data_to_db
+from core.table_extract import extract_rows
+from core.waits import wait_for_in_viewport
 
 
 def scrape_configured_data(driver, container_xpath, scraping_config, db_engine, parent_url_id, navigation_path_parts, page_num, job_state, destination_table):
@@ -27,24 +28,26 @@ def scrape_configured_data(driver, container_xpath, scraping_config, db_engine,
         if not rows: 
             return True
 
-        scraped_data = []
-        for row in rows:
-            row_data = {}
-            for column_config in scraping_config['columns']:
-                col_name, col_xpath, col_type = column_config['name'], column_config['xpath'], column_config.get('type', 'text')
-                try:
-                    element = row.find_element(By.XPATH, col_xpath) if col_xpath != '.' else row
-                    if col_type == 'text':
-                        # MODIFIED: Use JavaScript to get text content reliably
-                        row_data[col_name] = driver.execute_script("return arguments[0].textContent;", element).strip()
-                    elif col_type == 'href':
-                        row_data[col_name] = urljoin(driver.current_url, element.get_attribute('href'))
-                except NoSuchElementException:
-                    row_data[col_name] = None
-            scraped_data.append(row_data)
+        scraped_data = extract_rows(driver, rows, scraping_config['columns'], driver.current_url, text_property='textContent')
+        if scraped_data is None:
+            scraped_data = []
+            for row in rows:
+                row_data = {}
+                for column_config in scraping_config['columns']:
+                    col_name, col_xpath, col_type = column_config['name'], column_config['xpath'], column_config.get('type', 'text')
+                    try:
+                        element = row.find_element(By.XPATH, col_xpath) if col_xpath != '.' else row
+                        if col_type == 'text':
+                            # MODIFIED: Use JavaScript to get text content reliably
+                            row_data[col_name] = driver.execute_script("return arguments[0].textContent;", element).strip()
+                        elif col_type == 'href':
+                            row_data[col_name] = urljoin(driver.current_url, element.get_attribute('href'))
+                    except NoSuchElementException:
+                        row_data[col_name] = None
+                scraped_data.append(row_data)
         
         if scraped_data:
-            new_records = save_scraped_data_to_db(db_engine, scraped_data, parent_url_id, navigation_path_parts, page_num, destination_table)
+            new_records = save_scraped_data_to_db(db_engine, scraped_data, parent_url_id, navigation_path_parts, page_num, destination_table, job_state.setdefault('dedup_cache', {}))
             job_state['records_saved'] += new_records
         return True
     except TimeoutException:
@@ -57,7 +60,7 @@ def perform_click(driver, target):
     element_locator = (By.XPATH, target['value'])
     element = wait.until(EC.presence_of_element_located(element_locator))
     driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-    time.sleep(0.5) 
+    wait_for_in_viewport(driver, element)
     element_to_click = wait.until(EC.element_to_be_clickable(element_locator))
     element_text = element_to_click.text.strip()
     print(f"  - Clicking element with XPath: {target['value']} (Text: '{element_text}')")
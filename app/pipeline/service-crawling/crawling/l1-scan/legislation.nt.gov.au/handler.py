@@ -1,6 +1,7 @@
 import json
 import os
 import time
+from functools import partial
 
 # Import the database engine creator from your utils file
 from utils.aws_utils import create_db_engine
@@ -9,8 +10,9 @@ from core.config_loader import load_config
 from core.audit_log import create_audit_log_entry, update_audit_log_entry
 from core.database import get_parent_url_details
 from core.config_loader import load_config
-from core.driver import initialize_driver
 from core.navigation import process_step
+from core.waits import begin_wait_report
+from core.worker_pool import CRAWLER_WORKERS, DriverPool, plan_journey_tasks, run_tasks_in_pool, summarize_results, task_label
 
 # --- Configuration ---
 # The sitemap file name is now passed dynamically
@@ -54,62 +56,72 @@ def run_crawler(parent_url_id, sitemap_file_name, destination_table):
     audit_log_id = create_audit_log_entry(db_engine, job_name)
     if not audit_log_id: return
 
-    job_state = {'records_saved': 0}
-    final_status = 'success'
-    final_error_message = ""
-    
-    for i, journey in enumerate(config['crawler_config']['journeys']):
-        retries = 0
-        journey_succeeded = False
-        # NEW: State object to track progress within this journey
-        journey_state = {'last_completed_index': -1}
-
-        while retries <= MAX_RETRIES and not journey_succeeded:
-            driver = None
-            try:
-                if retries > 0:
-                    print(f"\n--- Retrying Journey '{journey['description']}' (Attempt {retries + 1}/{MAX_RETRIES + 1}) ---")
-
-                driver = initialize_driver()
-                
+    tasks = plan_journey_tasks(config['crawler_config']['journeys'])
+    print(f"\nRunning {len(tasks)} journey task(s) on {CRAWLER_WORKERS} pooled browser worker(s).")
+
+    pool = DriverPool(CRAWLER_WORKERS)
+    try:
+        journey_fn = partial(run_journey, pool, base_url, db_engine, parent_url_id, destination_table)
+        results = run_tasks_in_pool(tasks, journey_fn, CRAWLER_WORKERS)
+    finally:
+        pool.close()
+
+    records_saved, errors = summarize_results(results)
+    final_status = 'failed' if errors else 'success'
+    final_error_message = "".join(errors)
+
+    message = f"Successfully processed {records_saved} new records."
+    if final_status == 'failed':
+        message = f"Job failed. Processed {records_saved} new records. Last errors: {final_error_message}"
+    update_audit_log_entry(db_engine, audit_log_id, final_status, message)
+    print("\nAll journeys finished.")
+
+def run_journey(pool, base_url, db_engine, parent_url_id, destination_table, i, journey, letter_shard):
+    """
+    Runs a single journey (or one letter shard of it) on a pooled driver, with intelligent resume logic.
+    Returns a dict with 'succeeded', 'records_saved' and 'error'.
+    """
+    label = task_label(journey, letter_shard)
+    wait_report = begin_wait_report(label)
+    job_state = {'records_saved': 0, 'letter_shard': letter_shard}
+    retries = 0
+    # NEW: State object to track progress within this journey
+    journey_state = {'last_completed_index': -1}
+
+    while retries <= MAX_RETRIES:
+        try:
+            if retries > 0:
+                print(f"\n--- Retrying Journey '{label}' (Attempt {retries + 1}/{MAX_RETRIES + 1}) ---")
+
+            with pool.driver() as driver:
                 print(f"\nNavigating to base URL for journey: {base_url}")
                 driver.get(base_url)
 
                 navigation_path_parts = ["Home", journey.get('description', f'Journey-{i+1}')]
-                
+
                 print(f"\n=================================================")
-                print(f"Starting Journey: {journey['description']} ({journey['journey_id']})")
+                print(f"Starting Journey: {journey['description']} ({label})")
                 print(f"=================================================")
-                
+
                 for step in journey['steps']:
                     # Pass the state object down to the processing functions
                     if not process_step(driver, step, db_engine, parent_url_id, navigation_path_parts, job_state, destination_table, journey_state=journey_state):
-                        raise Exception(f"Step failed in Journey '{journey['journey_id']}'")
-                
-                journey_succeeded = True
-                print(f"\n✅ Journey '{journey['description']}' completed successfully on attempt {retries + 1}.")
-
-            except Exception as e:
-                retries += 1
-                print(f"\n!!! An exception occurred during Journey '{journey['description']}': {e}")
-                print(f"  - This was attempt {retries}. Retrying if possible.")
-                if retries > MAX_RETRIES:
-                    print(f"  - Max retries exceeded for this journey. Marking as failed.")
-                    final_status = 'failed'
-                    final_error_message += f"Journey '{journey['description']}' failed after {MAX_RETRIES} retries. Last error: {e}\n"
-                else:
-                    time.sleep(5)
-            
-            finally:
-                if driver:
-                    print(f"Closing WebDriver for attempt {retries}.")
-                    driver.quit()
-
-    message = f"Successfully processed {job_state['records_saved']} new records."
-    if final_status == 'failed':
-        message = f"Job failed. Processed {job_state['records_saved']} new records. Last errors: {final_error_message}"
-    update_audit_log_entry(db_engine, audit_log_id, final_status, message)
-    print("\nAll journeys finished.")
+                        raise Exception(f"Step failed in Journey '{label}'")
+
+            print(f"\n✅ Journey '{label}' completed successfully on attempt {retries + 1}.")
+            print(f"\n{wait_report.summary()}")
+            return {'succeeded': True, 'records_saved': job_state['records_saved'], 'error': None}
+
+        except Exception as e:
+            retries += 1
+            print(f"\n!!! An exception occurred during Journey '{label}': {e}")
+            print(f"  - This was attempt {retries}. Retrying if possible.")
+            if retries > MAX_RETRIES:
+                print(f"  - Max retries exceeded for this journey. Marking as failed.")
+                error = f"Journey '{label}' failed after {MAX_RETRIES} retries. Last error: {e}\n"
+                print(f"\n{wait_report.summary()}")
+                return {'succeeded': False, 'records_saved': job_state['records_saved'], 'error': error}
+            time.sleep(5)
 
 if __name__ == "__main__":
     # This block is for local testing. It simulates the Lambda event.
@@ -6,6 +6,7 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 from core.scraping import perform_click, scrape_configured_data
+from core.worker_pool import in_letter_shard
 
 
 def process_url_loop(driver, step, db_engine, parent_url_id, navigation_path_parts, job_state, destination_table, base_url):
@@ -38,6 +39,8 @@ def process_url_loop(driver, step, db_engine, parent_url_id, navigation_path_par
         return False
 
     for i, url in enumerate(urls_to_visit):
+        if not in_letter_shard(i, job_state):
+            continue
         print(f"\n--- Processing URL {i+1}/{num_urls} ---")
         try:
             print(f"  - Navigating to: {url}")
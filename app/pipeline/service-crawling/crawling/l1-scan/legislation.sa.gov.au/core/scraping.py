@@ -1,11 +1,12 @@
 from selenium.webdriver.support.ui import WebDriverWait
-import time
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from urllib.parse import urljoin
 
 from core.database import save_scraped_data_to_db
+from core.table_extract import extract_rows
+from core.waits import wait_for_element_count_stable, wait_for_in_viewport
 
 
 def scrape_configured_data(driver, container_xpath, scraping_config, db_engine, parent_url_id, navigation_path_parts, page_num, job_state, destination_table, base_url):
@@ -25,9 +26,8 @@ def scrape_configured_data(driver, container_xpath, scraping_config, db_engine,
 
         print(f"  - Waiting for data to load in table ({data_loaded_xpath})...")
         wait.until(EC.presence_of_element_located((By.XPATH, data_loaded_xpath)))
+        wait_for_element_count_stable(driver, data_loaded_xpath, scraping_config.get('max_wait'))
         print("  - Data has loaded.")
-        
-        time.sleep(1)
 
         container_element = driver.find_element(By.XPATH, container_xpath)
         rows = container_element.find_elements(By.XPATH, row_xpath)
@@ -36,26 +36,28 @@ def scrape_configured_data(driver, container_xpath, scraping_config, db_engine,
         if not rows: 
             return True
 
-        scraped_data = []
-        for row in rows:
-            row_data = {}
-            for column_config in scraping_config['columns']:
-                col_name, col_xpath, col_type = column_config['name'], column_config['xpath'], column_config.get('type', 'text')
-                try:
-                    element = row.find_element(By.XPATH, col_xpath)
-                    if col_type == 'text':
-                        row_data[col_name] = element.text
-                    elif col_type == 'href':
-                        row_data[col_name] = urljoin(base_url, element.get_attribute('href'))
-                    # --- FIX: Add new, more robust text extraction method ---
-                    elif col_type == 'textContent':
-                        row_data[col_name] = element.get_attribute('textContent').strip()
-                except NoSuchElementException:
-                    row_data[col_name] = None
-            scraped_data.append(row_data)
+        scraped_data = extract_rows(driver, rows, scraping_config['columns'], base_url)
+        if scraped_data is None:
+            scraped_data = []
+            for row in rows:
+                row_data = {}
+                for column_config in scraping_config['columns']:
+                    col_name, col_xpath, col_type = column_config['name'], column_config['xpath'], column_config.get('type', 'text')
+                    try:
+                        element = row.find_element(By.XPATH, col_xpath)
+                        if col_type == 'text':
+                            row_data[col_name] = element.text
+                        elif col_type == 'href':
+                            row_data[col_name] = urljoin(base_url, element.get_attribute('href'))
+                        # --- FIX: Add new, more robust text extraction method ---
+                        elif col_type == 'textContent':
+                            row_data[col_name] = element.get_attribute('textContent').strip()
+                    except NoSuchElementException:
+                        row_data[col_name] = None
+                scraped_data.append(row_data)
         
         if scraped_data:
-            new_records = save_scraped_data_to_db(db_engine, scraped_data, parent_url_id, navigation_path_parts, page_num, destination_table)
+            new_records = save_scraped_data_to_db(db_engine, scraped_data, parent_url_id, navigation_path_parts, page_num, destination_table, job_state.setdefault('dedup_cache', {}))
             job_state['records_saved'] += new_records
         return True
     except TimeoutException:
@@ -77,7 +79,7 @@ def perform_click(driver, target, is_pagination=False):
         element_locator = (By.XPATH, target['value'])
         element = wait.until(EC.presence_of_element_located(element_locator))
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-        time.sleep(0.5) 
+        wait_for_in_viewport(driver, element)
         element_to_click = wait.until(EC.element_to_be_clickable(element_locator))
         element_text = element_to_click.text.strip()
         print(f"  - Clicking element with XPath: {target['value']} (Text: '{element_text}')")
@@ -1,10 +1,11 @@
-import time
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException, StaleElementReferenceException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 from core.scraping import perform_click, scrape_configured_data
+from core.worker_pool import in_letter_shard
+from core.waits import settle_after_step
 
 
 def process_next_button_pagination_loop(driver, step, db_engine, parent_url_id, navigation_path_parts, job_state, destination_table):
@@ -30,7 +31,7 @@ def process_next_button_pagination_loop(driver, step, db_engine, parent_url_id,
             break
         
         page_counter += 1
-        time.sleep(2)
+        settle_after_step(driver, step)
 
     return True
 
@@ -61,6 +62,8 @@ def process_alphabet_loop(driver, step, db_engine, parent_url_id, navigation_pat
         return False
 
     for i in range(num_links):
+        if not in_letter_shard(i, job_state):
+            continue
         print(f"\n--- Processing alphabet link {i+1}/{num_links} ---")
         try:
             # Re-find the elements in each iteration to get a fresh, non-stale list
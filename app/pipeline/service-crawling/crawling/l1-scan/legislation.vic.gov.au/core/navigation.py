@@ -1,6 +1,6 @@
-import time
 
 from core.scraping import perform_click, scrape_configured_data
+from core.waits import settle_after_step
 
 
 def process_pagination_loop(driver, step, db_engine, parent_url_id, navigation_path_parts, start_page, job_state, destination_tablename):
@@ -17,7 +17,7 @@ def process_pagination_loop(driver, step, db_engine, parent_url_id, navigation_p
             if click_result is None:
                 fallback_locator = {"type": "xpath", "value": step['next_button_fallback_xpath']}
                 if perform_click(driver, fallback_locator, is_pagination=True) == "browser_crash": return False
-            time.sleep(1)
+            settle_after_step(driver, step)
 
     while True:
         print(f"\n--- Scraping results on page {page_counter} ---")
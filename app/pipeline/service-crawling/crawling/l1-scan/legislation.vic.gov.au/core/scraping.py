@@ -1,10 +1,11 @@
 from selenium.webdriver.support.ui import WebDriverWait
-import time
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 
 from core.database import save_book_links_to_db
+from core.table_extract import extract_rows
+from core.waits import wait_for_element_count_stable, wait_for_in_viewport
 
 
 def scrape_configured_data(driver, container_xpath, scraping_config, db_engine, parent_url_id, navigation_path_parts, page_num, job_state, destination_tablename):
@@ -17,24 +18,26 @@ def scrape_configured_data(driver, container_xpath, scraping_config, db_engine,
         print(f"  - Waiting for loading spinner to disappear ({loading_spinner_xpath})...")
         wait.until(EC.invisibility_of_element_located((By.XPATH, loading_spinner_xpath)))
         print("  - Loading spinner gone. Content should be loaded.")
-        time.sleep(1)
 
         row_xpath = scraping_config['row_xpath']
+        wait_for_element_count_stable(driver, row_xpath, scraping_config.get('max_wait'))
         rows = driver.find_elements(By.XPATH, row_xpath)
         print(f"  - Found {len(rows)} result rows to scrape using XPath: {row_xpath}")
         if not rows: return True
 
-        scraped_data = []
-        for row in rows:
-            row_data = {}
-            for column_config in scraping_config['columns']:
-                col_name, col_xpath, col_type = column_config['name'], column_config['xpath'], column_config.get('type', 'text')
-                try:
-                    element = row.find_element(By.XPATH, col_xpath)
-                    row_data[col_name] = element.text if col_type == 'text' else element.get_attribute('href')
-                except NoSuchElementException:
-                    row_data[col_name] = None
-            scraped_data.append(row_data)
+        scraped_data = extract_rows(driver, rows, scraping_config['columns'])
+        if scraped_data is None:
+            scraped_data = []
+            for row in rows:
+                row_data = {}
+                for column_config in scraping_config['columns']:
+                    col_name, col_xpath, col_type = column_config['name'], column_config['xpath'], column_config.get('type', 'text')
+                    try:
+                        element = row.find_element(By.XPATH, col_xpath)
+                        row_data[col_name] = element.text if col_type == 'text' else element.get_attribute('href')
+                    except NoSuchElementException:
+                        row_data[col_name] = None
+                scraped_data.append(row_data)
         
         if scraped_data:
             save_book_links_to_db(db_engine, scraped_data, parent_url_id, navigation_path_parts, page_num, job_state, destination_tablename)
@@ -59,7 +62,7 @@ def perform_click(driver, target, is_pagination=False):
         element_locator = (By.XPATH, target['value'])
         element = wait.until(EC.presence_of_element_located(element_locator))
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-        time.sleep(0.5) 
+        wait_for_in_viewport(driver, element)
         element_to_click = wait.until(EC.element_to_be_clickable(element_locator))
         element_text = element_to_click.text.strip()
         print(f"  - Clicking element with XPath: {target['value']} (Text: '{element_text}')")
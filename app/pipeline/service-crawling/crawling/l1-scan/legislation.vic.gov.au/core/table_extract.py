@@ -0,0 +1,64 @@
+import os
+from urllib.parse import urljoin
+from selenium.common.exceptions import WebDriverException
+
+
+BULK_EXTRACT = os.getenv("BULK_EXTRACT", "true").lower() == "true" # Read whole result tables in one execute_script call
+
+# Reads every configured column of every row in the browser and returns them as a list of objects.
+# arguments: [row elements], [{name, xpath, type}], name of the DOM property used for 'text' columns.
+# Throws (and so falls back to per-element scraping) on invalid XPath or stale rows.
+BULK_EXTRACT_JS = """
+    var rows = arguments[0], columns = arguments[1], textProperty = arguments[2];
+    var results = [];
+    for (var r = 0; r < rows.length; r++) {
+        var row = rows[r], rowData = {};
+        for (var c = 0; c < columns.length; c++) {
+            var column = columns[c];
+            var node = column.xpath === '.' ? row : document.evaluate(
+                column.xpath, row, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            if (column.type !== 'text' && column.type !== 'textContent' && column.type !== 'href') continue;
+            if (!node) { rowData[column.name] = null; continue; }
+            if (column.type === 'href') {
+                rowData[column.name] = !node.hasAttribute('href') ? null : (node.href || node.getAttribute('href'));
+            } else {
+                var property = column.type === 'textContent' ? 'textContent' : textProperty;
+                rowData[column.name] = (node[property] || '').trim();
+            }
+        }
+        results.push(rowData);
+    }
+    return results;
+"""
+
+
+def extract_rows(driver, rows, columns, base_url=None, text_property='innerText'):
+    """
+    Extracts all configured columns of all `rows` in a single WebDriver round-trip.
+    Returns a list of row dicts shaped like the per-element scraping loop (href columns joined to
+    `base_url` when given), or None if bulk extraction is disabled or failed, in which case callers
+    fall back to scraping cell by cell.
+    """
+    if not BULK_EXTRACT or not rows:
+        return None
+
+    column_specs = [{'name': col['name'], 'xpath': col['xpath'], 'type': col.get('type', 'text')} for col in columns]
+    try:
+        scraped_data = driver.execute_script(BULK_EXTRACT_JS, rows, column_specs, text_property)
+    except WebDriverException as e:
+        print(f"  - WARNING: Bulk extraction failed, falling back to per-element scraping: {e}")
+        return None
+
+    if not isinstance(scraped_data, list) or len(scraped_data) != len(rows):
+        print("  - WARNING: Bulk extraction returned an unexpected result, falling back to per-element scraping.")
+        return None
+
+    if base_url is not None:
+        href_columns = [col['name'] for col in column_specs if col['type'] == 'href']
+        for row_data in scraped_data:
+            for col_name in href_columns:
+                if row_data[col_name]: # Rows without a link keep None rather than the page URL
+                    row_data[col_name] = urljoin(base_url, row_data[col_name])
+
+    print(f"  - Extracted {len(scraped_data)} rows in a single round-trip.")
+    return scraped_data
@@ -0,0 +1,222 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, WebDriverException
+
+
+DEFAULT_MAX_WAIT = float(os.getenv("DEFAULT_MAX_WAIT", 10)) # Upper bound (seconds) for a wait when the sitemap step sets no 'max_wait'
+QUIET_PERIOD = float(os.getenv("WAIT_QUIET_PERIOD", 0.5)) # How long a page/element must stay unchanged to count as settled
+POLL_INTERVAL = 0.1
+
+# Returns [document.readyState, pending jQuery requests, number of loaded resources] in one round-trip.
+PAGE_ACTIVITY_JS = """
+    var jq = window.jQuery ? window.jQuery.active : 0;
+    var resources = window.performance && performance.getEntriesByType ? performance.getEntriesByType('resource').length : 0;
+    return [document.readyState, jq, resources];
+"""
+IN_VIEWPORT_JS = """
+    var r = arguments[0].getBoundingClientRect();
+    return r.top >= 0 && r.bottom <= (window.innerHeight || document.documentElement.clientHeight);
+"""
+
+
+class WaitReport:
+    """Accumulates how long a journey spent waiting on page conditions versus doing actual work."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.monotonic()
+        self.wait_seconds = defaultdict(float)
+        self.wait_counts = defaultdict(int)
+        self.timeouts = defaultdict(int)
+
+    def record(self, condition, seconds, satisfied=True):
+        self.wait_seconds[condition] += seconds
+        self.wait_counts[condition] += 1
+        if not satisfied:
+            self.timeouts[condition] += 1
+
+    def summary(self):
+        elapsed = time.monotonic() - self.started_at
+        waited = sum(self.wait_seconds.values())
+        share = (waited / elapsed * 100) if elapsed else 0.0
+        lines = [f"Wait report for '{self.name}': {elapsed:.1f}s total, {waited:.1f}s waiting ({share:.0f}%), {elapsed - waited:.1f}s working."]
+        for condition in sorted(self.wait_seconds):
+            lines.append(
+                f"  - {condition}: {self.wait_counts[condition]} wait(s), {self.wait_seconds[condition]:.1f}s, "
+                f"{self.timeouts[condition]} hit the upper bound"
+            )
+        return "\n".join(lines)
+
+
+_local = threading.local()
+
+
+def begin_wait_report(name):
+    """Starts a new wait report for the journey running on the current thread."""
+    _local.report = WaitReport(name)
+    return _local.report
+
+
+def get_wait_report():
+    """Returns the wait report of the current thread, if a journey started one."""
+    return getattr(_local, 'report', None)
+
+
+@contextmanager
+def _timed(condition):
+    outcome = {'satisfied': True}
+    started = time.monotonic()
+    try:
+        yield outcome
+    finally:
+        report = get_wait_report()
+        if report:
+            report.record(condition, time.monotonic() - started, outcome['satisfied'])
+
+
+def _poll_until_stable(probe, max_wait, quiet_period):
+    """
+    Calls `probe()` until it returns the same non-None value for `quiet_period` seconds.
+    Returns (satisfied, last_value); gives up after `max_wait` seconds.
+    """
+    deadline = time.monotonic() + max_wait
+    last_value, stable_since = None, None
+    while True:
+        value = probe()
+        now = time.monotonic()
+        if value is not None and value == last_value:
+            if now - stable_since >= quiet_period:
+                return True, value
+        else:
+            last_value, stable_since = value, now
+        if now >= deadline:
+            return False, last_value
+        time.sleep(POLL_INTERVAL)
+
+
+def wait_for_page_settled(driver, max_wait=None, quiet_period=QUIET_PERIOD):
+    """
+    Waits until the document has loaded, no jQuery requests are pending and no new network
+    resources were fetched for `quiet_period` seconds. Never raises; returns True if the page settled.
+    """
+    max_wait = DEFAULT_MAX_WAIT if max_wait is None else max_wait
+
+    def probe():
+        try:
+            ready_state, pending, resources = driver.execute_script(PAGE_ACTIVITY_JS)
+        except (WebDriverException, TypeError, ValueError):
+            return None
+        if ready_state != 'complete' or pending:
+            return None
+        return resources
+
+    with _timed('page_settled') as outcome:
+        outcome['satisfied'], _ = _poll_until_stable(probe, max_wait, quiet_period)
+    return outcome['satisfied']
+
+
+def wait_for_element_count_stable(driver, xpath, max_wait=None, quiet_period=QUIET_PERIOD, root=None, min_count=1):
+    """
+    Waits until at least `min_count` elements match `xpath` (under `root`, or the whole page)
+    and their number stops changing for `quiet_period` seconds, so rows that have not started
+    arriving yet are not mistaken for an empty page. Returns the final element count.
+    """
+    max_wait = DEFAULT_MAX_WAIT if max_wait is None else max_wait
+    context = root if root is not None else driver
+    state = {'count': 0}
+
+    def probe():
+        try:
+            state['count'] = len(context.find_elements(By.XPATH, xpath))
+        except (StaleElementReferenceException, WebDriverException):
+            return None
+        return state['count'] if state['count'] >= min_count else None
+
+    with _timed('element_count_stable') as outcome:
+        outcome['satisfied'], _ = _poll_until_stable(probe, max_wait, quiet_period)
+    return state['count']
+
+
+def get_outer_html(root, xpath):
+    """Returns the HTML of the element at `xpath` under `root`, or None if there is none yet."""
+    try:
+        return root.find_element(By.XPATH, xpath).get_attribute('outerHTML')
+    except (NoSuchElementException, StaleElementReferenceException):
+        return None
+
+
+def wait_for_content_stable(root, xpath, max_wait=None, quiet_period=QUIET_PERIOD, previous_html=None):
+    """
+    Waits for the element at `xpath` under `root` to exist with non-empty HTML that differs from
+    `previous_html` (its HTML before the click, see get_outer_html), and for that HTML to stop
+    changing, e.g. after clicking a tab whose content is loaded asynchronously.
+    Returns the element, or raises NoSuchElementException if it never appeared.
+    """
+    max_wait = DEFAULT_MAX_WAIT if max_wait is None else max_wait
+    state = {'element': None}
+
+    def probe():
+        try:
+            if state['element'] is None:
+                state['element'] = root.find_element(By.XPATH, xpath)
+            html = state['element'].get_attribute('outerHTML')
+            if not html or html == previous_html:
+                return None
+            return html
+        except NoSuchElementException:
+            return None
+        except StaleElementReferenceException:
+            state['element'] = None
+            return None
+
+    with _timed('content_stable') as outcome:
+        outcome['satisfied'], _ = _poll_until_stable(probe, max_wait, quiet_period)
+    if state['element'] is None:
+        raise NoSuchElementException(f"Element '{xpath}' did not appear within {max_wait}s")
+    return state['element']
+
+
+def wait_for_url_change(driver, previous_url, max_wait=None):
+    """Waits until the browser URL differs from `previous_url`. Returns True if it changed."""
+    max_wait = DEFAULT_MAX_WAIT if max_wait is None else max_wait
+    deadline = time.monotonic() + max_wait
+    with _timed('url_change') as outcome:
+        while driver.current_url == previous_url:
+            if time.monotonic() >= deadline:
+                outcome['satisfied'] = False
+                break
+            time.sleep(POLL_INTERVAL)
+    return outcome['satisfied']
+
+
+def wait_for_in_viewport(driver, element, max_wait=1.0):
+    """Waits until a scrolled-to element is inside the viewport. Returns True once it is."""
+    deadline = time.monotonic() + max_wait
+    with _timed('in_viewport') as outcome:
+        while True:
+            try:
+                if driver.execute_script(IN_VIEWPORT_JS, element):
+                    break
+            except WebDriverException:
+                pass
+            if time.monotonic() >= deadline:
+                outcome['satisfied'] = False
+                break
+            time.sleep(POLL_INTERVAL)
+    return outcome['satisfied']
+
+
+def settle_after_step(driver, step, default_max_wait=None):
+    """
+    Waits for the page to settle after a sitemap step, honouring the step's optional
+    'max_wait' (upper bound in seconds) and 'settle_xpath' (wait for those elements instead).
+    """
+    max_wait = step.get('max_wait', DEFAULT_MAX_WAIT if default_max_wait is None else default_max_wait)
+    settle_xpath = step.get('settle_xpath')
+    if settle_xpath:
+        return wait_for_element_count_stable(driver, settle_xpath, max_wait) > 0
+    return wait_for_page_settled(driver, max_wait)
@@ -1,6 +1,8 @@
 import json
 import os
 import time
+from functools import partial
+from selenium.common.exceptions import WebDriverException
 
 # Import the database engine creator from your utils file
 from utils.aws_utils import create_db_engine
@@ -8,8 +10,9 @@ from utils.common import get_page_from_url
 from core.audit_log import create_audit_log_entry, update_audit_log_entry
 from core.database import get_parent_url_details, save_book_links_to_db
 from core.config_loader import load_config
-from core.driver import initialize_driver
 from core.navigation import process_pagination_loop, process_step
+from core.waits import begin_wait_report
+from core.worker_pool import CRAWLER_WORKERS, DriverPool, plan_journey_tasks, run_tasks_in_pool, summarize_results, task_label
 
 # --- Configuration ---
 CONFIG_FILE_PATH_lEGISLATION_VIC_GOV_AU = os.path.join('config', 'sitemap_legislation_vic_gov_au.json')
@@ -51,32 +54,63 @@ def run_crawler(parent_url_id, sitemap_filename, destination_tablename):
         print("Exiting due to failure to create audit log.")
         return
 
-    job_state = {'records_saved': 0}
+    tasks = plan_journey_tasks(config['crawler_config']['journeys'])
+    print(f"\nRunning {len(tasks)} journey task(s) on {CRAWLER_WORKERS} pooled browser worker(s).")
+
+    records_saved = 0
     final_status = 'success'
     final_error_message = None
+    pool = DriverPool(CRAWLER_WORKERS)
     
     try:
-        for i, journey in enumerate(config['crawler_config']['journeys']):
-            retries = 0
-            journey_id = journey['journey_id']
-            resume_from_url = None
-            
-            while retries < MAX_RETRIES:
-                driver = None
-                try:
-                    navigation_path_parts = ["Home"]
-                    for step in journey['steps']:
-                        if step.get('is_breadcrumb'):
-                            navigation_path_parts.append(step.get('description', ''))
-                    navigation_path_parts.append(journey_id)
+        journey_fn = partial(run_journey, pool, base_url, db_engine, parent_url_id, destination_tablename)
+        results = run_tasks_in_pool(tasks, journey_fn, CRAWLER_WORKERS)
+        records_saved, errors = summarize_results(results)
+        if errors:
+            final_status = 'failed'
+            final_error_message = errors[-1]
 
-                    driver = initialize_driver()
-                    
+    except Exception as e:
+        print(f"  - An uncaught exception terminated the crawler run: {e}")
+        final_status = 'failed'
+        final_error_message = str(e)
+    
+    finally:
+        pool.close()
+        message = f"Successfully processed {records_saved} new records."
+        if final_status == 'failed':
+            message = f"Job failed. Processed {records_saved} new records. Last error: {final_error_message}"
+        update_audit_log_entry(db_engine, audit_log_id, final_status, message)
+        print("\nAll journeys finished.")
+
+def run_journey(pool, base_url, db_engine, parent_url_id, destination_tablename, i, journey, letter_shard):
+    """
+    Runs a single journey on a pooled driver, resuming from the last visited results page on retry.
+    Returns a dict with 'succeeded', 'records_saved' and 'error'.
+    """
+    label = task_label(journey, letter_shard)
+    wait_report = begin_wait_report(label)
+    job_state = {'records_saved': 0, 'letter_shard': letter_shard}
+    retries = 0
+    journey_id = journey['journey_id']
+    resume_from_url = None
+    last_error = None
+    
+    while retries < MAX_RETRIES:
+        try:
+            navigation_path_parts = ["Home"]
+            for step in journey['steps']:
+                if step.get('is_breadcrumb'):
+                    navigation_path_parts.append(step.get('description', ''))
+            navigation_path_parts.append(journey_id)
+
+            with pool.driver() as driver:
+                try:
                     start_url_for_attempt = resume_from_url or base_url
                     is_resuming = bool(resume_from_url)
                     
                     print(f"\n=================================================")
-                    print(f"Starting Journey: {journey['description']} ({journey_id})")
+                    print(f"Starting Journey: {journey['description']} ({label})")
                     print(f"Attempt #{retries + 1}. Starting from URL: {start_url_for_attempt}")
                     print(f"=================================================")
                     
@@ -103,46 +137,36 @@ def run_crawler(parent_url_id, sitemap_filename, destination_tablename):
                                 print(f"  - Recording resume URL for next attempt: {resume_from_url}")
                                 journey_succeeded = False
                                 break
-                    
-                    if journey_succeeded:
-                        print(f"\n✅ Journey '{journey_id}' completed successfully.")
-                        break
-                    else:
-                        retries += 1
-                        print(f"  - Incrementing retry count to {retries} for journey '{journey_id}'.")
-
-                except Exception as e:
-                    retries += 1
-                    print(f"\n!!! An unexpected exception occurred during Journey '{journey_id}': {e}")
-                    final_error_message = str(e)
-                    if driver: resume_from_url = driver.current_url
-                    print(f"  - Incrementing retry count to {retries}. Resume URL: {resume_from_url} !!!")
-                
-                finally:
-                    if driver:
-                        print(f"Closing WebDriver for attempt #{retries} of Journey '{journey_id}'.")
-                        driver.quit()
-                
-                if retries < MAX_RETRIES:
-                    print(f"  - Waiting 10 seconds before retrying journey '{journey_id}'...")
-                    time.sleep(10)
+                except Exception:
+                    # Capture the resume point before the driver is reset and returned to the pool
+                    try:
+                        resume_from_url = driver.current_url
+                    except WebDriverException:
+                        pass
+                    raise
             
-            if retries >= MAX_RETRIES:
-                print(f"\n❌ FATAL: Journey '{journey_id}' failed after {MAX_RETRIES} attempts. Setting job status to 'failed'.")
-                final_status = 'failed'
-                final_error_message = final_error_message or f"Journey '{journey_id}' failed after max retries."
+            if journey_succeeded:
+                print(f"\n✅ Journey '{label}' completed successfully.")
+                print(f"\n{wait_report.summary()}")
+                return {'succeeded': True, 'records_saved': job_state['records_saved'], 'error': None}
+            else:
+                retries += 1
+                print(f"  - Incrementing retry count to {retries} for journey '{label}'.")
 
-    except Exception as e:
-        print(f"  - An uncaught exception terminated the crawler run: {e}")
-        final_status = 'failed'
-        final_error_message = str(e)
+        except Exception as e:
+            retries += 1
+            print(f"\n!!! An unexpected exception occurred during Journey '{label}': {e}")
+            last_error = str(e)
+            print(f"  - Incrementing retry count to {retries}. Resume URL: {resume_from_url} !!!")
+        
+        if retries < MAX_RETRIES:
+            print(f"  - Waiting 10 seconds before retrying journey '{label}'...")
+            time.sleep(10)
     
-    finally:
-        message = f"Successfully processed {job_state['records_saved']} new records."
-        if final_status == 'failed':
-            message = f"Job failed. Processed {job_state['records_saved']} new records. Last error: {final_error_message}"
-        update_audit_log_entry(db_engine, audit_log_id, final_status, message)
-        print("\nAll journeys finished.")
+    print(f"\n❌ FATAL: Journey '{label}' failed after {MAX_RETRIES} attempts. Setting job status to 'failed'.")
+    error = last_error or f"Journey '{journey_id}' failed after max retries."
+    print(f"\n{wait_report.summary()}")
+    return {'succeeded': False, 'records_saved': job_state['records_saved'], 'error': error}
 
 if __name__ == "__main__":
     # Define inputs for the crawler function
@@ -9,7 +9,7 @@ from handler import (
     run_crawler, load_config, create_audit_log_entry,
     update_audit_log_entry, get_parent_url_details,
     save_content_to_s3, save_record_and_get_id, process_step,
-    scrape_page_details_and_save
+    scrape_page_details_and_save, save_content_if_changed
 )
 
 # Mock the database engine for all tests
@@ -112,7 +112,8 @@ def test_run_crawler_happy_path(
         mock_db_engine,
         "audit_id_123",
         'success',
-        "Successfully processed 0 new records."
+        "Successfully processed 0 new records. 0 tab(s) changed since the last run, "
+        "0 unchanged and not re-uploaded (0 existing record(s) re-checked)."
     )
 
 
@@ -188,6 +189,40 @@ def test_save_content_to_s3():
         obj = s3.get_object(Bucket=bucket, Key="test/key.html")
         assert obj['Body'].read().decode() == "some content"
 
+@mock_aws
+def test_save_content_if_changed():
+    """
+    Tests that a tab is uploaded with its content hash and only re-uploaded once its content changes.
+    """
+    s3 = boto3.client("s3", region_name="us-east-1")
+    bucket = "test-bucket"
+    s3.create_bucket(Bucket=bucket)
+
+    with patch('handler.s3_client', s3):
+        assert save_content_if_changed("<div>v1</div>", bucket, "test/excerpt.html") is True
+        assert s3.head_object(Bucket=bucket, Key="test/excerpt.html")['Metadata']['content-sha256']
+        last_modified = s3.head_object(Bucket=bucket, Key="test/excerpt.html")['LastModified']
+
+        assert save_content_if_changed("<div>v1</div>", bucket, "test/excerpt.html") is False
+        assert s3.head_object(Bucket=bucket, Key="test/excerpt.html")['LastModified'] == last_modified
+
+        assert save_content_if_changed("<div>v2</div>", bucket, "test/excerpt.html") is True
+        assert s3.get_object(Bucket=bucket, Key="test/excerpt.html")['Body'].read().decode() == "<div>v2</div>"
+
+@mock_aws
+def test_save_content_if_changed_new_record_skips_lookup():
+    """
+    Tests that a new record's tab is uploaded straight away, without looking up a stored hash.
+    """
+    s3 = boto3.client("s3", region_name="us-east-1")
+    bucket = "test-bucket"
+    s3.create_bucket(Bucket=bucket)
+
+    with patch('handler.s3_client', s3), patch('handler.get_stored_content_hash') as mock_stored_hash:
+        assert save_content_if_changed("<div>v1</div>", bucket, "test/excerpt.html", is_new_record=True) is True
+        mock_stored_hash.assert_not_called()
+        assert s3.head_object(Bucket=bucket, Key="test/excerpt.html")['Metadata']['content-sha256']
+
 def test_save_content_to_s3_exception():
     with patch('handler.s3_client.put_object', side_effect=Exception("S3 is down")):
         with pytest.raises(Exception):
@@ -235,8 +270,9 @@ def test_save_record_and_get_id_db_exception(mock_db_engine):
         save_record_and_get_id(mock_db_engine, data, "p_id", "path", "table")
 
 
+@patch('handler.settle_after_step')
 @patch('handler.WebDriverWait')
-def test_process_step_click(mock_wait, mock_driver):
+def test_process_step_click(mock_wait, mock_settle, mock_driver):
     mock_element = MagicMock()
     mock_wait.return_value.until.return_value = mock_element
     step = {'action': 'click', 'target': {'value': 'xpath'}, 'description': 'test click'}
@@ -245,6 +281,7 @@ def test_process_step_click(mock_wait, mock_driver):
     
     assert result is True
     mock_driver.execute_script.assert_called_with("arguments[0].click();", mock_element)
+    mock_settle.assert_called_once_with(mock_driver, step)
 
 @patch('time.sleep')
 def test_process_step_pause(mock_sleep):
@@ -268,7 +305,7 @@ def test_process_step_delegation(mock_nav_loop, mock_paginate):
     mock_nav_loop.assert_called_once_with(None, step_nav, "db", "id", "path", "state", "jstate")
 
 @patch('handler.save_record_and_get_id', return_value="new-record-id")
-@patch('handler.save_content_to_s3')
+@patch('handler.save_content_if_changed', return_value=True)
 @patch('handler.WebDriverWait')
 def test_scrape_page_details_and_save_success(mock_wait, mock_save_s3, mock_save_db, mock_driver):
     # --- Setup mock web elements ---
@@ -276,6 +313,8 @@ def test_scrape_page_details_and_save_success(mock_wait, mock_save_s3, mock_save
     mock_col_element = MagicMock()
     mock_col_element.text = "Book Name"
     mock_tab_button = MagicMock()
+    mock_tab_placeholder = MagicMock()
+    mock_tab_placeholder.get_attribute.return_value = "<html></html>"
     mock_tab_content = MagicMock()
     mock_tab_content.get_attribute.return_value = "<html>Content</html>"
     
@@ -284,6 +323,7 @@ def test_scrape_page_details_and_save_success(mock_wait, mock_save_s3, mock_save
         mock_col_element, # for book_url (will get text)
         mock_col_element, # for book_context
         mock_tab_button,  # for first tab click
+        mock_tab_placeholder, # for first tab content before the click
         mock_tab_content, # for first tab content
     ]
     
@@ -309,10 +349,65 @@ def test_scrape_page_details_and_save_success(mock_wait, mock_save_s3, mock_save
 
     assert result is True
     assert job_state['records_saved'] == 1
+    assert job_state['tabs_changed'] == 1
     mock_save_db.assert_called_once()
     mock_save_s3.assert_called_once()
+    assert mock_save_s3.call_args.kwargs == {'is_new_record': True}
     mock_driver.execute_script.assert_called_with("arguments[0].click();", mock_tab_button)
 
+@patch('handler.get_existing_record_id', return_value="existing-record-id")
+@patch('handler.save_record_and_get_id', return_value=None)
+@patch('handler.save_content_if_changed', return_value=False)
+@patch('handler.WebDriverWait')
+def test_scrape_page_details_and_save_refresh_existing(mock_wait, mock_save_s3, mock_save_db, mock_get_existing, mock_driver):
+    """
+    With refresh_existing, tabs of an already-saved record are re-checked and unchanged ones counted.
+    """
+    mock_row = MagicMock()
+    mock_tab_content = MagicMock()
+    mock_tab_content.get_attribute.return_value = "<html>Content</html>"
+    mock_row.find_element.return_value = mock_tab_content
+    mock_wait.return_value.until.return_value = [mock_row]
+
+    config = {
+        'row_xpath': '//div',
+        'columns': [{'name': 'book_name', 'xpath': './/h2', 'type': 'text'}],
+        'content_tabs': {'refresh_existing': True, 'tabs': [{'name': 'Excerpt', 'click_xpath': './/a', 'content_xpath': './/div'}]},
+        'destination_table': 'test_table',
+        's3_bucket': 'test-bucket',
+        'jurisdiction_folder_name': 'test-jurisdiction'
+    }
+    job_state = {'records_saved': 0}
+
+    with patch('handler.wait_for_content_stable', return_value=mock_tab_content):
+        result = scrape_page_details_and_save(mock_driver, config, "db_engine", "parent_id", ["nav"], job_state)
+
+    assert result is True
+    assert job_state['records_saved'] == 0
+    assert job_state['records_refreshed'] == 1
+    assert job_state['tabs_unchanged'] == 1
+    mock_save_s3.assert_called_once_with("<html>Content</html>", 'test-bucket', "case-laws/test-jurisdiction/existing-record-id/excerpt.html", is_new_record=False)
+
+@patch('handler.save_record_and_get_id', return_value=None)
+@patch('handler.save_content_if_changed')
+@patch('handler.WebDriverWait')
+def test_scrape_page_details_and_save_skips_existing_by_default(mock_wait, mock_save_s3, mock_save_db, mock_driver):
+    """
+    Without refresh_existing, rows for records saved on earlier runs are skipped entirely.
+    """
+    mock_wait.return_value.until.return_value = [MagicMock()]
+    config = {
+        'row_xpath': '//div',
+        'columns': [{'name': 'book_name', 'xpath': './/h2', 'type': 'text'}],
+        'content_tabs': {'tabs': [{'name': 'Excerpt', 'click_xpath': './/a', 'content_xpath': './/div'}]},
+        'destination_table': 'test_table',
+        's3_bucket': 'test-bucket',
+    }
+    job_state = {'records_saved': 0}
+
+    assert scrape_page_details_and_save(mock_driver, config, "db_engine", "parent_id", ["nav"], job_state) is True
+    mock_save_s3.assert_not_called()
+
 @patch('handler.WebDriverWait')
 def test_scrape_page_details_and_save_no_rows(mock_wait, mock_driver):
     # Make the wait time out, simulating no rows found
@@ -0,0 +1,165 @@
+import pytest
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from selenium.webdriver.common.by import By
+
+from utils import waits
+from utils.waits import (
+    begin_wait_report, get_outer_html, get_wait_report, wait_for_page_settled, wait_for_element_count_stable,
+    wait_for_content_stable, wait_for_url_change, settle_after_step
+)
+
+
+@pytest.fixture(autouse=True)
+def fast_waits(monkeypatch):
+    """Shrinks the polling interval so the tests don't spend real time waiting."""
+    monkeypatch.setattr(waits, "POLL_INTERVAL", 0.01)
+
+
+def test_page_settled_once_activity_stops():
+    driver = MagicMock()
+    driver.execute_script.side_effect = [
+        ['loading', 0, 3],
+        ['complete', 2, 5],  # jQuery requests still pending
+        ['complete', 0, 7],
+    ] + [['complete', 0, 7]] * 50
+
+    assert wait_for_page_settled(driver, max_wait=2, quiet_period=0.05) is True
+
+def test_page_settled_gives_up_at_upper_bound():
+    driver = MagicMock()
+    driver.execute_script.return_value = ['loading', 0, 0]
+
+    assert wait_for_page_settled(driver, max_wait=0.1, quiet_period=0.05) is False
+
+def test_element_count_stable_returns_final_count():
+    driver = MagicMock()
+    driver.find_elements.side_effect = [[1], [1, 2], [1, 2, 3]] + [[1, 2, 3]] * 50
+
+    assert wait_for_element_count_stable(driver, "//div", max_wait=2, quiet_period=0.05) == 3
+
+def test_element_count_stable_waits_for_rows_that_arrive_late():
+    """
+    A count that stays at 0 for longer than the quiet period is not a settled, empty page.
+    """
+    driver = MagicMock()
+    started = time.monotonic()
+    driver.find_elements.side_effect = lambda by, xpath: [1, 2, 3] if time.monotonic() - started >= 0.4 else []
+
+    assert wait_for_element_count_stable(driver, "//tr", max_wait=2, quiet_period=0.3) == 3
+    assert time.monotonic() - started >= 0.7
+
+def test_element_count_stable_gives_up_on_empty_page():
+    driver = MagicMock()
+    driver.find_elements.return_value = []
+
+    assert wait_for_element_count_stable(driver, "//tr", max_wait=0.2, quiet_period=0.05) == 0
+
+def test_settle_after_step_waits_for_late_rows():
+    driver = MagicMock()
+    driver.find_elements.side_effect = [[]] * 10 + [[1, 2]] * 50
+
+    assert settle_after_step(driver, {'settle_xpath': "//tr", 'max_wait': 2}) is True
+
+def test_content_stable_waits_for_content_to_replace_previous_html():
+    """
+    A container that already holds the previous tab's content is not returned until that content is replaced.
+    """
+    row = MagicMock()
+    content = MagicMock()
+    content.get_attribute.side_effect = ["<div>old</div>"] * 10 + ["<div>new</div>"] * 50
+    row.find_element.return_value = content
+
+    assert get_outer_html(row, ".//div") == "<div>old</div>"
+    assert wait_for_content_stable(row, ".//div", max_wait=2, quiet_period=0.05, previous_html="<div>old</div>") is content
+    assert content.get_attribute.call_count > 11
+
+def test_content_stable_returns_element_once_html_stops_changing():
+    row = MagicMock()
+    content = MagicMock()
+    content.get_attribute.side_effect = ["<div></div>", "<div>loaded</div>"] + ["<div>loaded</div>"] * 50
+    row.find_element.return_value = content
+
+    assert wait_for_content_stable(row, ".//div", max_wait=2, quiet_period=0.05) is content
+    row.find_element.assert_called_once()
+
+def test_content_stable_raises_when_element_never_appears():
+    row = MagicMock()
+    row.find_element.side_effect = NoSuchElementException("missing")
+
+    with pytest.raises(NoSuchElementException):
+        wait_for_content_stable(row, ".//div", max_wait=0.1, quiet_period=0.05)
+
+def test_url_change():
+    driver = MagicMock()
+    driver.current_url = "https://jade.io/page/1"
+    assert wait_for_url_change(driver, "https://jade.io/page/1", max_wait=0.1) is False
+
+    driver.current_url = "https://jade.io/page/2"
+    assert wait_for_url_change(driver, "https://jade.io/page/1", max_wait=0.1) is True
+
+def test_settle_after_step_uses_settle_xpath():
+    driver = MagicMock()
+    driver.find_elements.return_value = [1, 2]
+
+    assert settle_after_step(driver, {'settle_xpath': "//div", 'max_wait': 1}) is True
+    driver.execute_script.assert_not_called()
+
+def test_wait_report_records_waits_and_timeouts():
+    report = begin_wait_report("test journey")
+    driver = MagicMock()
+    driver.current_url = "same"
+
+    wait_for_url_change(driver, "same", max_wait=0.05)
+
+    assert get_wait_report() is report
+    assert report.wait_counts['url_change'] == 1
+    assert report.timeouts['url_change'] == 1
+    assert "url_change: 1 wait(s)" in report.summary()
+
+
+# --- End to end, in a real headless Chrome, against a page whose content arrives late ---
+
+LATE_LOADING_PAGE = Path(__file__).resolve().parent.parent / "fixtures" / "late_loading.html"
+
+
+@pytest.fixture(scope="module")
+def browser():
+    options = webdriver.ChromeOptions()
+    for argument in ("--headless", "--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu"):
+        options.add_argument(argument)
+    try:
+        driver = webdriver.Chrome(options=options)
+    except WebDriverException as e:
+        pytest.skip(f"Chrome is not available: {e.msg}")
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture
+def late_page(browser):
+    browser.get(LATE_LOADING_PAGE.as_uri())
+    return browser
+
+
+def test_real_page_element_count_waits_for_late_rows(late_page):
+    assert late_page.find_elements(By.XPATH, "//table[@id='results']//tr") == []
+
+    assert wait_for_element_count_stable(late_page, "//table[@id='results']//tr", max_wait=5, quiet_period=0.3) == 5
+
+def test_real_page_content_waits_for_late_tab(late_page):
+    content = wait_for_content_stable(late_page, "//div[@id='tab']/div[@class='content']/p", max_wait=5, quiet_period=0.2)
+
+    assert content.text == "Judgment loaded"
+
+def test_real_page_url_change(late_page):
+    start_url = late_page.current_url
+
+    assert wait_for_url_change(late_page, start_url, max_wait=5) is True
+    assert late_page.current_url.endswith("#page-2")
+
+def test_real_page_settles(late_page):
+    assert wait_for_page_settled(late_page, max_wait=5, quiet_period=0.2) is True
@@ -42,15 +42,19 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException,
 import json
 import time
 import re  # <-- MODIFICATION: Imported 're' for regular expressions
+import hashlib
 from sqlalchemy import text
 from datetime import datetime
 from urllib.parse import urljoin
 import boto3
+from botocore.exceptions import ClientError
 from utils.aws_utils import create_db_engine
+from utils.waits import DEFAULT_MAX_WAIT, begin_wait_report, get_outer_html, settle_after_step, wait_for_content_stable, wait_for_element_count_stable, wait_for_in_viewport, wait_for_url_change
 
 # --- Configuration ---
 MAX_RETRIES = 3
 S3_BUCKET = "legal-store"
+CONTENT_HASH_METADATA_KEY = "content-sha256" # Stored as x-amz-meta-content-sha256 on every tab upload
 
 # --- AWS Clients ---
 s3_client = boto3.client('s3')
@@ -146,14 +150,38 @@ def get_parent_url_details(engine, parent_url_id):
         print(f"  - FATAL ERROR: Could not query database: {e}")
     return None
 
-def save_content_to_s3(content, bucket, key):
+def save_content_to_s3(content, bucket, key, content_hash=None):
     try:
-        s3_client.put_object(Bucket=bucket, Key=key, Body=content, ContentType='text/html')
+        metadata = {CONTENT_HASH_METADATA_KEY: content_hash} if content_hash else {}
+        s3_client.put_object(Bucket=bucket, Key=key, Body=content, ContentType='text/html', Metadata=metadata)
         print(f"    - Successfully saved content to S3: s3://{bucket}/{key}")
     except Exception as e:
         print(f"    - ERROR: Failed to save to S3 bucket '{bucket}': {e}")
         raise
 
+def get_stored_content_hash(bucket, key):
+    """Returns the content hash saved in the metadata of s3://bucket/key, or None if the object or hash is missing."""
+    try:
+        response = s3_client.head_object(Bucket=bucket, Key=key)
+        return response.get('Metadata', {}).get(CONTENT_HASH_METADATA_KEY)
+    except ClientError as e:
+        if e.response['Error']['Code'] not in ('404', 'NoSuchKey'):
+            print(f"    - WARNING: Could not read the stored hash of s3://{bucket}/{key}: {e}")
+        return None
+
+def save_content_if_changed(content, bucket, key, is_new_record=False):
+    """
+    Uploads a tab's HTML only if it differs from the copy already in S3, so unchanged tabs
+    do not re-trigger downstream enrichment. Returns True if the content was uploaded.
+    A record inserted by this run has nothing in S3 yet, so its tabs are uploaded without a lookup.
+    """
+    content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    if not is_new_record and get_stored_content_hash(bucket, key) == content_hash:
+        print(f"    - Unchanged since the last run, skipping upload: s3://{bucket}/{key}")
+        return False
+    save_content_to_s3(content, bucket, key, content_hash=content_hash)
+    return True
+
 def save_record_and_get_id(engine, data, parent_url_id, navigation_path, table):
     book_name_to_check = data.get('book_name')
     book_context_to_check = data.get('book_context')
@@ -188,6 +216,17 @@ def save_record_and_get_id(engine, data, parent_url_id, navigation_path, table):
         print(f"    - FATAL ERROR during database check or insert: {e}")
         raise
 
+def get_existing_record_id(engine, data, table):
+    """Returns the id of the record matching the row's book_name and book_context, or None."""
+    try:
+        with engine.connect() as connection:
+            find_query = text(f"SELECT id FROM {table} WHERE book_name = :book_name AND book_context = :book_context")
+            result = connection.execute(find_query, {"book_name": data.get('book_name'), "book_context": data.get('book_context')}).fetchone()
+            return result[0] if result else None
+    except Exception as e:
+        print(f"    - FATAL ERROR while looking up existing record: {e}")
+        raise
+
 def scrape_page_details_and_save(driver, config, db_engine, parent_url_id, nav_path_parts, job_state):
     wait = WebDriverWait(driver, 20)
     try:
@@ -197,6 +236,8 @@ def scrape_page_details_and_save(driver, config, db_engine, parent_url_id, nav_p
         print("  - No result rows found on this page.")
         return True
     records_processed_this_page = 0
+    # With refresh_existing, tabs of records saved on earlier runs are re-read too; unchanged ones are not re-uploaded.
+    refresh_existing = config.get('content_tabs', {}).get('refresh_existing', False)
     for i, row in enumerate(rows):
         try:
             row_data = {}
@@ -208,16 +249,23 @@ def scrape_page_details_and_save(driver, config, db_engine, parent_url_id, nav_p
                     row_data[col['name']] = None
             human_readable_path = "/".join(nav_path_parts)
             record_id = save_record_and_get_id(db_engine, row_data, parent_url_id, human_readable_path, config['destination_table'])
-            if not record_id: continue
+            is_new_record = record_id is not None
+            if not is_new_record:
+                if not refresh_existing: continue
+                record_id = get_existing_record_id(db_engine, row_data, config['destination_table'])
+                if not record_id: continue
             jurisdiction_folder = config.get("jurisdiction_folder_name", "unknown_jurisdiction")
             #jurisdiction_folder = nav_path_parts[2].lower().replace(" ", "_")
             base_s3_path = f"case-laws/{jurisdiction_folder}/{record_id}"
             for tab in config['content_tabs']['tabs']:
                 try:
                     tab_button = row.find_element(By.XPATH, tab['click_xpath'])
+                    # The container may already hold a placeholder or the previous tab's content.
+                    previous_html = get_outer_html(row, tab['content_xpath'])
                     driver.execute_script("arguments[0].click();", tab_button)
-                    time.sleep(3)
-                    content_container = row.find_element(By.XPATH, tab['content_xpath'])
+                    content_container = wait_for_content_stable(
+                        row, tab['content_xpath'], config['content_tabs'].get('max_wait', DEFAULT_MAX_WAIT), previous_html=previous_html
+                    )
                     content_html = content_container.get_attribute('outerHTML')
                     
                     # <-- START MODIFICATION -->
@@ -230,13 +278,19 @@ def scrape_page_details_and_save(driver, config, db_engine, parent_url_id, nav_p
                     # <-- END MODIFICATION -->
 
                     s3_key = f"{base_s3_path}/{tab['name'].lower()}.html"
-                    save_content_to_s3(content_html, config['s3_bucket'], s3_key)
+                    if save_content_if_changed(content_html, config['s3_bucket'], s3_key, is_new_record=is_new_record):
+                        job_state['tabs_changed'] = job_state.get('tabs_changed', 0) + 1
+                    else:
+                        job_state['tabs_unchanged'] = job_state.get('tabs_unchanged', 0) + 1
                 except NoSuchElementException:
                     print(f"    - WARNING: Could not find tab button or content for '{tab['name']}' in row {i+1}. Skipping.")
                 except Exception as e:
                     print(f"    - ERROR: An unexpected error occurred while processing tab '{tab['name']}': {e}")
             records_processed_this_page += 1
-            job_state['records_saved'] += 1
+            if is_new_record:
+                job_state['records_saved'] += 1
+            else:
+                job_state['records_refreshed'] = job_state.get('records_refreshed', 0) + 1
         except StaleElementReferenceException:
             print(f"  - ERROR: Stale element reference on row {i+1}. Re-finding rows and retrying this page.")
             return "retry_page"
@@ -264,15 +318,14 @@ def process_and_paginate(driver, step_config, db_engine, parent_url_id, nav_path
 
             next_button = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, step_config['next_page_xpath'])))
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
-            time.sleep(0.5)
+            wait_for_in_viewport(driver, next_button)
             driver.execute_script("arguments[0].click();", next_button)
-            
-            time.sleep(2) 
 
-            if driver.current_url == last_url:
+            if not wait_for_url_change(driver, last_url, step_config.get('max_wait')):
                 print("  - URL did not change after clicking 'Next'. Reached the end of pagination.")
                 break
 
+            wait_for_element_count_stable(driver, scraping_config['row_xpath'], step_config.get('max_wait'))
             page_num += 1
 
         except (TimeoutException, StaleElementReferenceException, ElementClickInterceptedException, ElementNotInteractableException):
@@ -296,17 +349,17 @@ def process_navigation_loop(driver, step, db_engine, parent_url_id, nav_path_par
             link_to_click = current_nav_links[i]
             link_text = link_to_click.text.strip()
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", link_to_click)
-            time.sleep(0.5)
+            wait_for_in_viewport(driver, link_to_click)
             driver.execute_script("arguments[0].click();", link_to_click)
             wait.until(EC.presence_of_element_located((By.XPATH, "//p[@class='breadcrumb' and contains(text(), 'Search results')]")))
-            time.sleep(2)
+            settle_after_step(driver, step)
             item_path_parts = nav_path_parts + [link_text]
             for loop_step in step['loop_steps']:
                 if not process_step(driver, loop_step, db_engine, parent_url_id, item_path_parts, job_state, journey_state):
                     raise Exception(f"Step failed for navigation item '{link_text}'")
             driver.back()
             wait.until(EC.presence_of_element_located((By.XPATH, "//h3[normalize-space()='Case Law']")))
-            time.sleep(1)
+            settle_after_step(driver, step)
             journey_state['last_completed_index'] = i
         except Exception as e:
             raise e
@@ -320,9 +373,9 @@ def process_step(driver, step, db_engine, parent_url_id, nav_path_parts, job_sta
         try:
             element = wait.until(EC.element_to_be_clickable((By.XPATH, step['target']['value'])))
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-            time.sleep(0.5)
+            wait_for_in_viewport(driver, element)
             driver.execute_script("arguments[0].click();", element)
-            time.sleep(1)
+            settle_after_step(driver, step)
         except TimeoutException:
             print(f"  - INFO: Element for '{step['description']}' not found or not clickable. Might be optional. Continuing.")
         return True
@@ -347,12 +400,13 @@ def run_crawler(parent_url_id, sitemap_file_name):
     job_name = f"crawling-jade-{parent_url_id}"
     audit_log_id = create_audit_log_entry(db_engine, job_name)
     if not audit_log_id: return
-    job_state = {'records_saved': 0}
+    job_state = {'records_saved': 0, 'records_refreshed': 0, 'tabs_changed': 0, 'tabs_unchanged': 0}
     final_status, final_error_message = 'success', ""
     for i, journey in enumerate(config['crawler_config']['journeys']):
         retries = 0
         journey_succeeded = False
         journey_state = {'last_completed_index': -1}
+        wait_report = begin_wait_report(journey.get('journey_id', journey['description']))
         while retries <= MAX_RETRIES and not journey_succeeded:
             driver = None
             try:
@@ -377,7 +431,13 @@ def run_crawler(parent_url_id, sitemap_file_name):
                     time.sleep(5)
             finally:
                 if driver: driver.quit()
-    message = f"Successfully processed {job_state['records_saved']} new records."
+        print(f"\n{wait_report.summary()}")
+    change_summary = (
+        f"{job_state['tabs_changed']} tab(s) changed since the last run, {job_state['tabs_unchanged']} unchanged and not re-uploaded"
+        f" ({job_state['records_refreshed']} existing record(s) re-checked)."
+    )
+    print(f"\n{change_summary}")
+    message = f"Successfully processed {job_state['records_saved']} new records. {change_summary}"
     if final_status == 'failed':
         message = f"Job failed. Processed {job_state['records_saved']} records. Errors: {final_error_message}"
     update_audit_log_entry(db_engine, audit_log_id, final_status, message)
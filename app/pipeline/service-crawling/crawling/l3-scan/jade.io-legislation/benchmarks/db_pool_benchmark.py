@@ -0,0 +1,123 @@
+"""
+Micro-benchmark for the L3 database layer: one connection per call (the previous db_utils)
+versus the pooled connections and batched status updates in utils/db_utils.py.
+
+For every record it claims the row (lock_record) and writes a scan result, like a worker does,
+and reports server-side connections opened per record and the average per-record latency.
+
+Run against a local MySQL, e.g.:
+    docker run -d --name l3-bench -e MYSQL_ROOT_PASSWORD=bench -e MYSQL_DATABASE=bench -p 3306:3306 mysql:8
+    BENCH_DB_PASSWORD=bench python benchmarks/db_pool_benchmark.py --records 500
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+import mysql.connector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import db_utils  # noqa: E402
+
+
+TABLE = "l3_pool_benchmark"
+
+
+def connection_settings():
+    return {
+        'host': os.getenv('BENCH_DB_HOST', '127.0.0.1'),
+        'port': os.getenv('BENCH_DB_PORT', '3306'),
+        'name': os.getenv('BENCH_DB_NAME', 'bench'),
+        'user': os.getenv('BENCH_DB_USER', 'root'),
+        'password': os.getenv('BENCH_DB_PASSWORD', ''),
+    }
+
+
+def connect(settings):
+    return mysql.connector.connect(host=settings['host'], port=settings['port'], database=settings['name'],
+                                   user=settings['user'], password=settings['password'])
+
+
+def server_connections(settings):
+    """Total connections the server has accepted so far."""
+    connection = connect(settings)
+    cursor = connection.cursor()
+    cursor.execute("SHOW GLOBAL STATUS LIKE 'Connections'")
+    value = int(cursor.fetchone()[1])
+    cursor.close()
+    connection.close()
+    return value
+
+
+def seed_table(settings, records):
+    connection = connect(settings)
+    cursor = connection.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(f"""
+        CREATE TABLE {TABLE} (
+            id VARCHAR(36) PRIMARY KEY, book_url TEXT, book_name TEXT,
+            l3_scan_status VARCHAR(20) NULL, l3_scan_error TEXT NULL, l3_scan_claimed_at DATETIME NULL,
+            size_miniviewer INT NULL, size_full_content INT NULL,
+            l3_scroll_count INT NULL, l3_load_seconds DECIMAL(8,2) NULL
+        )
+    """)
+    ids = [str(uuid.uuid4()) for _ in range(records)]
+    cursor.executemany(f"INSERT INTO {TABLE} (id, book_url, book_name) VALUES (%s, 'https://jade.io/x', 'Book')", [(i,) for i in ids])
+    connection.commit()
+    cursor.close()
+    connection.close()
+    return ids
+
+
+def legacy_record(settings, record_id):
+    """Previous behaviour: a fresh connection for the claim and another for the result."""
+    for query, params in (
+        (f"UPDATE {TABLE} SET l3_scan_status = 'in_progress', l3_scan_claimed_at = NOW() WHERE id = %s", (record_id,)),
+        (f"UPDATE {TABLE} SET l3_scan_status = 'pass', size_full_content = %s WHERE id = %s", (1024, record_id)),
+    ):
+        connection = connect(settings)
+        cursor = connection.cursor()
+        cursor.execute(query, params)
+        connection.commit()
+        cursor.close()
+        connection.close()
+
+
+def pooled_record(record_id):
+    db_utils.lock_record(TABLE, record_id)
+    db_utils.queue_scan_result(TABLE, record_id, 'pass', None, None, 1024)
+
+
+def measure(settings, ids, process):
+    before = server_connections(settings)
+    started = time.perf_counter()
+    for record_id in ids:
+        process(record_id)
+    db_utils.flush_scan_results()
+    seconds = time.perf_counter() - started
+    opened = server_connections(settings) - before - 1  # the 'after' probe itself opens one
+    return opened / len(ids), seconds / len(ids) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=500)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--status-batch-size", type=int, default=10)
+    args = parser.parse_args()
+
+    settings = connection_settings()
+    db_utils._db_config = dict(settings, pool_size=args.pool_size, status_batch_size=args.status_batch_size)
+
+    print(f"{'implementation':<16} | {'connections/record':>18} | {'ms/record':>9}")
+    legacy_ids = seed_table(settings, args.records)
+    conns, latency = measure(settings, legacy_ids, lambda record_id: legacy_record(settings, record_id))
+    print(f"{'per-call connect':<16} | {conns:>18.2f} | {latency:>9.2f}")
+
+    pooled_ids = seed_table(settings, args.records)
+    conns, latency = measure(settings, pooled_ids, pooled_record)
+    print(f"{'pooled + batched':<16} | {conns:>18.2f} | {latency:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
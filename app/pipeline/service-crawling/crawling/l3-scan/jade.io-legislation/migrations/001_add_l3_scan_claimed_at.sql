@@ -0,0 +1,21 @@
+-- Claim timestamps for the L3 workers: lock_record sets l3_scan_claimed_at on every claim and
+-- release_stale_claims frees records left 'in_progress' past crawler.claim_timeout_minutes.
+-- Run once per database before deploying the concurrent crawler; run_crawler refuses to start without it.
+
+ALTER TABLE l2_scan_jade_io_legislation_commonwealth ADD COLUMN l3_scan_claimed_at DATETIME NULL;
+
+ALTER TABLE l2_scan_jade_io_legislation_nsw ADD COLUMN l3_scan_claimed_at DATETIME NULL;
+
+ALTER TABLE l2_scan_jade_io_legislation_act ADD COLUMN l3_scan_claimed_at DATETIME NULL;
+
+ALTER TABLE l2_scan_jade_io_legislation_vic ADD COLUMN l3_scan_claimed_at DATETIME NULL;
+
+ALTER TABLE l2_scan_jade_io_legislation_qld ADD COLUMN l3_scan_claimed_at DATETIME NULL;
+
+ALTER TABLE l2_scan_jade_io_legislation_sa ADD COLUMN l3_scan_claimed_at DATETIME NULL;
+
+ALTER TABLE l2_scan_jade_io_legislation_wa ADD COLUMN l3_scan_claimed_at DATETIME NULL;
+
+ALTER TABLE l2_scan_jade_io_legislation_tas ADD COLUMN l3_scan_claimed_at DATETIME NULL;
+
+ALTER TABLE l2_scan_jade_io_legislation_nt ADD COLUMN l3_scan_claimed_at DATETIME NULL;
@@ -0,0 +1,20 @@
+-- Page-load metrics of the L3 scrape: how many scrolls the book needed and how long it took to load.
+-- Optional: update_scan_result and flush_scan_results only write them to tables that have both columns.
+
+ALTER TABLE l2_scan_jade_io_legislation_commonwealth ADD COLUMN l3_scroll_count INT NULL, ADD COLUMN l3_load_seconds DECIMAL(8,2) NULL;
+
+ALTER TABLE l2_scan_jade_io_legislation_nsw ADD COLUMN l3_scroll_count INT NULL, ADD COLUMN l3_load_seconds DECIMAL(8,2) NULL;
+
+ALTER TABLE l2_scan_jade_io_legislation_act ADD COLUMN l3_scroll_count INT NULL, ADD COLUMN l3_load_seconds DECIMAL(8,2) NULL;
+
+ALTER TABLE l2_scan_jade_io_legislation_vic ADD COLUMN l3_scroll_count INT NULL, ADD COLUMN l3_load_seconds DECIMAL(8,2) NULL;
+
+ALTER TABLE l2_scan_jade_io_legislation_qld ADD COLUMN l3_scroll_count INT NULL, ADD COLUMN l3_load_seconds DECIMAL(8,2) NULL;
+
+ALTER TABLE l2_scan_jade_io_legislation_sa ADD COLUMN l3_scroll_count INT NULL, ADD COLUMN l3_load_seconds DECIMAL(8,2) NULL;
+
+ALTER TABLE l2_scan_jade_io_legislation_wa ADD COLUMN l3_scroll_count INT NULL, ADD COLUMN l3_load_seconds DECIMAL(8,2) NULL;
+
+ALTER TABLE l2_scan_jade_io_legislation_tas ADD COLUMN l3_scroll_count INT NULL, ADD COLUMN l3_load_seconds DECIMAL(8,2) NULL;
+
+ALTER TABLE l2_scan_jade_io_legislation_nt ADD COLUMN l3_scroll_count INT NULL, ADD COLUMN l3_load_seconds DECIMAL(8,2) NULL;
@@ -1,19 +1,30 @@
 import logging
 import os
+import queue
+import threading
+import time
 from utils.config_loader import load_config
-from utils.db_utils import get_urls_to_crawl, update_scan_result
-from utils.scraper import scrape_content, upload_to_s3, get_s3_object_size
+from utils.db_utils import flush_scan_results, get_table_columns, get_urls_to_crawl, lock_record, queue_scan_result, release_stale_claims
+from utils.s3_utils import get_s3_object_size, upload_to_s3
+from utils.scraper import get_webdriver, is_driver_alive, quit_driver, scrape_content
 
-def process_record(record, s3_config, table_name, subfolder_name):
+DEFAULT_WORKERS = 1
+DEFAULT_CLAIM_TIMEOUT_MINUTES = 60
+CLAIM_COLUMN = 'l3_scan_claimed_at'
+CLAIM_COLUMN_MIGRATION = 'migrations/001_add_l3_scan_claimed_at.sql'
+
+def process_record(record, s3_config, table_name, subfolder_name, driver=None, handle_popups=True):
     """
-    Processes a single record sequentially: scrapes, validates, uploads, 
+    Processes a single record: scrapes, validates, uploads, 
     and updates status with errors and file sizes.
+    Reuses `driver` when given. Returns True if the record passed, False otherwise.
     """
     record_id = record.get('id')
     url = record.get('book_url')
     book_name = record.get('book_name', 'Unknown Title')
     
     baseline_size, scraped_size = None, None
+    metrics = {}
 
     s3_bucket = s3_config.get('bucket_name')
     output_filename = s3_config.get('output_filename')
@@ -23,62 +34,147 @@ def process_record(record, s3_config, table_name, subfolder_name):
     if not all([url, record_id, s3_bucket, output_filename, baseline_filename]):
         error_msg = f"Skipping record due to missing config data: ID={record_id}"
         logging.warning(error_msg)
-        update_scan_result(table_name, record_id, 'fail', error_msg, baseline_size, scraped_size)
-        return
+        queue_scan_result(table_name, record_id, 'fail', error_msg, baseline_size, scraped_size, **metrics)
+        return False
 
     try:
         logging.info(f"STARTING scrape for '{book_name}' (ID: {record_id})")
-        content = scrape_content(url)
+        content = scrape_content(url, driver=driver, handle_popups=handle_popups, metrics=metrics)
 
         if not content:
             error_msg = "Scraping returned no content."
             logging.error(f"FAILED to scrape: {error_msg} for '{book_name}' (ID: {record_id})")
-            update_scan_result(table_name, record_id, 'fail', error_msg, baseline_size, scraped_size)
-            return
+            queue_scan_result(table_name, record_id, 'fail', error_msg, baseline_size, scraped_size, **metrics)
+            return False
         
         # --- ALWAYS CALCULATE FILE SIZES FOR LOGGING ---
-        scraped_size = len(content.encode('utf-8'))
+        # Sizes of existing objects come from one cached listing of the subfolder, not a HEAD per record.
+        content = content.encode('utf-8')
+        scraped_size = len(content)
+        s3_prefix = f"{subfolder_name}/"
         baseline_s3_key = f"{subfolder_name}/{record_id}/{baseline_filename}"
-        baseline_size = get_s3_object_size(s3_bucket, baseline_s3_key)
+        baseline_size = get_s3_object_size(s3_bucket, baseline_s3_key, prefix=s3_prefix)
         
         # --- OPTIONALLY VALIDATE CONTENT SIZE ---
         if should_validate_size:
             if baseline_size == -1:
                 error_msg = f"Could not retrieve baseline file '{baseline_s3_key}' from S3 for validation."
                 logging.error(f"{error_msg} for '{book_name}' (ID: {record_id})")
-                update_scan_result(table_name, record_id, 'fail', error_msg, baseline_size, scraped_size)
-                return
+                queue_scan_result(table_name, record_id, 'fail', error_msg, baseline_size, scraped_size, **metrics)
+                return False
 
             logging.info(f"Scraped size: {scraped_size} bytes, Baseline size: {baseline_size} bytes for '{book_name}'")
 
             if scraped_size <= baseline_size:
                 error_msg = f"Scraped content size ({scraped_size} bytes) is not greater than baseline ({baseline_size} bytes)."
                 logging.error(f"VALIDATION FAILED for '{book_name}' (ID: {record_id}): {error_msg}")
-                update_scan_result(table_name, record_id, 'fail', error_msg, baseline_size, scraped_size)
-                return
+                queue_scan_result(table_name, record_id, 'fail', error_msg, baseline_size, scraped_size, **metrics)
+                return False
         else:
             logging.info("Content size validation is disabled. Skipping.")
             
         # --- UPLOAD TO S3 ---
         s3_key = f"{subfolder_name}/{record_id}/{output_filename}"
-        success = upload_to_s3(content, s3_bucket, s3_key)
+        success = upload_to_s3(content, s3_bucket, s3_key, prefix=s3_prefix)
         
         if success:
-            update_scan_result(table_name, record_id, 'pass', None, baseline_size, scraped_size)
+            queue_scan_result(table_name, record_id, 'pass', None, baseline_size, scraped_size, **metrics)
             logging.info(f"SUCCESS scraping and uploading '{book_name}' (ID: {record_id})")
+            return True
         else:
             error_msg = "Failed to upload content to S3."
             logging.error(f"UPLOAD FAILED for '{book_name}' (ID: {record_id})")
-            update_scan_result(table_name, record_id, 'fail', error_msg, baseline_size, scraped_size)
+            queue_scan_result(table_name, record_id, 'fail', error_msg, baseline_size, scraped_size, **metrics)
+            return False
 
     except Exception as e:
         error_msg = f"An unexpected error occurred: {str(e)}"
         logging.error(f"CRITICAL FAILURE for '{book_name}' (ID: {record_id}): {error_msg}", exc_info=True)
-        update_scan_result(table_name, record_id, 'fail', error_msg, baseline_size, scraped_size)
+        queue_scan_result(table_name, record_id, 'fail', error_msg, baseline_size, scraped_size, **metrics)
+        return False
+
+
+
+
+def run_worker(records, s3_config, table_name, subfolder_name, stats):
+    """
+    Worker loop: keeps one browser open, claims records from the shared queue through
+    `lock_record` and processes them until the queue is empty.
+    Records claimed by another worker or container are skipped.
+    """
+    driver = None
+    handle_popups = True
+    started = time.monotonic()
+    try:
+        while True:
+            try:
+                record = records.get_nowait()
+            except queue.Empty:
+                break
+
+            record_id = record.get('id')
+            if not lock_record(table_name, record_id):
+                stats['skipped'] += 1
+                continue
+
+            if driver is None or not is_driver_alive(driver):
+                if driver is not None:
+                    logging.warning(f"Browser is no longer responding. Starting a new one.")
+                    quit_driver(driver)
+                driver = get_webdriver()
+                handle_popups = True
+                if driver is None:
+                    queue_scan_result(table_name, record_id, 'fail', "Could not start a browser for this record.")
+                    stats['failed'] += 1
+                    continue
+
+            try:
+                succeeded = process_record(record, s3_config, table_name, subfolder_name, driver=driver, handle_popups=handle_popups)
+                handle_popups = False
+            except Exception as exc:
+                logging.error(f'A critical error occurred while processing record {record_id}: {exc}', exc_info=True)
+                succeeded = False
+            stats['passed' if succeeded else 'failed'] += 1
+    finally:
+        if driver is not None:
+            quit_driver(driver)
+        stats['seconds'] = time.monotonic() - started
+
+
+def log_worker_throughput(jurisdiction, worker_stats):
+    """Logs how many records each worker processed and its records-per-minute rate."""
+    for worker_name, stats in worker_stats.items():
+        processed = stats['passed'] + stats['failed']
+        per_minute = processed / stats['seconds'] * 60 if stats['seconds'] else 0.0
+        logging.info(
+            f"[{worker_name}] {jurisdiction}: {processed} processed ({stats['passed']} passed, {stats['failed']} failed), "
+            f"{stats['skipped']} skipped as claimed elsewhere, {stats['seconds']:.0f}s, {per_minute:.1f} records/min"
+        )
+
+
+def check_claim_column(table_names):
+    """
+    Returns True if every table has the claim column that `lock_record` sets. Without it every
+    claim fails, so the crawler would start workers that scrape nothing.
+    """
+    ready = True
+    for table_name in table_names:
+        columns = get_table_columns(table_name)
+        if columns is None:
+            logging.error(f"Could not read the columns of {table_name}.")
+            ready = False
+        elif CLAIM_COLUMN not in columns:
+            logging.error(f"{table_name} has no {CLAIM_COLUMN} column. Apply {CLAIM_COLUMN_MIGRATION} first.")
+            ready = False
+    return ready
 
 
 def run_crawler():
-    """Main function to run the web crawler sequentially."""
+    """
+    Main function to run the web crawler.
+    Each enabled table is processed by `crawler.workers` threads, each with its own long-lived browser.
+    Records are claimed atomically, so several containers can crawl the same tables without double-scraping.
+    """
     config = load_config()
 
     s3_config = config.get('s3', {})
@@ -86,7 +182,16 @@ def run_crawler():
         logging.error("S3 bucket name not found in configuration. Exiting.")
         return
 
-    logging.info("Running the crawler in sequential mode.")
+    crawler_config = config.get('crawler') or {}
+    workers = max(1, int(crawler_config.get('workers', DEFAULT_WORKERS)))
+    claim_timeout_minutes = int(crawler_config.get('claim_timeout_minutes', DEFAULT_CLAIM_TIMEOUT_MINUTES))
+
+    enabled_tables = [t.get('table_name') for t in config.get('tables_to_crawl', []) if t.get('enabled') and t.get('table_name')]
+    if not check_claim_column(enabled_tables):
+        logging.error("The database schema is not ready for the crawler. Exiting.")
+        return
+
+    logging.info(f"Running the crawler with {workers} worker(s).")
 
     for table_info in config.get('tables_to_crawl', []):
         if table_info.get('enabled'):
@@ -99,19 +204,33 @@ def run_crawler():
                 continue
 
             logging.info(f"--- Processing Jurisdiction: {jurisdiction} (Table: {table_name}) ---")
-            
+
+            release_stale_claims(table_name, claim_timeout_minutes)
             records_to_crawl = get_urls_to_crawl(table_name)
             
             if not records_to_crawl:
                 logging.info(f"No new records to crawl for {jurisdiction}.")
                 continue
 
-            logging.info(f"Found {len(records_to_crawl)} records to process for {jurisdiction}. Starting sequential crawl...")
+            logging.info(f"Found {len(records_to_crawl)} records to process for {jurisdiction}. Starting {workers} worker(s)...")
 
-            # --- PROCESS RECORDS ONE BY ONE ---
+            records = queue.Queue()
             for record in records_to_crawl:
-                try:
-                    process_record(record, s3_config, table_name, subfolder_name)
-                except Exception as exc:
-                    logging.error(f'A critical error occurred while processing record {record.get("id")}: {exc}', exc_info=True)
-
+                records.put(record)
+
+            worker_stats = {}
+            threads = []
+            for n in range(min(workers, len(records_to_crawl))):
+                worker_name = f"worker-{n + 1}"
+                worker_stats[worker_name] = {'passed': 0, 'failed': 0, 'skipped': 0, 'seconds': 0.0}
+                thread = threading.Thread(
+                    target=run_worker, name=worker_name,
+                    args=(records, s3_config, table_name, subfolder_name, worker_stats[worker_name])
+                )
+                thread.start()
+                threads.append(thread)
+            for thread in threads:
+                thread.join()
+            flush_scan_results()
+
+            log_worker_throughput(jurisdiction, worker_stats)
@@ -0,0 +1,39 @@
+from unittest.mock import patch
+
+from src import crawler
+
+
+def test_check_claim_column_accepts_migrated_tables():
+    with patch.object(crawler, "get_table_columns", return_value={"id", "l3_scan_status", "l3_scan_claimed_at"}):
+        assert crawler.check_claim_column(["l2_scan_jade_io_legislation_nsw"])
+
+
+def test_check_claim_column_rejects_table_without_claim_column():
+    columns = {
+        "l2_scan_jade_io_legislation_nsw": {"id", "l3_scan_status", "l3_scan_claimed_at"},
+        "l2_scan_jade_io_legislation_act": {"id", "l3_scan_status"},
+    }
+    with patch.object(crawler, "get_table_columns", side_effect=columns.get):
+        assert not crawler.check_claim_column(list(columns))
+
+
+def test_check_claim_column_rejects_unreadable_table():
+    with patch.object(crawler, "get_table_columns", return_value=None):
+        assert not crawler.check_claim_column(["l2_scan_jade_io_legislation_nsw"])
+
+
+def test_run_crawler_exits_before_claiming_when_claim_column_is_missing():
+    config = {
+        "s3": {"bucket_name": "bucket"},
+        "tables_to_crawl": [
+            {"table_name": "l2_scan_jade_io_legislation_nsw", "subfolder_name": "nsw", "enabled": True},
+        ],
+    }
+    with patch.object(crawler, "load_config", return_value=config), \
+            patch.object(crawler, "get_table_columns", return_value={"id", "l3_scan_status"}), \
+            patch.object(crawler, "release_stale_claims") as release_stale_claims, \
+            patch.object(crawler, "get_urls_to_crawl") as get_urls_to_crawl:
+        crawler.run_crawler()
+
+    release_stale_claims.assert_not_called()
+    get_urls_to_crawl.assert_not_called()
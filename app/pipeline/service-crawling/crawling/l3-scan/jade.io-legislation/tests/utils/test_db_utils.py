@@ -0,0 +1,86 @@
+import pytest
+from unittest.mock import MagicMock
+
+from utils import db_utils
+
+TABLE = "l2_scan_jade_io_legislation_nsw"
+BASE_COLUMNS = {"id", "book_url", "l3_scan_status", "l3_scan_error", "size_miniviewer", "size_full_content", "l3_scan_claimed_at"}
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    """A mock pooled connection; every cursor it hands out is recorded in `connection.cursors`."""
+    connection = MagicMock()
+    connection.cursors = []
+
+    def cursor(**kwargs):
+        cursor = MagicMock()
+        connection.cursors.append(cursor)
+        return cursor
+
+    connection.cursor.side_effect = cursor
+    monkeypatch.setattr(db_utils, "get_db_connection", lambda: connection)
+    monkeypatch.setattr(db_utils, "_metric_tables", {})
+    monkeypatch.setattr(db_utils, "_pending_results", [])
+    return connection
+
+
+def with_columns(monkeypatch, columns):
+    monkeypatch.setattr(db_utils, "get_table_columns", lambda table_name: columns)
+
+
+def test_update_scan_result_writes_metrics_when_columns_exist(monkeypatch, connection):
+    with_columns(monkeypatch, BASE_COLUMNS | {"l3_scroll_count", "l3_load_seconds"})
+
+    db_utils.update_scan_result(TABLE, 7, "pass", None, 10, 20, scroll_count=4, load_seconds=3.5)
+
+    query, params = connection.cursors[0].execute.call_args.args
+    assert "l3_scroll_count = %s" in query and "l3_load_seconds = %s" in query
+    assert params == ("pass", None, 10, 20, 4, 3.5, 7)
+
+
+def test_update_scan_result_skips_metrics_without_columns(monkeypatch, connection):
+    with_columns(monkeypatch, BASE_COLUMNS)
+
+    db_utils.update_scan_result(TABLE, 7, "pass", None, 10, 20, scroll_count=4, load_seconds=3.5)
+
+    query, params = connection.cursors[0].execute.call_args.args
+    assert "l3_scroll_count" not in query and "l3_load_seconds" not in query
+    assert params == ("pass", None, 10, 20, 7)
+    connection.commit.assert_called_once()
+
+
+def test_flush_scan_results_writes_metrics_per_table(monkeypatch, connection):
+    migrated = "l2_scan_jade_io_legislation_act"
+    columns = {TABLE: BASE_COLUMNS, migrated: BASE_COLUMNS | {"l3_scroll_count", "l3_load_seconds"}}
+    monkeypatch.setattr(db_utils, "get_table_columns", columns.get)
+
+    db_utils._pending_results.extend([
+        (TABLE, 1, "pass", None, 10, 20, 4, 3.5),
+        (migrated, 2, "fail", "Timed out", None, None, 2, 1.25),
+    ])
+    db_utils.flush_scan_results()
+
+    calls = {params[0][-1]: (query, params) for query, params in (c.args for c in connection.cursors[0].executemany.call_args_list)}
+    assert "l3_scroll_count" not in calls[1][0]
+    assert calls[1][1] == [("pass", None, 10, 20, 1)]
+    assert "l3_scroll_count = %s" in calls[2][0]
+    assert calls[2][1] == [("fail", "Timed out", None, None, 2, 1.25, 2)]
+    connection.commit.assert_called_once()
+
+
+def test_has_metric_columns_reads_columns_once_per_table(monkeypatch, connection):
+    lookups = []
+    monkeypatch.setattr(db_utils, "get_table_columns", lambda table_name: lookups.append(table_name) or BASE_COLUMNS)
+
+    assert not db_utils.has_metric_columns(TABLE)
+    assert not db_utils.has_metric_columns(TABLE)
+    assert lookups == [TABLE]
+
+
+def test_has_metric_columns_retries_unreadable_table(monkeypatch, connection):
+    with_columns(monkeypatch, None)
+    assert not db_utils.has_metric_columns(TABLE)
+
+    with_columns(monkeypatch, BASE_COLUMNS | {"l3_scroll_count", "l3_load_seconds"})
+    assert db_utils.has_metric_columns(TABLE)
@@ -0,0 +1,93 @@
+import boto3
+import pytest
+from collections import Counter
+from boto3.s3.transfer import TransferConfig
+from moto import mock_aws
+
+from utils import s3_utils
+from utils.s3_utils import get_s3_client, get_s3_object_size, upload_to_s3
+
+BUCKET = "test-bucket"
+PREFIX = "legislation/nsw/"
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """
+    Starts a mock S3 with a bucket holding a miniviewer baseline for records 1-5, and counts
+    every S3 API call the shared client makes by operation name.
+    """
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        s3_utils.reset_s3_client()
+        setup = boto3.client("s3", region_name="us-east-1")
+        setup.create_bucket(Bucket=BUCKET)
+        for record_id in range(1, 6):
+            setup.put_object(Bucket=BUCKET, Key=f"{PREFIX}{record_id}/miniviewer.html", Body=b"x" * record_id)
+
+        calls = Counter()
+        get_s3_client().meta.events.register(
+            "before-call.s3.*", lambda model, **kwargs: calls.update([model.name])
+        )
+        yield calls
+        s3_utils.reset_s3_client()
+
+
+def process(record_id, content):
+    """Mirrors the S3 steps of crawler.process_record for one record."""
+    baseline_size = get_s3_object_size(BUCKET, f"{PREFIX}{record_id}/miniviewer.html", prefix=PREFIX)
+    uploaded = upload_to_s3(content, BUCKET, f"{PREFIX}{record_id}/full_book_content.html", prefix=PREFIX)
+    return baseline_size, uploaded
+
+
+def test_one_put_per_record_and_one_listing_per_table(s3):
+    """
+    Each record costs one PutObject; baseline sizes come from a single listing instead of a HeadObject each.
+    """
+    for record_id in range(1, 6):
+        assert process(record_id, f"<html>{record_id}</html>") == (record_id, True)
+
+    assert s3 == Counter({"ListObjectsV2": 1, "PutObject": 5})
+
+
+def test_unchanged_book_is_not_uploaded_again(s3):
+    """
+    Re-processing a record with identical content is answered from the cached listing.
+    """
+    process(1, "<html>same</html>")
+    s3.clear()
+
+    assert process(1, "<html>same</html>") == (1, True)
+    assert s3 == Counter()
+
+    assert process(1, "<html>changed</html>") == (1, True)
+    assert s3 == Counter({"PutObject": 1})
+
+
+def test_missing_baseline_falls_back_to_head_object(s3):
+    """
+    A key that is not in the listing is checked with one HeadObject and reported as -1.
+    """
+    assert get_s3_object_size(BUCKET, f"{PREFIX}99/miniviewer.html", prefix=PREFIX) == -1
+    assert s3 == Counter({"ListObjectsV2": 1, "HeadObject": 1})
+
+
+def test_large_book_is_uploaded_in_parts(s3, monkeypatch):
+    """
+    Content above the multipart threshold is streamed up with a multipart upload.
+    """
+    monkeypatch.setattr(s3_utils, "MULTIPART_THRESHOLD", 5 * 1024 * 1024)
+    monkeypatch.setattr(s3_utils, "TRANSFER_CONFIG", TransferConfig(
+        multipart_threshold=5 * 1024 * 1024, multipart_chunksize=5 * 1024 * 1024, use_threads=False
+    ))
+    content = "a" * (11 * 1024 * 1024)
+
+    assert upload_to_s3(content, BUCKET, f"{PREFIX}1/full_book_content.html", prefix=PREFIX) is True
+    assert s3["CreateMultipartUpload"] == 1
+    assert s3["UploadPart"] == 3
+    assert s3["PutObject"] == 0
+
+    body = get_s3_client().get_object(Bucket=BUCKET, Key=f"{PREFIX}1/full_book_content.html")["Body"].read()
+    assert len(body) == len(content)
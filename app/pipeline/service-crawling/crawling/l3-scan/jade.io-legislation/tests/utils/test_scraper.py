@@ -0,0 +1,32 @@
+import os
+import tempfile
+from unittest.mock import MagicMock
+
+from utils.scraper import quit_driver
+
+
+def make_driver(quit_error=None):
+    """A stand-in driver with a real temporary profile directory, as get_webdriver creates on Fargate."""
+    driver = MagicMock()
+    driver.quit.side_effect = quit_error
+    driver.user_data_dir = tempfile.mkdtemp(prefix='user-data-')
+    with open(os.path.join(driver.user_data_dir, "Local State"), "w") as f:
+        f.write("{}")
+    return driver
+
+
+def test_quit_driver_removes_profile_directory():
+    driver = make_driver()
+
+    quit_driver(driver)
+
+    driver.quit.assert_called_once()
+    assert not os.path.exists(driver.user_data_dir)
+
+
+def test_quit_driver_removes_profile_directory_of_crashed_browser():
+    driver = make_driver(quit_error=ConnectionRefusedError("browser is gone"))
+
+    quit_driver(driver)
+
+    assert not os.path.exists(driver.user_data_dir)
@@ -1,27 +1,140 @@
 import mysql.connector
+from mysql.connector import pooling
 import logging
+import threading
+import time
 from utils.config_loader import load_config
 
+DEFAULT_POOL_SIZE = 5
+DEFAULT_STATUS_BATCH_SIZE = 1
+POOL_CHECKOUT_TIMEOUT = 30 # Seconds to wait for a free pooled connection before giving up
+METRIC_COLUMNS = ('l3_scroll_count', 'l3_load_seconds') # Added by migrations/002_add_l3_page_load_metrics.sql
+
+_db_config = None
+_pool = None
+_pool_lock = threading.Lock()
+
+_pending_results = []
+_pending_results_lock = threading.Lock()
+
+_metric_tables = {} # table_name -> whether it has METRIC_COLUMNS
+_metric_tables_lock = threading.Lock()
+
+def get_db_config():
+    """Returns the `database` section of the configuration, loaded once per process."""
+    global _db_config
+    if _db_config is None:
+        _db_config = load_config().get('database', {})
+    return _db_config
+
+def get_connection_pool():
+    """Creates the process-wide connection pool on first use, sized by `database.pool_size` in config.yaml."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            db_config = get_db_config()
+            _pool = pooling.MySQLConnectionPool(
+                pool_name="l3_scan",
+                pool_size=int(db_config.get('pool_size', DEFAULT_POOL_SIZE)),
+                pool_reset_session=True,
+                host=db_config.get('host'),
+                port=db_config.get('port'),
+                database=db_config.get('name'),
+                user=db_config.get('user'),
+                password=db_config.get('password')
+            )
+        return _pool
+
 def get_db_connection():
-    """Establishes a connection to the database using loaded credentials."""
-    config = load_config()
-    db_config = config.get('database', {})
-    
+    """
+    Checks a connection out of the process-wide pool. Waits for a free connection when all are
+    in use, and pings it (reconnecting if RDS dropped it while idle) before handing it out.
+    Callers return it to the pool with `connection.close()`.
+    """
+    deadline = time.monotonic() + POOL_CHECKOUT_TIMEOUT
+    while True:
+        try:
+            connection = get_connection_pool().get_connection()
+            break
+        except pooling.PoolError as e:
+            if time.monotonic() >= deadline:
+                logging.error(f"No pooled MySQL connection became available: {e}")
+                return None
+            time.sleep(0.1)
+        except mysql.connector.Error as e:
+            logging.error(f"Error while connecting to MySQL: {e}")
+            return None
+
+    try:
+        connection.ping(reconnect=True, attempts=3, delay=1)
+        return connection
+    except mysql.connector.Error as e:
+        logging.error(f"Pooled MySQL connection is unusable and could not reconnect: {e}")
+        connection.close()
+        return None
+
+def release_connection(connection, cursor=None):
+    """Closes the cursor and returns the connection to the pool, even if it is no longer connected."""
+    try:
+        if cursor is not None:
+            cursor.close()
+    except mysql.connector.Error:
+        pass
+    finally:
+        connection.close()
+
+def get_table_columns(table_name):
+    """
+    Returns the set of column names of `table_name` in the configured database,
+    or None if they could not be read.
+    """
+    connection = get_db_connection()
+    if connection is None:
+        return None
+
+    cursor = connection.cursor()
+    query = "SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+
     try:
-        connection = mysql.connector.connect(
-            host=db_config.get('host'),
-            port=db_config.get('port'),
-            database=db_config.get('name'),
-            user=db_config.get('user'),
-            password=db_config.get('password')
-        )
-        if connection.is_connected():
-            # This log can be noisy, so it's commented out. Uncomment for debugging.
-            # logging.info("Successfully connected to the database")
-            return connection
+        cursor.execute(query, (table_name,))
+        return {row[0] for row in cursor.fetchall()}
     except mysql.connector.Error as e:
-        logging.error(f"Error while connecting to MySQL: {e}")
+        logging.error(f"Error reading the columns of {table_name}: {e}")
         return None
+    finally:
+        release_connection(connection, cursor)
+
+def has_metric_columns(table_name):
+    """
+    Returns True if `table_name` has the page-load metric columns. Checked once per table;
+    a table whose columns could not be read is treated as not having them and checked again next time.
+    """
+    with _metric_tables_lock:
+        if table_name in _metric_tables:
+            return _metric_tables[table_name]
+
+    columns = get_table_columns(table_name)
+    if columns is None:
+        return False
+    present = all(column in columns for column in METRIC_COLUMNS)
+    if not present:
+        logging.warning(f"{table_name} has no page-load metric columns; scroll counts and load times will not be stored.")
+    with _metric_tables_lock:
+        _metric_tables[table_name] = present
+    return present
+
+def _scan_result_query(table_name, with_metrics):
+    """The UPDATE that stores a scan result, with the page-load metric columns if `with_metrics`."""
+    metric_assignments = "".join(f",\n                {column} = %s" for column in METRIC_COLUMNS) if with_metrics else ""
+    return f"""
+            UPDATE {table_name} 
+            SET 
+                l3_scan_status = %s, 
+                l3_scan_error = %s,
+                size_miniviewer = %s,
+                size_full_content = %s{metric_assignments}
+            WHERE id = %s
+        """
 
 def get_urls_to_crawl(table_name):
     """Fetches URLs and book names from a table where l3_scan_status is not 'pass'."""
@@ -41,9 +154,7 @@ def get_urls_to_crawl(table_name):
         logging.error(f"Error fetching records from {table_name}: {e}")
         return []
     finally:
-        if connection and connection.is_connected():
-            cursor.close()
-            connection.close()
+        release_connection(connection, cursor)
 
 def lock_record(table_name, record_id):
     """
@@ -59,7 +170,7 @@ def lock_record(table_name, record_id):
     try:
         query = f"""
             UPDATE {table_name}
-            SET l3_scan_status = 'in_progress'
+            SET l3_scan_status = 'in_progress', l3_scan_claimed_at = NOW()
             WHERE id = %s AND (l3_scan_status IS NULL OR l3_scan_status NOT IN ('pass', 'in_progress'))
         """
         params = (record_id,)
@@ -79,15 +190,49 @@ def lock_record(table_name, record_id):
         logging.error(f"Error locking record {record_id} in {table_name}: {e}")
         return False
     finally:
-        if connection and connection.is_connected():
-            cursor.close()
-            connection.close()
+        release_connection(connection, cursor)
+
+def release_stale_claims(table_name, timeout_minutes):
+    """
+    Releases records left 'in_progress' for longer than `timeout_minutes`, e.g. by a worker or
+    container that died mid-record, by marking them 'fail' so the next run claims them again.
+    Requires the `l3_scan_claimed_at` column added by migrations/001_add_l3_scan_claimed_at.sql,
+    which `lock_record` sets on every claim.
+    Returns the number of released records.
+    """
+    connection = get_db_connection()
+    if connection is None:
+        return 0
+
+    cursor = connection.cursor()
+    try:
+        query = f"""
+            UPDATE {table_name}
+            SET l3_scan_status = 'fail', l3_scan_error = %s
+            WHERE l3_scan_status = 'in_progress'
+              AND (l3_scan_claimed_at IS NULL OR l3_scan_claimed_at < NOW() - INTERVAL %s MINUTE)
+        """
+        params = (f"Claim expired after {timeout_minutes} minutes; released for retry.", timeout_minutes)
+        cursor.execute(query, params)
+        connection.commit()
 
+        if cursor.rowcount:
+            logging.warning(f"Released {cursor.rowcount} stale 'in_progress' claims in {table_name}.")
+        return cursor.rowcount
 
-def update_scan_result(table_name, record_id, status, error_message=None, size_miniviewer=None, size_full_content=None):
+    except mysql.connector.Error as e:
+        logging.error(f"Error releasing stale claims in {table_name}: {e}")
+        return 0
+    finally:
+        release_connection(connection, cursor)
+
+
+def update_scan_result(table_name, record_id, status, error_message=None, size_miniviewer=None, size_full_content=None, scroll_count=None, load_seconds=None):
     """
-    Updates the final scan status, error message, and file sizes for a given record.
+    Updates the final scan status, error message, file sizes and page-load metrics for a given record.
+    The metrics are only written if the table has their columns.
     """
+    with_metrics = has_metric_columns(table_name)
     connection = get_db_connection()
     if connection is None:
         return
@@ -98,16 +243,9 @@ def update_scan_result(table_name, record_id, status, error_message=None, size_m
         error_message = (error_message[:1024] + '...') if len(error_message) > 1024 else error_message
 
     try:
-        query = f"""
-            UPDATE {table_name} 
-            SET 
-                l3_scan_status = %s, 
-                l3_scan_error = %s,
-                size_miniviewer = %s,
-                size_full_content = %s
-            WHERE id = %s
-        """
-        params = (status, error_message, size_miniviewer, size_full_content, record_id)
+        query = _scan_result_query(table_name, with_metrics)
+        metrics = (scroll_count, load_seconds) if with_metrics else ()
+        params = (status, error_message, size_miniviewer, size_full_content, *metrics, record_id)
         
         cursor.execute(query, params)
         connection.commit()
@@ -115,6 +253,56 @@ def update_scan_result(table_name, record_id, status, error_message=None, size_m
     except mysql.connector.Error as e:
         logging.error(f"Error updating result for record {record_id} in {table_name}: {e}")
     finally:
-        if connection and connection.is_connected():
-            cursor.close()
-            connection.close()
+        release_connection(connection, cursor)
+
+
+def queue_scan_result(table_name, record_id, status, error_message=None, size_miniviewer=None, size_full_content=None, scroll_count=None, load_seconds=None):
+    """
+    Queues a scan result and writes all queued results in one transaction once
+    `database.status_batch_size` results are pending. Call `flush_scan_results` when a run
+    finishes to write the remainder.
+    """
+    batch_size = int(get_db_config().get('status_batch_size', DEFAULT_STATUS_BATCH_SIZE))
+    with _pending_results_lock:
+        _pending_results.append((table_name, record_id, status, error_message, size_miniviewer, size_full_content, scroll_count, load_seconds))
+        should_flush = len(_pending_results) >= batch_size
+    if should_flush:
+        flush_scan_results()
+
+def flush_scan_results():
+    """
+    Writes every queued scan result using a single pooled connection and commit.
+    The page-load metrics are only written to tables that have their columns.
+    """
+    with _pending_results_lock:
+        pending = list(_pending_results)
+        _pending_results.clear()
+    if not pending:
+        return
+
+    with_metrics = {table_name: has_metric_columns(table_name) for table_name, *_ in pending}
+    connection = get_db_connection()
+    if connection is None:
+        logging.error(f"Could not write {len(pending)} queued scan results; they will be released as stale claims.")
+        return
+
+    cursor = connection.cursor()
+    try:
+        by_table = {}
+        for table_name, record_id, status, error_message, size_miniviewer, size_full_content, scroll_count, load_seconds in pending:
+            if error_message:
+                error_message = (error_message[:1024] + '...') if len(error_message) > 1024 else error_message
+            metrics = (scroll_count, load_seconds) if with_metrics[table_name] else ()
+            by_table.setdefault(table_name, []).append(
+                (status, error_message, size_miniviewer, size_full_content, *metrics, record_id)
+            )
+
+        for table_name, params in by_table.items():
+            cursor.executemany(_scan_result_query(table_name, with_metrics[table_name]), params)
+        connection.commit()
+        logging.info(f"Wrote {len(pending)} queued scan results.")
+
+    except mysql.connector.Error as e:
+        logging.error(f"Error writing {len(pending)} queued scan results: {e}")
+    finally:
+        release_connection(connection, cursor)
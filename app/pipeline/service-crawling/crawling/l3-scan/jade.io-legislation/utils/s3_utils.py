@@ -0,0 +1,150 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+import boto3
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import NoCredentialsError, ClientError
+
+# Books above this size are uploaded in parts instead of a single PutObject.
+MULTIPART_THRESHOLD = int(os.getenv('S3_MULTIPART_THRESHOLD', 8 * 1024 * 1024))
+MULTIPART_CHUNKSIZE = int(os.getenv('S3_MULTIPART_CHUNKSIZE', 8 * 1024 * 1024))
+MAX_POOL_CONNECTIONS = int(os.getenv('S3_MAX_POOL_CONNECTIONS', 20)) # Keep it above crawler.workers
+
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=MULTIPART_CHUNKSIZE,
+    use_threads=False # Each crawler worker already runs on its own thread
+)
+
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+_listings = {}
+_listings_lock = threading.Lock()
+
+def get_s3_client():
+    """
+    Returns the process-wide S3 client, creating it on first use.
+    boto3 clients are thread-safe once created, so all crawler workers share this one.
+    """
+    global _s3_client
+    with _s3_client_lock:
+        if _s3_client is None:
+            _s3_client = boto3.client('s3', config=Config(max_pool_connections=MAX_POOL_CONNECTIONS))
+        return _s3_client
+
+def reset_s3_client():
+    """Drops the shared client and any cached listings, e.g. after credentials change or in tests."""
+    global _s3_client
+    with _s3_client_lock:
+        _s3_client = None
+    with _listings_lock:
+        _listings.clear()
+
+def get_prefix_listing(bucket_name, prefix):
+    """
+    Lists every object under `prefix` once and caches {key: (size, etag)} for the rest of the process.
+    One paginated listing per table replaces a HEAD request per record.
+    Returns None if the listing could not be fetched.
+    """
+    cache_key = (bucket_name, prefix)
+    with _listings_lock:
+        if cache_key in _listings:
+            return _listings[cache_key]
+
+    listing = {}
+    try:
+        paginator = get_s3_client().get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                listing[obj['Key']] = (obj['Size'], obj['ETag'].strip('"'))
+    except NoCredentialsError:
+        logging.error("Credentials not available for AWS S3.")
+        return None
+    except ClientError as e:
+        logging.error(f"An S3 client error occurred when listing s3://{bucket_name}/{prefix}: {e}")
+        return None
+
+    logging.info(f"Cached the listing of {len(listing)} object(s) under s3://{bucket_name}/{prefix}")
+    with _listings_lock:
+        _listings[cache_key] = listing
+    return listing
+
+def _remember_object(bucket_name, s3_key, size, etag):
+    """Records an object we just wrote in every cached listing that covers its key."""
+    with _listings_lock:
+        for (bucket, prefix), listing in _listings.items():
+            if bucket == bucket_name and s3_key.startswith(prefix):
+                listing[s3_key] = (size, etag)
+
+def get_s3_object_size(bucket_name, s3_key, prefix=None):
+    """
+    Fetches the size of an object in S3 without downloading it.
+    When `prefix` is given the size is read from the cached listing of that prefix, and a
+    HEAD request is only made for keys the listing does not know about.
+    Returns the size in bytes, or -1 if the object is not found or an error occurs.
+    """
+    if prefix is not None:
+        listing = get_prefix_listing(bucket_name, prefix)
+        if listing and s3_key in listing:
+            size = listing[s3_key][0]
+            logging.info(f"Baseline file s3://{bucket_name}/{s3_key} has size: {size} bytes.")
+            return size
+
+    try:
+        # head_object is efficient as it only fetches metadata (like size)
+        response = get_s3_client().head_object(Bucket=bucket_name, Key=s3_key)
+        size = response.get('ContentLength', 0)
+        logging.info(f"Baseline file s3://{bucket_name}/{s3_key} has size: {size} bytes.")
+        return size
+    except ClientError as e:
+        # Handle the case where the miniviewer.html file doesn't exist
+        if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+            logging.error(f"Baseline file not found at s3://{bucket_name}/{s3_key}")
+        else:
+            logging.error(f"An S3 client error occurred when fetching size for {s3_key}: {e}")
+        return -1
+    except NoCredentialsError:
+        logging.error("Credentials not available for AWS S3.")
+        return -1
+
+def upload_to_s3(content, bucket_name, s3_key, prefix=None):
+    """
+    Uploads content to a specified S3 bucket.
+    `content` may be a str or UTF-8 bytes. Large books are streamed up in parts (see MULTIPART_THRESHOLD).
+    When `prefix` is given and its cached listing already holds an object with the same size and
+    MD5 ETag, the upload is skipped. Returns True if the object is in S3 afterwards.
+    """
+    data = content.encode('utf-8') if isinstance(content, str) else content
+
+    md5 = None
+    if prefix is not None and len(data) < MULTIPART_THRESHOLD:
+        md5 = hashlib.md5(data).hexdigest()
+        listing = get_prefix_listing(bucket_name, prefix)
+        if listing and listing.get(s3_key) == (len(data), md5):
+            logging.info(f"s3://{bucket_name}/{s3_key} is unchanged. Skipping upload.")
+            return True
+
+    try:
+        get_s3_client().upload_fileobj(
+            io.BytesIO(data),
+            bucket_name,
+            s3_key,
+            ExtraArgs={'ContentType': 'text/html'},
+            Config=TRANSFER_CONFIG
+        )
+        logging.info(f"Successfully uploaded {len(data)} bytes to s3://{bucket_name}/{s3_key}")
+    except NoCredentialsError:
+        logging.error("Credentials not available for AWS S3.")
+        return False
+    except (ClientError, S3UploadFailedError) as e:
+        logging.error(f"An S3 client error occurred: {e}")
+        return False
+
+    if md5 is not None:
+        _remember_object(bucket_name, s3_key, len(data), md5)
+    return True
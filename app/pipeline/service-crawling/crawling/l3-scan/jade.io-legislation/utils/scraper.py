@@ -1,21 +1,30 @@
 import os
 import logging
 import json
-import boto3
 import time # Import the time module
-from botocore.exceptions import NoCredentialsError, ClientError
+import shutil
+import tempfile
 
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 
 # Build an absolute path to the project's root directory.
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+# Adaptive scroll-loading: wait times start small and double while the page stays unchanged.
+SCROLL_INITIAL_WAIT = float(os.getenv('SCROLL_INITIAL_WAIT', 0.25)) # Seconds to wait after a scroll that loaded new content
+SCROLL_QUIET_PERIOD = float(os.getenv('SCROLL_QUIET_PERIOD', 1.5)) # Page must stay unchanged this long to count as fully loaded
+SCROLL_MAX_SECONDS = float(os.getenv('SCROLL_MAX_SECONDS', 300)) # Upper bound on scroll-loading time per book
+
+PAGE_SIZE_JS = "return [document.body.scrollHeight, document.getElementsByTagName('*').length];"
+
+_sitemap_cache = None
+
 def get_webdriver():
     """
     Initializes and returns a Selenium WebDriver.
@@ -35,13 +44,21 @@ def get_webdriver():
         options.add_argument("--disable-gpu")
         options.add_argument("--window-size=1280x1696")
         options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--user-data-dir=/tmp/user-data")
-        options.add_argument("--remote-debugging-port=9222")
+        # Each browser gets its own profile and debugging port so several workers can share a container.
+        # The profile is removed by quit_driver.
+        user_data_dir = tempfile.mkdtemp(prefix='user-data-')
+        options.add_argument(f"--user-data-dir={user_data_dir}")
+        options.add_argument("--remote-debugging-port=0")
         
         # Chromedriver is on the system's PATH, so we may not need to specify it.
         # But being explicit is more robust.
         service = ChromeService(executable_path="/usr/local/bin/chromedriver")
-        driver = webdriver.Chrome(service=service, options=options)
+        try:
+            driver = webdriver.Chrome(service=service, options=options)
+        except Exception:
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+            raise
+        driver.user_data_dir = user_data_dir
     else:
         logging.info("Local environment detected. Running Chrome with a visible UI.")
         try:
@@ -53,6 +70,28 @@ def get_webdriver():
             
     return driver
 
+def is_driver_alive(driver):
+    """Returns True if the browser session still responds, False if it crashed or was closed."""
+    try:
+        driver.current_url
+        return True
+    except WebDriverException:
+        return False
+
+def quit_driver(driver):
+    """
+    Quits a driver, ignoring errors from browsers that have already crashed,
+    and removes the temporary profile directory `get_webdriver` created for it.
+    """
+    try:
+        driver.quit()
+    except Exception as e:
+        logging.warning(f"Error while quitting the browser: {e}")
+    finally:
+        user_data_dir = getattr(driver, 'user_data_dir', None)
+        if user_data_dir:
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+
 def handle_initial_popups(driver):
     """Handles common initial pop-ups like cookie banners or login prompts."""
     try:
@@ -77,11 +116,19 @@ def handle_initial_popups(driver):
 
 
 def get_sitemap():
-    """Loads the sitemap configuration from the JSON file using an absolute path."""
+    """
+    Loads the sitemap configuration from the JSON file using an absolute path.
+    The parsed sitemap is cached for the lifetime of the process.
+    """
+    global _sitemap_cache
+    if _sitemap_cache is not None:
+        return _sitemap_cache
+
     sitemap_path = os.path.join(PROJECT_ROOT, 'config', 'sitemap.json')
     try:
         with open(sitemap_path, 'r') as f:
-            return json.load(f)
+            _sitemap_cache = json.load(f)
+            return _sitemap_cache
     except FileNotFoundError:
         logging.error(f"Sitemap file not found at: {sitemap_path}")
         return None
@@ -89,32 +136,63 @@ def get_sitemap():
         logging.error(f"Error decoding JSON from sitemap file: {sitemap_path}")
         return None
 
-def scrape_content(url):
+def scroll_until_loaded(driver, initial_wait=SCROLL_INITIAL_WAIT, quiet_period=SCROLL_QUIET_PERIOD, max_seconds=SCROLL_MAX_SECONDS):
+    """
+    Scrolls to the bottom until the page height and DOM node count stop changing.
+    After each scroll it waits `initial_wait` seconds, doubling the wait while nothing changes,
+    and stops once the page has been unchanged for `quiet_period` seconds or after `max_seconds`.
+    Returns (scroll_count, load_seconds).
+    """
+    started = time.monotonic()
+    scroll_count = 0
+    last_size = driver.execute_script(PAGE_SIZE_JS)
+    wait, quiet_for = initial_wait, 0.0
+
+    while time.monotonic() - started < max_seconds:
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        scroll_count += 1
+        time.sleep(wait)
+        new_size = driver.execute_script(PAGE_SIZE_JS)
+        if new_size != last_size:
+            last_size = new_size
+            wait, quiet_for = initial_wait, 0.0
+            continue
+        quiet_for += wait
+        if quiet_for >= quiet_period:
+            break
+        wait *= 2
+    else:
+        logging.warning(f"Stopped scrolling after the {max_seconds:.0f}s limit; the page was still growing.")
+
+    return scroll_count, time.monotonic() - started
+
+def scrape_content(url, driver=None, handle_popups=True, metrics=None):
     """
     Scrapes multiple content blocks from a URL based on the sitemap
     and combines them into a single HTML string.
     Includes scrolling logic and logic to find ALL matching elements.
+    If a long-lived `driver` is passed it is reused and left open; otherwise a browser is
+    started for this URL only. Pop-ups only need handling on a browser's first page.
+    If a `metrics` dict is passed, the scroll count and load time are stored in it.
     """
-    driver = get_webdriver()
+    owns_driver = driver is None
+    if owns_driver:
+        driver = get_webdriver()
     if not driver:
         return None
         
     try:
         logging.info(f"Navigating to URL: {url}")
         driver.get(url)
-        handle_initial_popups(driver)
+        if handle_popups:
+            handle_initial_popups(driver)
 
         # --- SCROLL TO BOTTOM TO LOAD ALL DYNAMIC CONTENT ---
         logging.info("Scrolling down the page to load all dynamic content...")
-        last_height = driver.execute_script("return document.body.scrollHeight")
-        while True:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
-        logging.info("Finished scrolling. All content should be loaded.")
+        scroll_count, load_seconds = scroll_until_loaded(driver)
+        if metrics is not None:
+            metrics.update(scroll_count=scroll_count, load_seconds=round(load_seconds, 2))
+        logging.info(f"Finished scrolling after {scroll_count} scroll(s) in {load_seconds:.1f}s. All content should be loaded.")
         
         sitemap = get_sitemap()
         if not sitemap:
@@ -152,48 +230,6 @@ def scrape_content(url):
         logging.error(f"An error occurred while scraping {url}: {e}")
         return None
     finally:
-        if driver:
+        if owns_driver and driver:
             logging.info("Closing the browser.")
-            driver.quit()
-
-def get_s3_object_size(bucket_name, s3_key):
-    """
-    Fetches the size of an object in S3 without downloading it.
-    Returns the size in bytes, or -1 if the object is not found or an error occurs.
-    """
-    s3_client = boto3.client('s3')
-    try:
-        # head_object is efficient as it only fetches metadata (like size)
-        response = s3_client.head_object(Bucket=bucket_name, Key=s3_key)
-        size = response.get('ContentLength', 0)
-        logging.info(f"Baseline file s3://{bucket_name}/{s3_key} has size: {size} bytes.")
-        return size
-    except ClientError as e:
-        # Handle the case where the miniviewer.html file doesn't exist
-        if e.response['Error']['Code'] == '404':
-            logging.error(f"Baseline file not found at s3://{bucket_name}/{s3_key}")
-        else:
-            logging.error(f"An S3 client error occurred when fetching size for {s3_key}: {e}")
-        return -1
-    except NoCredentialsError:
-        logging.error("Credentials not available for AWS S3.")
-        return -1
-    
-def upload_to_s3(content, bucket_name, s3_key):
-    """Uploads content to a specified S3 bucket."""
-    s3_client = boto3.client('s3')
-    try:
-        s3_client.put_object(
-            Bucket=bucket_name, 
-            Key=s3_key, 
-            Body=content,
-            ContentType='text/html'
-        )
-        logging.info(f"Successfully uploaded content to s3://{bucket_name}/{s3_key}")
-        return True
-    except NoCredentialsError:
-        logging.error("Credentials not available for AWS S3.")
-        return False
-    except ClientError as e:
-        logging.error(f"An S3 client error occurred: {e}")
-        return False
\ No newline at end of file
+            quit_driver(driver)
@@ -0,0 +1,144 @@
+"""
+Benchmarks the concurrent, streaming sitemap walker in handler.py against the sequential
+requests + BeautifulSoup walker it replaced.
+
+A local HTTP server serves a generated sitemap tree: a root index pointing at `--children`
+child sitemaps (every tenth one gzipped, every twentieth one a nested index that re-lists an
+already-seen child), each holding `--urls` page URLs. Every response is delayed by `--latency`
+seconds to stand in for a remote host.
+
+Usage:
+    python benchmarks/sitemap_fetch_benchmark.py [--children 300] [--urls 200] [--latency 0.05]
+"""
+import argparse
+import gzip
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import handler  # noqa: E402
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def build_tree(base_url, children, urls):
+    """Returns {path: body bytes} for the generated sitemap tree."""
+    files = {}
+    child_paths = []
+    for n in range(children):
+        path = f"/sitemaps/child-{n}.xml" + (".gz" if n % 10 == 9 else "")
+        locs = "".join(f"<url><loc>{base_url}/doc/{n}/{m}</loc></url>" for m in range(urls))
+        body = f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{locs}</urlset>'.encode()
+        files[path] = gzip.compress(body) if path.endswith(".gz") else body
+        child_paths.append(path)
+
+    index_entries = []
+    for n, path in enumerate(child_paths):
+        if n % 20 == 19:
+            nested = f"/sitemaps/index-{n}.xml"
+            # Nested index re-lists its own child plus one seen elsewhere, exercising the visited set.
+            entries = "".join(f"<sitemap><loc>{base_url}{p}</loc></sitemap>" for p in (path, child_paths[0]))
+            files[nested] = f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex {NS}>{entries}</sitemapindex>'.encode()
+            index_entries.append(nested)
+        else:
+            index_entries.append(path)
+    entries = "".join(f"<sitemap><loc>{base_url}{p}</loc></sitemap>" for p in index_entries)
+    files["/sitemap.xml"] = f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex {NS}>{entries}</sitemapindex>'.encode()
+    return files
+
+
+def serve(files, latency):
+    """Starts a threaded HTTP server for `files` on a free port. Returns the server."""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = files.get(self.path)
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def sequential_fetch(sitemap_url, visited_sitemaps=None):
+    """The one-request-at-a-time BeautifulSoup walker used before the concurrent fetcher."""
+    if visited_sitemaps is None:
+        visited_sitemaps = set()
+    if sitemap_url in visited_sitemaps:
+        return []
+    visited_sitemaps.add(sitemap_url)
+    all_loc_urls = []
+    try:
+        response = requests.get(sitemap_url, headers={"User-Agent": handler.USER_AGENT}, timeout=handler.WEB_REQUEST_TIMEOUT)
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        return all_loc_urls
+    soup = BeautifulSoup(response.content, 'xml')
+    sitemap_tags = soup.find_all('sitemap')
+    if sitemap_tags:
+        for sitemap_tag in sitemap_tags:
+            sub_sitemap_loc = sitemap_tag.find('loc')
+            if sub_sitemap_loc and sub_sitemap_loc.text:
+                all_loc_urls.extend(sequential_fetch(sub_sitemap_loc.text.strip(), visited_sitemaps))
+    else:
+        for url_tag in soup.find_all('url'):
+            loc = url_tag.find('loc')
+            if loc and loc.text:
+                all_loc_urls.append(loc.text.strip())
+    return all_loc_urls
+
+
+def timed(fn, url):
+    started = time.perf_counter()
+    result = fn(url)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--children", type=int, default=300)
+    parser.add_argument("--urls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    files = {}
+    server = serve(files, args.latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    files.update(build_tree(base_url, args.children, args.urls))
+    root = f"{base_url}/sitemap.xml"
+
+    # Silence the per-sitemap progress lines while timing.
+    handler.print = lambda *a, **k: None
+    new_urls, new_seconds = timed(handler.fetch_sitemap_urls_recursive_from_web, root)
+    old_urls, old_seconds = timed(sequential_fetch, root)
+    server.shutdown()
+
+    gz_note = "(gzipped children are skipped by the old walker)"
+    print(f"{args.children} child sitemaps x {args.urls} URLs, {args.latency * 1000:.0f} ms latency")
+    print(f"  sequential BeautifulSoup: {old_seconds:7.2f}s  {len(set(old_urls)):>8} unique URLs {gz_note}")
+    print(f"  concurrent iterparse:     {new_seconds:7.2f}s  {len(set(new_urls)):>8} unique URLs")
+    print(f"  speedup: {old_seconds / new_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,13 @@
 import os
 import sys
+import zlib
+import threading
 import requests 
-from bs4 import BeautifulSoup 
 import json 
 import time 
-from urllib.parse import urljoin
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urljoin, urlparse
+from xml.etree import ElementTree
 from sqlalchemy import text
 import uuid # For audit log ID
 from datetime import datetime, timezone # For timestamps
@@ -31,12 +34,46 @@ if S3_DEST_FOLDER and not S3_DEST_FOLDER.endswith('/'):
 WEB_REQUEST_TIMEOUT = 30
 USER_AGENT = "DocuDiveJuristabConfigGenerator/1.0 (+http://your-project-url.com)"
 
-# --- Helper functions for web fetching (largely unchanged) ---
+# Sitemap indexes are walked concurrently: up to SITEMAP_FETCH_WORKERS requests in flight overall,
+# and at most SITEMAP_PER_HOST_LIMIT of them against any one host.
+SITEMAP_FETCH_WORKERS = int(os.getenv("SITEMAP_FETCH_WORKERS", 16))
+SITEMAP_PER_HOST_LIMIT = int(os.getenv("SITEMAP_PER_HOST_LIMIT", 8))
+
+GZIP_MAGIC = b"\x1f\x8b"
+SITEMAP_CHUNK_SIZE = 64 * 1024
+# Only elements of the sitemap protocol count; <image:loc>, <video:content_loc> and the like are ignored.
+SITEMAP_NAMESPACE = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+_thread_local = threading.local()
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+# --- Helper functions for web fetching ---
+def _get_session():
+    """Returns this thread's requests.Session, so connections to a host are kept alive between fetches."""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update({"User-Agent": USER_AGENT})
+        _thread_local.session = session
+    return session
+
+def _host_semaphore(url):
+    """Returns the semaphore that caps concurrent requests to the host of `url`."""
+    host = urlparse(url).netloc
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(SITEMAP_PER_HOST_LIMIT)
+        return _host_semaphores[host]
+
 def make_web_request(url, is_xml=False):
+    """
+    GETs `url` through the thread's keep-alive session.
+    XML responses are streamed (stream=True) so large sitemaps can be parsed as they arrive.
+    """
     print(f"⚙️ Fetching web content from: {url}")
-    headers = {"User-Agent": USER_AGENT}
     try:
-        response = requests.get(url, headers=headers, timeout=WEB_REQUEST_TIMEOUT)
+        response = _get_session().get(url, timeout=WEB_REQUEST_TIMEOUT, stream=is_xml)
         response.raise_for_status()
         return response
     except requests.exceptions.RequestException as e:
@@ -50,37 +87,96 @@ def fetch_robots_txt_content(base_url):
         return response.text
     return None
 
+def parse_sitemap_response(response):
+    """
+    Parses a sitemap or sitemap index incrementally as the body streams in, clearing elements as it
+    goes so memory stays flat. Gzipped sitemap files (sitemap.xml.gz) are detected by their magic
+    bytes and decompressed on the fly; transfer-level gzip is already undone by requests.
+    Returns (child_sitemap_urls, page_urls).
+    """
+    child_sitemaps, page_urls = [], []
+    parser = ElementTree.XMLPullParser(events=("end",))
+    decompressor = None
+    head = b""
+    loc = None
+
+    def drain():
+        nonlocal loc
+        for _, elem in parser.read_events():
+            tag = elem.tag[len(SITEMAP_NAMESPACE):] if elem.tag.startswith(SITEMAP_NAMESPACE) else elem.tag
+            if tag == "loc":
+                loc = elem.text.strip() if elem.text else None
+            elif tag in ("sitemap", "url"):
+                if loc:
+                    (child_sitemaps if tag == "sitemap" else page_urls).append(loc)
+                loc = None
+                elem.clear()
+
+    for chunk in response.iter_content(chunk_size=SITEMAP_CHUNK_SIZE):
+        if head is not None:
+            head += chunk
+            if len(head) < len(GZIP_MAGIC):
+                continue
+            chunk, head = head, None
+            if chunk.startswith(GZIP_MAGIC):
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        parser.feed(decompressor.decompress(chunk) if decompressor else chunk)
+        drain()
+    if head:
+        parser.feed(head)
+    if decompressor:
+        parser.feed(decompressor.flush())
+    parser.close()
+    drain()
+    return child_sitemaps, page_urls
+
+def fetch_sitemap(sitemap_url):
+    """
+    Fetches and parses one sitemap document, holding its host's semaphore until the body is read.
+    Returns (child_sitemap_urls, page_urls); both empty on failure.
+    """
+    with _host_semaphore(sitemap_url):
+        response = make_web_request(sitemap_url, is_xml=True)
+        if not response:
+            print(f"❌ Failed to fetch or parse sitemap: {sitemap_url}")
+            return [], []
+        try:
+            with response:
+                child_sitemaps, page_urls = parse_sitemap_response(response)
+        except Exception as e:
+            print(f"❌ Error parsing sitemap XML from {sitemap_url}: {e}")
+            return [], []
+
+    if child_sitemaps:
+        print(f"⚙️ Found sitemap index: {sitemap_url}. Processing {len(child_sitemaps)} sub-sitemaps...")
+    else:
+        print(f"✅ Processed sitemap: {sitemap_url}, found {len(page_urls)} <url> tags.")
+    return child_sitemaps, page_urls
+
 def fetch_sitemap_urls_recursive_from_web(sitemap_url, visited_sitemaps=None):
+    """
+    Walks a sitemap index tree and returns every page <loc> it lists.
+    Child sitemaps are fetched on a thread pool as soon as they are discovered; `visited_sitemaps`
+    ensures a sitemap referenced from several indexes is only fetched once.
+    """
     if visited_sitemaps is None:
         visited_sitemaps = set()
     if sitemap_url in visited_sitemaps:
         return []
     visited_sitemaps.add(sitemap_url)
     all_loc_urls = []
-    response = make_web_request(sitemap_url, is_xml=True)
 
-    if response:
-        try:
-            soup = BeautifulSoup(response.content, 'xml')
-            sitemap_tags = soup.find_all('sitemap')
-            if sitemap_tags:
-                print(f"⚙️ Found sitemap index: {sitemap_url}. Processing sub-sitemaps...")
-                for sitemap_tag in sitemap_tags:
-                    sub_sitemap_loc = sitemap_tag.find('loc')
-                    if sub_sitemap_loc and sub_sitemap_loc.text:
-                        sub_sitemap_url = sub_sitemap_loc.text.strip()
-                        all_loc_urls.extend(fetch_sitemap_urls_recursive_from_web(sub_sitemap_url, visited_sitemaps))
-            else:
-                url_tags = soup.find_all('url')
-                for url_tag in url_tags:
-                    loc = url_tag.find('loc')
-                    if loc and loc.text:
-                        all_loc_urls.append(loc.text.strip())
-                print(f"✅ Processed sitemap: {sitemap_url}, found {len(url_tags)} <url> tags.")
-        except Exception as e: 
-            print(f"❌ Error parsing sitemap XML from {sitemap_url}: {e}")
-    else:
-        print(f"❌ Failed to fetch or parse sitemap: {sitemap_url}")
+    with ThreadPoolExecutor(max_workers=SITEMAP_FETCH_WORKERS) as executor:
+        pending = {executor.submit(fetch_sitemap, sitemap_url)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                child_sitemaps, page_urls = future.result()
+                all_loc_urls.extend(page_urls)
+                for child_url in child_sitemaps:
+                    if child_url not in visited_sitemaps:
+                        visited_sitemaps.add(child_url)
+                        pending.add(executor.submit(fetch_sitemap, child_url))
     return all_loc_urls
 
 def generate_sitemap_json_content(base_url):
@@ -0,0 +1,57 @@
+import gzip
+
+from handler import parse_sitemap_response
+
+IMAGE_SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1"
+        xmlns:video="http://www.google.com/schemas/sitemap-video/1.1"
+        xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">
+  <url>
+    <loc>https://example.com/acts/1</loc>
+    <image:image><image:loc>https://example.com/images/1.png</image:loc></image:image>
+  </url>
+  <url>
+    <loc>https://example.com/acts/2</loc>
+    <video:video>
+      <video:thumbnail_loc>https://example.com/thumbs/2.jpg</video:thumbnail_loc>
+      <video:content_loc>https://example.com/videos/2.mp4</video:content_loc>
+    </video:video>
+    <news:news><news:loc>https://example.com/news/2</news:loc></news:news>
+  </url>
+</urlset>
+"""
+
+
+class FakeResponse:
+    """Streams `body` in `chunk_size` pieces, like a requests response opened with stream=True."""
+
+    def __init__(self, body, chunk_size=16):
+        self.body = body
+        self.chunk_size = chunk_size
+
+    def iter_content(self, chunk_size=None):
+        for start in range(0, len(self.body), self.chunk_size):
+            yield self.body[start:start + self.chunk_size]
+
+
+def test_image_and_video_locations_do_not_replace_page_location():
+    child_sitemaps, page_urls = parse_sitemap_response(FakeResponse(IMAGE_SITEMAP))
+
+    assert child_sitemaps == []
+    assert page_urls == ["https://example.com/acts/1", "https://example.com/acts/2"]
+
+
+def test_gzipped_image_sitemap():
+    _, page_urls = parse_sitemap_response(FakeResponse(gzip.compress(IMAGE_SITEMAP)))
+
+    assert page_urls == ["https://example.com/acts/1", "https://example.com/acts/2"]
+
+
+def test_sitemap_index_without_namespace():
+    body = b"<sitemapindex><sitemap><loc> https://example.com/sitemap-1.xml </loc></sitemap></sitemapindex>"
+
+    child_sitemaps, page_urls = parse_sitemap_response(FakeResponse(body))
+
+    assert child_sitemaps == ["https://example.com/sitemap-1.xml"]
+    assert page_urls == []
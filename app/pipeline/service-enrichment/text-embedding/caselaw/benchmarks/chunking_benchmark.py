@@ -0,0 +1,61 @@
+"""
+Compares EmbeddingGenerator chunking on CPU: 1500-character windows against token chunks cut with the
+model's tokenizer. For each, reports chunks per document, chunks longer than the model's token limit
+(silently truncated by the model) and encode time per document.
+
+Uses the same corpus and, unless --model is given, the same small local BERT as
+embedding_batch_benchmark.py. Its vocabulary has a token per word, so character windows come out well
+under the limit here; run with --model on a local BGE copy to see the overflow on real text.
+
+Usage:
+    python benchmarks/chunking_benchmark.py [--documents 200] [--model PATH]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, PROJECT_ROOT)
+from benchmarks.embedding_batch_benchmark import build_local_model, make_corpus  # noqa: E402
+from src.embedding_generator import EmbeddingGenerator  # noqa: E402
+
+
+def measure(label, generator, corpus):
+    tokenizer = generator.model.tokenizer
+    chunks = [chunk for text in corpus for chunk in generator._chunk_text(text)]
+    truncated = sum(
+        len(tokenizer(generator.instruction + chunk, verbose=False)['input_ids']) > generator.model.max_seq_length
+        for chunk in chunks
+    )
+    start = time.perf_counter()
+    for text in corpus:
+        generator.generate_embedding_for_text(text)
+    elapsed = time.perf_counter() - start
+    print(f"{label:>10}: {len(chunks) / len(corpus):.2f} chunks/document, {truncated} truncated, "
+          f"{1000 * elapsed / len(corpus):.0f} ms/document")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--model", help="Path of a local sentence-transformers model")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.documents)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = args.model or build_local_model(tmp_dir)
+        config = {'model_name': model_path, 'chunk_size': 1500, 'chunk_overlap': 200, 'chunk_overlap_tokens': 64}
+        characters = EmbeddingGenerator({'models': {'embedding': dict(config, chunking='characters')}})
+        tokens = EmbeddingGenerator({'models': {'embedding': dict(config, chunking='tokens')}})
+        tokens.generate_embedding_for_text(corpus[1]) # Warm up
+
+        character_seconds = measure("characters", characters, corpus)
+        token_seconds = measure("tokens", tokens, corpus)
+        print(f"Speedup: {character_seconds / token_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmarks EmbeddingGenerator throughput (chunks/sec) on CPU:
+  - per-document: generate_embedding_for_text, one model.encode call per document's chunks
+  - cross-document: generate_embeddings_for_texts, chunks of --documents-per-batch documents sorted
+    by length and packed into encode batches of --encode-batch-size
+
+The corpus mixes many short judgments with a few long ones, as a jurisdiction's backlog does.
+By default a small BERT (4 layers, 256 wide, word-level vocabulary) is built from the corpus and
+saved locally, so no model download is needed; pass --model to use a local sentence-transformers
+model instead (e.g. a downloaded BAAI/bge-small-en-v1.5). Both paths must give the same vectors.
+
+Usage:
+    python benchmarks/embedding_batch_benchmark.py [--documents 400] [--encode-batch-size 32] [--documents-per-batch 32] [--model PATH]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import numpy as np
+import torch
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, PROJECT_ROOT)
+from src.embedding_generator import EmbeddingGenerator  # noqa: E402
+
+WORDS = ("the court held that appellant respondent appeal dismissed allowed contract negligence duty of care "
+         "breach damages evidence witness tribunal order costs section act regulation judgment reasons "
+         "plaintiff defendant honour submissions finding error law fact jurisdiction leave granted").split()
+
+
+def make_corpus(count, seed=7):
+    """Mostly short decisions (a few hundred words) with a long judgment every tenth document."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        words = rng.randint(3000, 6000) if i % 10 == 0 else rng.randint(60, 400)
+        corpus.append(" ".join(rng.choice(WORDS) for _ in range(words)))
+    return corpus
+
+
+def build_local_model(path):
+    """Saves a small randomly initialised BERT sentence-transformer with a vocabulary of WORDS."""
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    torch.manual_seed(0)
+    bert_dir = os.path.join(path, "bert")
+    os.makedirs(bert_dir)
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + sorted(set(WORDS + "represent this sentence for searching relevant passages :".split()))
+    with open(os.path.join(bert_dir, "vocab.txt"), "w") as f:
+        f.write("\n".join(vocab))
+    BertTokenizerFast(vocab_file=os.path.join(bert_dir, "vocab.txt")).save_pretrained(bert_dir)
+    BertModel(BertConfig(
+        vocab_size=len(vocab), hidden_size=256, num_hidden_layers=4, num_attention_heads=4,
+        intermediate_size=1024, max_position_embeddings=512
+    )).save_pretrained(bert_dir)
+
+    transformer = models.Transformer(bert_dir, max_seq_length=512)
+    pooling = models.Pooling(transformer.get_word_embedding_dimension(), pooling_mode="mean")
+    model_dir = os.path.join(path, "sentence-transformer")
+    SentenceTransformer(modules=[transformer, pooling], device="cpu").save(model_dir)
+    return model_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=400)
+    parser.add_argument("--encode-batch-size", type=int, default=32)
+    parser.add_argument("--documents-per-batch", type=int, default=32)
+    parser.add_argument("--model", help="Path of a local sentence-transformers model")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.documents)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = args.model or build_local_model(tmp_dir)
+        generator = EmbeddingGenerator({'models': {'embedding': {
+            'model_name': model_path, 'chunk_size': 1500, 'chunk_overlap': 200,
+            'encode_batch_size': args.encode_batch_size,
+        }}})
+        chunk_count = sum(len(generator._chunk_text(text)) for text in corpus)
+        print(f"{len(corpus)} documents, {chunk_count} chunks, {torch.get_num_threads()} CPU threads")
+        generator.generate_embeddings_for_texts(corpus[:4]) # Warm up
+
+        start = time.perf_counter()
+        per_document = [generator.generate_embedding_for_text(text) for text in corpus]
+        per_document_seconds = time.perf_counter() - start
+        print(f"   per-document: {chunk_count / per_document_seconds:,.1f} chunks/s ({per_document_seconds:.1f}s)")
+
+        start = time.perf_counter()
+        cross_document = []
+        for batch_start in range(0, len(corpus), args.documents_per_batch):
+            cross_document += generator.generate_embeddings_for_texts(corpus[batch_start:batch_start + args.documents_per_batch])
+        cross_document_seconds = time.perf_counter() - start
+        print(f" cross-document: {chunk_count / cross_document_seconds:,.1f} chunks/s ({cross_document_seconds:.1f}s)")
+
+        max_difference = max(float(np.abs(a - b).max()) for a, b in zip(per_document, cross_document))
+        print(f"Speedup: {per_document_seconds / cross_document_seconds:.1f}x, largest vector difference {max_difference:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmarks the embedding backends on CPU, in documents/sec and pod cost per 1,000 documents:
+  - torch: the sentence-transformer as loaded
+  - onnx fp32: the same model exported to ONNX and run with ONNX Runtime
+  - onnx int8: the ONNX export with dynamically int8-quantized weights
+
+Every backend embeds the same corpus with generate_embeddings_for_texts, --documents-per-batch
+documents at a time, as main.py does. The cost is the run time at --hour-price, which defaults
+to server_pod_price.hour_price in config/config.yaml. Each ONNX backend's vectors are compared
+with torch's by cosine similarity.
+
+By default the small local BERT of embedding_batch_benchmark.py is used, so no model download is
+needed; pass --model to use a local sentence-transformers model instead (e.g. a downloaded
+BAAI/bge-large-en-v1.5).
+
+Usage:
+    python benchmarks/onnx_backend_benchmark.py [--documents 200] [--documents-per-batch 32] [--hour-price 3.28] [--model PATH]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import torch
+import yaml
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from src.embedding_generator import EmbeddingGenerator  # noqa: E402
+from embedding_batch_benchmark import build_local_model, make_corpus  # noqa: E402
+
+BACKENDS = [
+    ("torch", {'backend': 'torch'}),
+    ("onnx fp32", {'backend': 'onnx', 'onnx': {'quantize': False}}),
+    ("onnx int8", {'backend': 'onnx', 'onnx': {'quantize': True}}),
+]
+
+
+def default_hour_price():
+    with open(os.path.join(PROJECT_ROOT, "config", "config.yaml")) as f:
+        return yaml.safe_load(f).get('server_pod_price', {}).get('hour_price', 0.28)
+
+
+def embed(generator, corpus, documents_per_batch):
+    embeddings = []
+    for batch_start in range(0, len(corpus), documents_per_batch):
+        embeddings += generator.generate_embeddings_for_texts(corpus[batch_start:batch_start + documents_per_batch])
+    return embeddings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--documents-per-batch", type=int, default=32)
+    parser.add_argument("--hour-price", type=float, default=None, help="Pod price per hour (default: config.yaml)")
+    parser.add_argument("--model", help="Path of a local sentence-transformers model")
+    args = parser.parse_args()
+    hour_price = args.hour_price if args.hour_price is not None else default_hour_price()
+
+    corpus = make_corpus(args.documents)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = args.model or build_local_model(tmp_dir)
+        print(f"{len(corpus)} documents, {torch.get_num_threads()} CPU threads, ${hour_price:.2f}/hour")
+
+        reference = None
+        for label, options in BACKENDS:
+            options = {**options, 'onnx': {'cache_dir': os.path.join(tmp_dir, "onnx"), **options.get('onnx', {})}}
+            with contextlib.redirect_stdout(io.StringIO()): # The generator logs its model loading
+                generator = EmbeddingGenerator({'models': {'embedding': {
+                    'model_name': model_path, 'chunking': 'tokens', 'chunk_size': 1500, 'chunk_overlap': 200,
+                    **options,
+                }}})
+            generator.generate_embeddings_for_texts(corpus[:4]) # Warm up
+
+            start = time.perf_counter()
+            embeddings = embed(generator, corpus, args.documents_per_batch)
+            seconds = time.perf_counter() - start
+            cost_per_thousand = seconds / 3600 * hour_price / len(corpus) * 1000
+
+            line = f"{label:>10}: {len(corpus) / seconds:,.1f} docs/s, ${cost_per_thousand:.4f} per 1,000 documents"
+            if reference is None:
+                reference, reference_seconds = embeddings, seconds
+            else:
+                similarity = min(
+                    float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))) for a, b in zip(embeddings, reference)
+                )
+                line += f" ({reference_seconds / seconds:.1f}x torch, lowest cosine similarity {similarity:.4f})"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
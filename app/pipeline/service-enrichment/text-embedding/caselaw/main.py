@@ -11,6 +11,75 @@ load_dotenv()
 from utils.helpers import load_config, DatabaseHandler, S3Handler
 from utils.vector_db_handler import VectorDBHandler
 from src.embedding_generator import EmbeddingGenerator
+from src.embedding_cache import CachedEmbeddingGenerator
+
+def record_indexing_outcomes(outcomes, db_handler):
+    """
+    Records the status of documents whose bulk indexing has finished: 'pass' with the duration
+    and price queued alongside them once indexed, 'failed' otherwise.
+    """
+    for source_id, (duration, price), error in outcomes:
+        if error is None:
+            db_handler.update_embedding_status(source_id, 'pass', duration, price)
+        else:
+            print(f"\nERROR processing source_id {source_id}: {error}")
+            db_handler.update_embedding_status(source_id, 'failed', price=None)
+
+def process_batch(source_ids, id_to_folder_map, source_text_filename, embedding_output_filename,
+                  db_handler, s3_handler, embedding_generator, vector_db_handler, server_pod_price):
+    """
+    Downloads the texts of a batch of documents, embeds them together, then uploads and queues
+    each document for bulk indexing on its own, so one failure only fails that document.
+    The status of a queued document is recorded once its bulk request has gone through.
+    The time spent downloading and encoding is shared evenly between the batch's documents.
+    """
+    batch_start_time = time.time()
+    texts = {}
+    for source_id in source_ids:
+        if source_id not in id_to_folder_map:
+            db_handler.update_embedding_status(source_id, 'fail_mapping', price=None)
+            continue
+        try:
+            text_s3_key = f"{id_to_folder_map[source_id]}{source_id}/{source_text_filename}"
+            texts[source_id] = s3_handler.get_caselaw_text(text_s3_key)
+        except Exception as e:
+            print(f"\nERROR processing source_id {source_id}: {e}")
+            db_handler.update_embedding_status(source_id, 'failed', price=None)
+
+    if not texts:
+        return
+    try:
+        embedding_vectors = embedding_generator.generate_embeddings_for_texts(list(texts.values()))
+    except Exception as e:
+        print(f"\nERROR embedding a batch of {len(texts)} documents: {e}")
+        for source_id in texts:
+            db_handler.update_embedding_status(source_id, 'failed', price=None)
+        return
+    shared_duration = (time.time() - batch_start_time) / len(texts)
+
+    for source_id, embedding_vector in zip(texts, embedding_vectors):
+        start_time = time.time()
+        try:
+            # Step A: Upload the embedding to S3
+            if embedding_vector is None:
+                raise ValueError("Embedding generation returned None.")
+
+            embedding_s3_key = f"{id_to_folder_map[source_id]}{source_id}/{embedding_output_filename}"
+            embedding_bytes = embedding_generator.save_embedding_to_bytes(embedding_vector)
+            s3_handler.upload_embedding(embedding_s3_key, embedding_bytes)
+
+            # Step B: Queue the document for bulk indexing into OpenSearch Vector DB
+            # Its status is updated in the relational DB by record_indexing_outcomes once it is indexed.
+            duration = shared_duration + time.time() - start_time
+            price = (duration / 3600) * server_pod_price
+            vector_db_handler.queue_document(source_id, embedding_vector, context=(duration, price))
+
+        except Exception as e:
+            # This block handles errors from S3 or OpenSearch.
+            print(f"\nERROR processing source_id {source_id}: {e}")
+            db_handler.update_embedding_status(source_id, 'failed', price=None)
+
+    record_indexing_outcomes(vector_db_handler.flush_if_due(), db_handler)
 
 def main():
     """
@@ -28,7 +97,11 @@ def main():
     try:
         db_handler = DatabaseHandler(config)
         s3_handler = S3Handler(config)
-        embedding_generator = EmbeddingGenerator(config)
+        # With the cache, unchanged documents reuse their stored vector and the model loads on the first miss
+        if config['models']['embedding'].get('cache', {}).get('enabled', False):
+            embedding_generator = CachedEmbeddingGenerator(config)
+        else:
+            embedding_generator = EmbeddingGenerator(config)
         vector_db_handler = VectorDBHandler(config)
     except Exception as e:
         print(f"FATAL: Could not initialize handlers. Error: {e}")
@@ -80,42 +153,23 @@ def main():
             source_text_filename = config['enrichment_filenames']['source_text']
             embedding_output_filename = config['enrichment_filenames']['embedding_output']
             
-            for source_id in tqdm(source_ids_to_process, desc=desc):
-                start_time = time.time()
-                if source_id not in id_to_folder_map:
-                    db_handler.update_embedding_status(source_id, 'fail_mapping', price=None)
-                    continue
-                try:
-                    # Step A: Generate embedding and upload to S3
-                    s3_folder = id_to_folder_map[source_id]
-                    text_s3_key = f"{s3_folder}{source_id}/{source_text_filename}"
-                    embedding_s3_key = f"{s3_folder}{source_id}/{embedding_output_filename}"
-                    
-                    caselaw_text = s3_handler.get_caselaw_text(text_s3_key)
-                    embedding_vector = embedding_generator.generate_embedding_for_text(caselaw_text)
-                    
-                    if embedding_vector is None:
-                        raise ValueError("Embedding generation returned None.")
-                    
-                    embedding_bytes = embedding_generator.save_embedding_to_bytes(embedding_vector)
-                    s3_handler.upload_embedding(embedding_s3_key, embedding_bytes)
-
-                    # Step B: Index document into OpenSearch Vector DB
-                    # The inner try/except block has been removed. If this step fails,
-                    # the main exception handler below will catch it and mark the status as 'fail'.
-                    vector_db_handler.index_document(source_id, embedding_vector)
-
-                    # Step C: Update status in relational DB
-                    # This will now only run if both embedding and indexing are successful.
-                    duration = time.time() - start_time
-                    price = (duration / 3600) * server_pod_price
-                    db_handler.update_embedding_status(source_id, 'pass', duration, price)
-
-                except Exception as e:
-                    # This block will now correctly handle errors from S3 or OpenSearch.
-                    print(f"\nERROR processing source_id {source_id}: {e}")
-                    db_handler.update_embedding_status(source_id, 'failed', price=None)
-
+            # Texts are embedded a batch of documents at a time so their chunks share encode batches
+            documents_per_batch = config['models']['embedding'].get('documents_per_batch', 32)
+            with tqdm(total=len(source_ids_to_process), desc=desc) as progress:
+                for batch_start in range(0, len(source_ids_to_process), documents_per_batch):
+                    batch_ids = source_ids_to_process[batch_start:batch_start + documents_per_batch]
+                    process_batch(
+                        batch_ids, id_to_folder_map, source_text_filename, embedding_output_filename,
+                        db_handler, s3_handler, embedding_generator, vector_db_handler, server_pod_price
+                    )
+                    progress.update(len(batch_ids))
+
+    # Index whatever is still buffered, and make the run's documents searchable once at the end
+    record_indexing_outcomes(vector_db_handler.flush(), db_handler)
+    vector_db_handler.refresh()
+
+    if isinstance(embedding_generator, CachedEmbeddingGenerator):
+        print(f"\n{embedding_generator.report()}")
     print("\nCaselaw Embedding Service batch job finished.")
 
 
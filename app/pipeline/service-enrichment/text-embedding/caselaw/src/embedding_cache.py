@@ -0,0 +1,150 @@
+import hashlib
+import os
+import sqlite3
+import time
+import unicodedata
+import numpy as np
+from src.embedding_generator import EmbeddingGenerator
+
+class EmbeddingCache:
+    """
+    A local SQLite store of document embeddings, keyed by the SHA-256 of the normalized text
+    together with the generator's fingerprint (model, backend, instruction and chunking settings).
+    A document whose text is unchanged since an earlier run gets its stored vector back; changing
+    any of those settings changes every key, so stale vectors are never returned.
+    """
+
+    def __init__(self, path: str, fingerprint: str):
+        """
+        Args:
+            path (str): The SQLite file, created if missing. Put it on storage that outlives the pod.
+            fingerprint (str): EmbeddingGenerator.fingerprint of the configuration in use.
+        """
+        self.path = path
+        self.fingerprint = fingerprint
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self.connection.commit()
+        print(f"EmbeddingCache: Using {path}")
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Unicode NFC, Unix line endings and no surrounding whitespace."""
+        return unicodedata.normalize('NFC', text).replace('\r\n', '\n').replace('\r', '\n').strip()
+
+    def key(self, text: str) -> str:
+        """The cache key of `text` under this cache's fingerprint."""
+        digest = hashlib.sha256()
+        digest.update(self.fingerprint.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(self.normalize(text).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get_many(self, keys):
+        """Returns {key: vector} for the given keys that are in the cache."""
+        found = {}
+        keys = list(dict.fromkeys(keys))
+        for start in range(0, len(keys), 500): # Stay below SQLite's bound parameter limit
+            batch = keys[start:start + 500]
+            rows = self.connection.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({', '.join('?' * len(batch))})", batch
+            )
+            for key, vector in rows:
+                found[key] = np.frombuffer(vector, dtype=np.float32).copy()
+        return found
+
+    def put_many(self, vectors):
+        """Stores {key: vector} as float32, replacing any existing entries."""
+        now = time.time()
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+            [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in vectors.items()]
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+class CachedEmbeddingGenerator:
+    """
+    Stands in for EmbeddingGenerator in main.py: documents found in the EmbeddingCache get their
+    stored vector, and only the rest are embedded, after which their vectors are stored.
+    The EmbeddingGenerator, and with it the model, is only loaded on the first cache miss,
+    so a run in which every document hits never loads the model at all.
+    """
+    save_embedding_to_bytes = staticmethod(EmbeddingGenerator.save_embedding_to_bytes)
+
+    def __init__(self, config, cache: EmbeddingCache = None):
+        """
+        Args:
+            config (dict): The service config, passed on to EmbeddingGenerator when it is needed.
+            cache (EmbeddingCache, optional): Defaults to one at models.embedding.cache.path.
+        """
+        self.config = config
+        if cache is None:
+            cache_config = config['models']['embedding'].get('cache', {})
+            cache = EmbeddingCache(
+                cache_config.get('path', 'embedding_cache/embeddings.sqlite'), EmbeddingGenerator.fingerprint(config)
+            )
+        self.cache = cache
+        self.generator = None
+
+        self.hits = 0
+        self.misses = 0
+        self.embedding_seconds = 0.0
+
+    def _load_generator(self):
+        if self.generator is None:
+            self.generator = EmbeddingGenerator(self.config)
+        return self.generator
+
+    def generate_embedding_for_text(self, text):
+        """Like EmbeddingGenerator.generate_embedding_for_text, through the cache."""
+        return self.generate_embeddings_for_texts([text])[0]
+
+    def generate_embeddings_for_texts(self, texts):
+        """
+        Like EmbeddingGenerator.generate_embeddings_for_texts, through the cache. Texts that are
+        identical after normalization are embedded once. Returns a list aligned with `texts`,
+        holding None for empty texts.
+        """
+        keys = [self.cache.key(text) if text and text.strip() else None for text in texts]
+        vectors = self.cache.get_many([key for key in keys if key is not None])
+
+        missing = {}
+        for text, key in zip(texts, keys):
+            if key is not None and key not in vectors:
+                missing.setdefault(key, text)
+        self.hits += sum(1 for key in keys if key is not None) - len(missing)
+        if missing:
+            generator = self._load_generator()
+            start = time.perf_counter()
+            embedded = generator.generate_embeddings_for_texts(list(missing.values()))
+            self.embedding_seconds += time.perf_counter() - start
+            self.misses += len(missing)
+
+            new_vectors = {key: vector for key, vector in zip(missing, embedded) if vector is not None}
+            self.cache.put_many(new_vectors)
+            vectors.update(new_vectors)
+
+        return [vectors.get(key) if key is not None else None for key in keys]
+
+    def report(self) -> str:
+        """The run's hit rate and the encoding time saved, estimated from the misses' average."""
+        lookups = self.hits + self.misses
+        if not lookups:
+            return "Embedding cache: no documents looked up."
+        line = f"Embedding cache: {self.hits}/{lookups} documents hit ({self.hits / lookups:.1%})"
+        if self.misses:
+            saved = self.hits * self.embedding_seconds / self.misses
+            line += f", about {saved:.1f}s of encoding saved"
+        else:
+            line += ", the model was never loaded"
+        return line
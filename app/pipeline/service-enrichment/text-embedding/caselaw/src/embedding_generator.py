@@ -1,17 +1,27 @@
+import hashlib
+import json
 import torch
 from sentence_transformers import SentenceTransformer
 import numpy as np
 from io import BytesIO
+from src.onnx_encoder import OnnxEncoder
 
 class EmbeddingGenerator:
     """
     Handles the text chunking and embedding generation using a sentence-transformer model.
     """
+    # The BGE model requires a specific instruction for retrieval tasks
+    instruction = "Represent this sentence for searching relevant passages: "
+
     def __init__(self, config):
         model_config = config['models']['embedding']
         self.model_name = model_config['model_name']
+        # 'tokens' chunks with the model's tokenizer, 'characters' uses fixed character windows
+        self.chunking = model_config.get('chunking', 'characters')
         self.chunk_size = model_config['chunk_size']
         self.chunk_overlap = model_config['chunk_overlap']
+        # Chunks per model.encode call when embedding several documents together
+        self.encode_batch_size = model_config.get('encode_batch_size', 32)
         
         # Auto-detect and use GPU if available
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -19,12 +29,110 @@ class EmbeddingGenerator:
         
         # Load the model onto the specified device
         self.model = SentenceTransformer(self.model_name, device=self.device)
-        
-        # The BGE model requires a specific instruction for retrieval tasks
-        self.instruction = "Represent this sentence for searching relevant passages: "
+
+        # Optionally swap in an ONNX Runtime copy of the model for CPU inference
+        self.backend = model_config.get('backend', 'torch')
+        if self.backend == 'onnx':
+            onnx_config = model_config.get('onnx', {})
+            self.device = "cpu"
+            self.model = OnnxEncoder(
+                self.model, self.model_name,
+                cache_dir=onnx_config.get('cache_dir', '/tmp/onnx-models'),
+                quantize=onnx_config.get('quantize', True),
+                intra_op_threads=onnx_config.get('intra_op_threads', 0)
+            )
+        elif self.backend != 'torch':
+            raise ValueError(f"Unknown embedding backend '{self.backend}'. Choose 'torch' or 'onnx'.")
+
+        if self.chunking == 'tokens':
+            self._configure_token_chunking(model_config)
+        elif self.chunking != 'characters':
+            raise ValueError(f"Unknown chunking '{self.chunking}'. Choose 'tokens' or 'characters'.")
+
+    @classmethod
+    def fingerprint(cls, config):
+        """
+        Returns a digest of every setting that changes the vector of a given text: the model,
+        its backend, the instruction and the chunking parameters in use. It is computed from the
+        config alone, so cached vectors can be looked up without loading the model.
+        """
+        model_config = config['models']['embedding']
+        chunking = model_config.get('chunking', 'characters')
+        backend = model_config.get('backend', 'torch')
+        settings = {
+            'model_name': model_config['model_name'],
+            'backend': backend,
+            'instruction': cls.instruction,
+            'chunking': chunking,
+        }
+        if backend == 'onnx':
+            settings['quantize'] = model_config.get('onnx', {}).get('quantize', True)
+        if chunking == 'tokens':
+            settings['chunk_tokens'] = model_config.get('chunk_tokens')
+            settings['chunk_overlap_tokens'] = model_config.get('chunk_overlap_tokens', 64)
+        else:
+            settings['chunk_size'] = model_config['chunk_size']
+            settings['chunk_overlap'] = model_config['chunk_overlap']
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _configure_token_chunking(self, model_config):
+        """
+        Sizes token chunks so that the instruction, a chunk and the model's special tokens
+        always fit within the model's max_seq_length, so nothing is truncated.
+        """
+        self.tokenizer = self.model.tokenizer
+        if not getattr(self.tokenizer, 'is_fast', False):
+            raise ValueError(f"Token chunking needs a fast tokenizer with offsets, but {self.model_name} has none.")
+
+        instruction_tokens = len(self.tokenizer(self.instruction, add_special_tokens=False)['input_ids'])
+        token_limit = self.model.max_seq_length - self.tokenizer.num_special_tokens_to_add(pair=False) - instruction_tokens
+        self.chunk_tokens = min(model_config.get('chunk_tokens') or token_limit, token_limit)
+        self.chunk_overlap_tokens = model_config.get('chunk_overlap_tokens', 64)
+        if not 0 <= self.chunk_overlap_tokens < self.chunk_tokens:
+            raise ValueError(f"chunk_overlap_tokens must be below the {self.chunk_tokens} tokens of a chunk.")
+        print(f"EmbeddingGenerator: Chunking by tokens, {self.chunk_tokens} per chunk with {self.chunk_overlap_tokens} overlapping")
 
     def _chunk_text(self, text):
-        """Splits text into overlapping chunks."""
+        """Splits text into overlapping chunks, by tokens or by characters as configured."""
+        if self.chunking == 'tokens':
+            return self._chunk_text_by_tokens(text)
+        return self._chunk_text_by_characters(text)
+
+    def _chunk_text_by_tokens(self, text):
+        """
+        Splits text into chunks of up to `chunk_tokens` tokens that overlap by about
+        `chunk_overlap_tokens`, using the tokenizer's character offsets to cut the text.
+        Chunks start and end on whitespace where possible: a word cut in two would tokenize
+        into different, possibly more, pieces on its own.
+        """
+        offsets = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)['offset_mapping']
+        token_count = len(offsets)
+
+        def joined_to_previous(index):
+            return offsets[index][0] == offsets[index - 1][1]
+
+        chunks = []
+        start = 0
+        while start < token_count:
+            end = min(start + self.chunk_tokens, token_count)
+            if end < token_count:
+                word_end = end
+                while word_end > start + 1 and joined_to_previous(word_end):
+                    word_end -= 1
+                if word_end > start + 1:
+                    end = word_end # Otherwise one word fills the whole chunk and has to be cut
+            chunks.append(text[offsets[start][0]:offsets[end - 1][1]])
+            if end == token_count:
+                break
+
+            next_start = max(end - self.chunk_overlap_tokens, start + 1)
+            while next_start < end and joined_to_previous(next_start):
+                next_start += 1
+            start = next_start
+        return chunks
+
+    def _chunk_text_by_characters(self, text):
+        """Splits text into overlapping chunks of `chunk_size` characters."""
         chunks = []
         start = 0
         while start < len(text):
@@ -61,7 +169,56 @@ class EmbeddingGenerator:
         
         return document_embedding
 
-    def save_embedding_to_bytes(self, embedding_vector):
+    def generate_embeddings_for_texts(self, texts):
+        """
+        Generates one embedding vector per text, like generate_embedding_for_text, but encodes the
+        chunks of all texts together. Chunks are sorted by length and packed into encode batches of
+        `encode_batch_size`, so short documents fill the batches instead of each leaving them mostly
+        empty, and each batch pads to similar lengths. The chunk embeddings are then scattered back
+        to their documents and averaged.
+
+        Returns a list aligned with `texts`, holding None for empty texts.
+        """
+        chunks_with_instruction = []
+        chunk_owners = []
+        for doc_index, text in enumerate(texts):
+            if not text or not text.strip():
+                print(f"Warning: Received empty text for embedding at position {doc_index}. Returning None for it.")
+                continue
+            for chunk in self._chunk_text(text):
+                chunks_with_instruction.append(self.instruction + chunk)
+                chunk_owners.append(doc_index)
+
+        embeddings = [None] * len(texts)
+        if not chunks_with_instruction:
+            return embeddings
+
+        # Longest chunks first, so each batch pads to about the same length
+        order = sorted(range(len(chunks_with_instruction)), key=lambda i: len(chunks_with_instruction[i]), reverse=True)
+        chunk_embeddings = None
+        for start in range(0, len(order), self.encode_batch_size):
+            batch = order[start:start + self.encode_batch_size]
+            batch_embeddings = self.model.encode(
+                [chunks_with_instruction[i] for i in batch],
+                batch_size=len(batch),
+                normalize_embeddings=True, # Important for similarity search
+                show_progress_bar=False
+            )
+            if chunk_embeddings is None:
+                chunk_embeddings = np.empty((len(order), batch_embeddings.shape[1]), dtype=batch_embeddings.dtype)
+            chunk_embeddings[batch] = batch_embeddings
+
+        # Scatter the chunk embeddings back to their documents and average them
+        owners = np.asarray(chunk_owners)
+        sums = np.zeros((len(texts), chunk_embeddings.shape[1]), dtype=np.float64)
+        np.add.at(sums, owners, chunk_embeddings)
+        counts = np.bincount(owners, minlength=len(texts))
+        for doc_index in np.flatnonzero(counts):
+            embeddings[doc_index] = (sums[doc_index] / counts[doc_index]).astype(chunk_embeddings.dtype)
+        return embeddings
+
+    @staticmethod
+    def save_embedding_to_bytes(embedding_vector):
         """Saves a numpy array to an in-memory bytes buffer."""
         bytes_io = BytesIO()
         np.save(bytes_io, embedding_vector)
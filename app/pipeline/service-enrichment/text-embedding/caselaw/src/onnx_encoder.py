@@ -0,0 +1,148 @@
+import inspect
+import os
+import re
+import numpy as np
+import torch
+
+class OnnxEncoder:
+    """
+    Runs a sentence-transformer's encoder with ONNX Runtime on CPU, optionally with dynamic int8
+    quantization of its weights. It is a drop-in for the SentenceTransformer in EmbeddingGenerator:
+    it keeps the model's tokenizer and max_seq_length and has a compatible encode().
+
+    The transformer is exported to ONNX once and cached on disk. Pooling (CLS or mean, as in the
+    sentence-transformer's Pooling module) and normalisation are done in numpy on its output.
+    """
+    SUPPORTED_POOLING = ('cls', 'mean')
+    FUSABLE_MODEL_TYPES = ('bert', 'roberta', 'xlm-roberta')
+
+    def __init__(self, sentence_transformer, model_name: str, cache_dir: str, quantize: bool = True, intra_op_threads: int = 0):
+        """
+        Args:
+            sentence_transformer (SentenceTransformer): The loaded model to export and mirror.
+            model_name (str): Its name, used for the cached export's folder.
+            cache_dir (str): Where the exported .onnx files are kept between runs.
+            quantize (bool): Run the dynamically int8-quantized export instead of the float32 one.
+            intra_op_threads (int): ONNX Runtime threads per operator; 0 lets it use one per physical core.
+        """
+        import onnxruntime
+
+        self.tokenizer = sentence_transformer.tokenizer
+        self.max_seq_length = sentence_transformer.max_seq_length
+        self.pooling_mode = self._pooling_mode(sentence_transformer)
+
+        model_dir = os.path.join(cache_dir, re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name.strip('/')))
+        model_path = self.export(sentence_transformer, os.path.join(model_dir, 'model.onnx'))
+        if quantize:
+            model_path = self.quantize(model_path, os.path.join(model_dir, 'model_int8.onnx'))
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = intra_op_threads
+        session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(model_path, session_options, providers=['CPUExecutionProvider'])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+        print(f"OnnxEncoder: Loaded {model_path} ({'int8' if quantize else 'float32'}, {self.pooling_mode} pooling)")
+
+    @classmethod
+    def _pooling_mode(cls, sentence_transformer) -> str:
+        pooling = next((module for module in sentence_transformer if type(module).__name__ == 'Pooling'), None)
+        if pooling is None:
+            raise ValueError("The ONNX backend needs a sentence-transformer with a Pooling module.")
+        # Newer sentence-transformers name the mode; older ones set one boolean flag per mode
+        mode = getattr(pooling, 'pooling_mode', None)
+        if mode is None:
+            mode = 'cls' if pooling.pooling_mode_cls_token else 'mean' if pooling.pooling_mode_mean_tokens else 'other'
+        if mode not in cls.SUPPORTED_POOLING:
+            raise ValueError(f"The ONNX backend only supports {' or '.join(cls.SUPPORTED_POOLING)} pooling, not '{mode}'.")
+        return mode
+
+    @classmethod
+    def export(cls, sentence_transformer, path: str) -> str:
+        """
+        Exports the transformer's last hidden state to `path`, unless it is already there.
+        BERT-family models are then rewritten with ONNX Runtime's fused Attention, Gelu and
+        LayerNorm kernels, which is why attention is traced in its plain (eager) form.
+        """
+        if os.path.exists(path):
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        auto_model = sentence_transformer[0].auto_model.to('cpu').eval()
+        example = sentence_transformer.tokenizer(["An example sentence to trace."], return_tensors='pt')
+        input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in example]
+
+        class LastHiddenState(torch.nn.Module):
+            def __init__(self):
+                super().__init__()
+                self.auto_model = auto_model
+
+            def forward(self, *inputs):
+                return self.auto_model(**dict(zip(input_names, inputs))).last_hidden_state
+
+        print(f"OnnxEncoder: Exporting the model to {path}")
+        attn_implementation = getattr(auto_model.config, '_attn_implementation', None)
+        if hasattr(auto_model, 'set_attn_implementation'):
+            auto_model.set_attn_implementation('eager')
+        # Recent torch releases default to the dynamo exporter; older ones (e.g. the pinned 2.3) have no `dynamo` argument.
+        exporter_options = {'dynamo': False} if 'dynamo' in inspect.signature(torch.onnx.export).parameters else {}
+        try:
+            with torch.no_grad():
+                torch.onnx.export(
+                    LastHiddenState(), tuple(example[name] for name in input_names), path,
+                    input_names=input_names, output_names=['last_hidden_state'],
+                    dynamic_axes={name: {0: 'batch', 1: 'sequence'} for name in input_names + ['last_hidden_state']},
+                    opset_version=17, **exporter_options
+                )
+        finally:
+            if attn_implementation and hasattr(auto_model, 'set_attn_implementation'):
+                auto_model.set_attn_implementation(attn_implementation)
+
+        if auto_model.config.model_type in cls.FUSABLE_MODEL_TYPES:
+            from onnxruntime.transformers import optimizer
+            optimized = optimizer.optimize_model(
+                path, model_type='bert',
+                num_heads=auto_model.config.num_attention_heads, hidden_size=auto_model.config.hidden_size
+            )
+            optimized.save_model_to_file(path)
+        return path
+
+    @staticmethod
+    def quantize(fp32_path: str, path: str) -> str:
+        """Writes a copy of the model with dynamically quantized int8 weights, unless it is already there."""
+        if not os.path.exists(path):
+            import onnx
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            print(f"OnnxEncoder: Quantizing the model to {path}")
+            # Shape inference cannot type the outputs of ONNX Runtime's fused operators, so name the default
+            quantize_dynamic(
+                fp32_path, path, weight_type=QuantType.QInt8,
+                extra_options={'DefaultTensorType': onnx.TensorProto.FLOAT}
+            )
+        return path
+
+    def encode(self, sentences, batch_size: int = 32, normalize_embeddings: bool = False, show_progress_bar: bool = False):
+        """
+        Embeds `sentences` like SentenceTransformer.encode and returns a float32 array, one row each.
+        """
+        embeddings = []
+        for start in range(0, len(sentences), batch_size):
+            features = self.tokenizer(
+                list(sentences[start:start + batch_size]), padding=True, truncation=True,
+                max_length=self.max_seq_length, return_tensors='np'
+            )
+            inputs = {name: features[name].astype(np.int64) for name in self.input_names}
+            hidden_states = self.session.run(None, inputs)[0]
+
+            if self.pooling_mode == 'cls':
+                pooled = hidden_states[:, 0]
+            else:
+                mask = features['attention_mask'][..., None].astype(hidden_states.dtype)
+                pooled = (hidden_states * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            embeddings.append(pooled)
+
+        if not embeddings:
+            return np.empty((0, 0), dtype=np.float32)
+        embeddings = np.concatenate(embeddings).astype(np.float32)
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
@@ -0,0 +1,37 @@
+import string
+
+import pytest
+import torch
+
+WORDS = ("the court held that appellant respondent appeal dismissed allowed contract negligence duty of care "
+         "breach damages evidence witness tribunal order costs section act judgment reasons represent this "
+         "sentence for searching relevant passages").split()
+MAX_SEQ_LENGTH = 512
+
+
+@pytest.fixture(scope="session")
+def model_path(tmp_path_factory):
+    """
+    A tiny randomly initialised BERT sentence-transformer with a WordPiece vocabulary: common words are
+    one token, anything else falls back to single characters, so citations and numbers cost a token per
+    character or two, as they do with BGE's vocabulary.
+    """
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    torch.manual_seed(0)
+    path = tmp_path_factory.mktemp("model")
+    characters = list(string.ascii_lowercase + string.digits)
+    vocab = (["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS + characters
+             + [f"##{c}" for c in characters] + list(string.punctuation))
+    (path / "vocab.txt").write_text("\n".join(dict.fromkeys(vocab)))
+    BertTokenizerFast(vocab_file=str(path / "vocab.txt")).save_pretrained(path / "bert")
+    BertModel(BertConfig(
+        vocab_size=len(dict.fromkeys(vocab)), hidden_size=32, num_hidden_layers=1, num_attention_heads=2,
+        intermediate_size=64, max_position_embeddings=MAX_SEQ_LENGTH
+    )).save_pretrained(path / "bert")
+
+    transformer = models.Transformer(str(path / "bert"), max_seq_length=MAX_SEQ_LENGTH)
+    pooling = models.Pooling(transformer.get_word_embedding_dimension(), pooling_mode="mean")
+    SentenceTransformer(modules=[transformer, pooling], device="cpu").save(str(path / "st"))
+    return str(path / "st")
@@ -0,0 +1,89 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from src import embedding_cache
+from src.embedding_cache import CachedEmbeddingGenerator, EmbeddingCache
+from src.embedding_generator import EmbeddingGenerator
+from tests.conftest import WORDS
+
+
+def make_config(model_path, **options):
+    return {'models': {'embedding': {
+        'model_name': model_path, 'chunking': 'tokens', 'chunk_size': 1500, 'chunk_overlap': 200, **options,
+    }}}
+
+
+def make_cached_generator(config, cache_path):
+    return CachedEmbeddingGenerator(config, EmbeddingCache(str(cache_path), EmbeddingGenerator.fingerprint(config)))
+
+
+def documents(count, seed=5):
+    rng = np.random.default_rng(seed)
+    return [" ".join(rng.choice(WORDS, size=size)) for size in rng.integers(20, 600, size=count)]
+
+
+@pytest.fixture(autouse=True)
+def cpu_only():
+    with mock.patch("torch.cuda.is_available", return_value=False):
+        yield
+
+
+def test_cached_vectors_match_and_skip_the_model(model_path, tmp_path):
+    config = make_config(model_path)
+    texts = documents(6)
+    first_run = make_cached_generator(config, tmp_path / "cache.sqlite")
+    expected = first_run.generate_embeddings_for_texts(texts)
+
+    with mock.patch.object(embedding_cache, "EmbeddingGenerator", wraps=EmbeddingGenerator) as generator_class:
+        second_run = make_cached_generator(config, tmp_path / "cache.sqlite")
+        actual = second_run.generate_embeddings_for_texts(texts)
+
+    generator_class.assert_not_called()
+    assert second_run.generator is None
+    assert (second_run.hits, second_run.misses) == (6, 0)
+    assert all(np.array_equal(a, b) for a, b in zip(actual, expected))
+    assert "6/6 documents hit (100.0%)" in second_run.report()
+
+
+def test_only_changed_documents_are_embedded(model_path, tmp_path):
+    config = make_config(model_path)
+    texts = documents(6)
+    make_cached_generator(config, tmp_path / "cache.sqlite").generate_embeddings_for_texts(texts)
+
+    changed = texts[:4] + [texts[4] + " appeal allowed", "costs order"]
+    generator = make_cached_generator(config, tmp_path / "cache.sqlite")
+    generator._load_generator()
+    with mock.patch.object(generator.generator, "generate_embeddings_for_texts",
+                           wraps=generator.generator.generate_embeddings_for_texts) as embed:
+        generator.generate_embeddings_for_texts(changed)
+
+    embed.assert_called_once_with(changed[4:])
+    assert (generator.hits, generator.misses) == (4, 2)
+    assert "4/6 documents hit (66.7%), about" in generator.report()
+
+
+def test_normalized_duplicates_are_embedded_once(model_path, tmp_path):
+    generator = make_cached_generator(make_config(model_path), tmp_path / "cache.sqlite")
+    text = documents(1)[0]
+
+    vectors = generator.generate_embeddings_for_texts([text, "  " + text + "\r\n", "", text])
+
+    assert vectors[2] is None
+    assert (generator.hits, generator.misses) == (2, 1)
+    assert np.array_equal(vectors[0], vectors[1]) and np.array_equal(vectors[0], vectors[3])
+
+
+@pytest.mark.parametrize("options", [
+    {'chunk_overlap_tokens': 32},
+    {'chunking': 'characters'},
+    {'backend': 'onnx'},
+])
+def test_settings_that_change_vectors_change_the_key(model_path, options):
+    assert EmbeddingGenerator.fingerprint(make_config(model_path, **options)) != EmbeddingGenerator.fingerprint(make_config(model_path))
+
+
+def test_settings_that_keep_vectors_keep_the_key(model_path):
+    assert EmbeddingGenerator.fingerprint(make_config(model_path, encode_batch_size=8, chunk_size=999)) \
+        == EmbeddingGenerator.fingerprint(make_config(model_path))
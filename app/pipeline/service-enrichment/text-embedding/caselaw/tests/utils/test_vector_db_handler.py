@@ -0,0 +1,176 @@
+import json
+import threading
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+from opensearchpy import OpenSearch
+
+from utils.vector_db_handler import VectorDBHandler
+
+INDEX_NAME = "legal-store"
+
+
+class FakeOpenSearch(ThreadingHTTPServer):
+    """
+    A local OpenSearch endpoint that records every request. Bulk items are accepted with 201
+    unless `statuses` holds a list of statuses to answer for a doc_id, one per attempt.
+    """
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeOpenSearchHandler)
+        self.requests = Counter()
+        self.bulk_doc_ids = []
+        self.bulk_bytes = []
+        self.indexed = []
+        self.statuses = defaultdict(list)
+
+
+class FakeOpenSearchHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        path = self.path.split("?")[0]
+        server.requests[path] += 1
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+
+        if path == "/_bulk":
+            lines = [json.loads(line) for line in body.splitlines() if line.strip()]
+            items = []
+            server.bulk_doc_ids.append([])
+            server.bulk_bytes.append(len(body.encode("utf-8")))
+            for action, document in zip(lines[::2], lines[1::2]):
+                doc_id = document["doc_id"]
+                server.bulk_doc_ids[-1].append(doc_id)
+                status = server.statuses[doc_id].pop(0) if server.statuses[doc_id] else 201
+                item = {"_index": action["index"]["_index"], "status": status}
+                if status < 300:
+                    server.indexed.append(doc_id)
+                else:
+                    item["error"] = {"type": "rejected_execution_exception" if status == 429 else "mapper_parsing_exception"}
+                items.append({"index": item})
+            response = {"took": 1, "errors": any(item["index"]["status"] >= 300 for item in items), "items": items}
+        elif path == f"/{INDEX_NAME}/_doc":
+            server.indexed.append(json.loads(body)["doc_id"])
+            response = {"result": "created"}
+        else:
+            response = {}
+
+        payload = json.dumps(response).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_opensearch():
+    server = FakeOpenSearch()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_handler(server, **bulk_options):
+    config = {'vector_db': {
+        'host': "127.0.0.1", 'index_name': INDEX_NAME, 'doc_type': "case-law", 'default_region': "ap-southeast-2",
+        'bulk_initial_backoff': 0, **bulk_options,
+    }}
+    client = OpenSearch(hosts=[{'host': "127.0.0.1", 'port': server.server_address[1]}])
+    return VectorDBHandler(config, client=client)
+
+
+def vector(seed):
+    return np.random.default_rng(seed).random(16, dtype=np.float32)
+
+
+def test_bulk_indexing_sends_one_request_per_bulk(fake_opensearch):
+    handler = make_handler(fake_opensearch, bulk_max_docs=50)
+    outcomes = []
+    for i in range(120):
+        handler.queue_document(f"doc-{i}", vector(i), context=i)
+        outcomes += handler.flush_if_due()
+    assert len(outcomes) == 100
+    outcomes += handler.flush()
+
+    assert fake_opensearch.requests == {"/_bulk": 3}
+    assert [len(doc_ids) for doc_ids in fake_opensearch.bulk_doc_ids] == [50, 50, 20]
+    assert outcomes == [(f"doc-{i}", i, None) for i in range(120)]
+    assert fake_opensearch.indexed == [f"doc-{i}" for i in range(120)]
+
+
+def test_single_document_indexing_sends_one_request_per_document(fake_opensearch):
+    handler = make_handler(fake_opensearch)
+    for i in range(20):
+        handler.index_document(f"doc-{i}", vector(i))
+
+    assert fake_opensearch.requests == {f"/{INDEX_NAME}/_doc": 20}
+
+
+def test_buffer_is_flushed_by_size(fake_opensearch):
+    handler = make_handler(fake_opensearch, bulk_max_docs=1000, bulk_max_bytes=1000)
+    for i in range(10):
+        handler.queue_document(f"doc-{i}", vector(i))
+        handler.flush_if_due()
+    handler.flush()
+
+    assert len(fake_opensearch.bulk_doc_ids) > 2
+    assert all(size <= 1000 for size in fake_opensearch.bulk_bytes)
+    assert sum(fake_opensearch.bulk_doc_ids, []) == [f"doc-{i}" for i in range(10)]
+
+
+def test_only_rejected_documents_are_retried(fake_opensearch):
+    fake_opensearch.statuses["doc-1"] = [429, 503, 201]
+    fake_opensearch.statuses["doc-2"] = [400]
+    fake_opensearch.statuses["doc-3"] = [429, 429, 429, 429]
+    handler = make_handler(fake_opensearch, bulk_max_retries=3)
+    for i in range(5):
+        handler.queue_document(f"doc-{i}", vector(i), context=i)
+
+    outcomes = {doc_id: error for doc_id, _, error in handler.flush()}
+
+    assert fake_opensearch.bulk_doc_ids == [
+        ["doc-0", "doc-1", "doc-2", "doc-3", "doc-4"], ["doc-1", "doc-3"], ["doc-1", "doc-3"], ["doc-3"]
+    ]
+    assert [doc_id for doc_id, error in outcomes.items() if error is None] == ["doc-0", "doc-4", "doc-1"]
+    assert "status 400" in str(outcomes["doc-2"])
+    assert "status 429" in str(outcomes["doc-3"])
+    assert sorted(fake_opensearch.indexed) == ["doc-0", "doc-1", "doc-4"]
+
+
+def test_refresh_is_deferred_to_the_end(fake_opensearch):
+    handler = make_handler(fake_opensearch, bulk_max_docs=10)
+    for i in range(25):
+        handler.queue_document(f"doc-{i}", vector(i))
+        handler.flush_if_due()
+    assert fake_opensearch.requests[f"/{INDEX_NAME}/_refresh"] == 0
+
+    handler.flush()
+    handler.refresh()
+
+    assert fake_opensearch.requests == {"/_bulk": 3, f"/{INDEX_NAME}/_refresh": 1}
+
+
+def test_unreachable_cluster_fails_every_document_without_retrying(fake_opensearch):
+    """
+    Documents without a response are not resent: without an _id a resent document that did arrive would be indexed twice.
+    """
+    handler = make_handler(fake_opensearch, bulk_max_retries=1)
+    fake_opensearch.shutdown()
+    fake_opensearch.server_close()
+    for i in range(3):
+        handler.queue_document(f"doc-{i}", vector(i))
+    bulk_calls = []
+    bulk = handler._bulk
+    handler._bulk = lambda actions: bulk_calls.append(len(actions)) or bulk(actions)
+
+    outcomes = handler.flush()
+
+    assert bulk_calls == [3]
+    assert [doc_id for doc_id, _, error in outcomes if error is not None] == ["doc-0", "doc-1", "doc-2"]
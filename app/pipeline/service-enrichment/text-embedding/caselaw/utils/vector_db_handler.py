@@ -1,16 +1,31 @@
+import time
 import boto3
-from opensearchpy import OpenSearch, RequestsHttpConnection
+from opensearchpy import OpenSearch, RequestsHttpConnection, helpers
+from opensearchpy.helpers import BulkIndexError
 from requests_aws4auth import AWS4Auth
 
 class VectorDBHandler:
     """Handles all OpenSearch interactions."""
-    def __init__(self, config):
+    def __init__(self, config, client=None):
         vector_db_config = config['vector_db']
         self.host = vector_db_config['host']
         self.index_name = vector_db_config['index_name']
         self.doc_type = vector_db_config['doc_type']
         region = vector_db_config['default_region']
         
+        # Bulk indexing: documents are buffered and sent once either limit is reached
+        self.bulk_max_docs = vector_db_config.get('bulk_max_docs', 500)
+        self.bulk_max_bytes = vector_db_config.get('bulk_max_bytes', 10 * 1024 * 1024)
+        self.bulk_max_retries = vector_db_config.get('bulk_max_retries', 3)
+        self.bulk_initial_backoff = vector_db_config.get('bulk_initial_backoff', 2)
+        self.bulk_threads = vector_db_config.get('bulk_threads', 1)
+        self._buffer = [] # (doc_id, action, context) per queued document
+        self._buffer_bytes = 0
+
+        if client is not None:
+            self.client = client
+            return
+
         # Get credentials using boto3 for AWS OpenSearch Serverless
         service = 'aoss'
         credentials = boto3.Session().get_credentials()
@@ -33,13 +48,16 @@ class VectorDBHandler:
         )
         print(f"VectorDBHandler: Connected to OpenSearch host '{self.host}'")
 
-    def index_document(self, doc_id, embedding_vector):
-        """Indexes a single document into OpenSearch."""
-        document = {
+    def _document(self, doc_id, embedding_vector):
+        return {
             "doc_id": doc_id,
             "doc_type": self.doc_type,
             "caselaw_embedding": embedding_vector.tolist() # Convert numpy array to list
         }
+
+    def index_document(self, doc_id, embedding_vector):
+        """Indexes a single document into OpenSearch."""
+        document = self._document(doc_id, embedding_vector)
         
         try:
             self.client.index(
@@ -51,3 +69,80 @@ class VectorDBHandler:
         except Exception as e:
             print(f"ERROR: Failed to index doc_id {doc_id} into OpenSearch.")
             raise e
+
+    def queue_document(self, doc_id, embedding_vector, context=None):
+        """
+        Buffers a document for the next bulk request instead of indexing it right away.
+        `context` is handed back with the document's outcome by flush_if_due or flush.
+        """
+        document = self._document(doc_id, embedding_vector)
+        action = {"_op_type": "index", "_index": self.index_name, "_source": document}
+        self._buffer.append((doc_id, action, context))
+        self._buffer_bytes += len(self.client.transport.serializer.dumps(document))
+
+    def flush_if_due(self):
+        """Flushes the buffer once it holds bulk_max_docs documents or bulk_max_bytes of them."""
+        if len(self._buffer) >= self.bulk_max_docs or self._buffer_bytes >= self.bulk_max_bytes:
+            return self.flush()
+        return []
+
+    def flush(self):
+        """
+        Indexes every buffered document with bulk requests of up to bulk_max_docs documents and
+        bulk_max_bytes. Documents rejected with a 429 or 5xx item status are sent again, on their own,
+        up to bulk_max_retries times with exponential backoff. Documents that got no response are not:
+        the actions carry no _id, so resending one that did reach OpenSearch would index it twice.
+
+        Returns a list of (doc_id, context, error) per document, where error is None once indexed.
+        """
+        pending, self._buffer, self._buffer_bytes = self._buffer, [], 0
+        if not pending:
+            return []
+
+        outcomes = []
+        for attempt in range(self.bulk_max_retries + 1):
+            if attempt:
+                time.sleep(self.bulk_initial_backoff * 2 ** (attempt - 1))
+            to_retry = []
+            for entry, (ok, info) in zip(pending, self._bulk([action for _, action, _ in pending])):
+                doc_id, _, context = entry
+                if ok:
+                    outcomes.append((doc_id, context, None))
+                    continue
+                status = next(iter(info.values())).get('status')
+                if attempt < self.bulk_max_retries and self._is_retryable(status):
+                    to_retry.append(entry)
+                else:
+                    outcomes.append((doc_id, context, BulkIndexError(f"Failed to index doc_id {doc_id} (status {status}).", [info])))
+            if not to_retry:
+                break
+            print(f"VectorDBHandler: Retrying {len(to_retry)} of {len(pending)} documents rejected by OpenSearch.")
+            pending = to_retry
+
+        failures = sum(1 for _, _, error in outcomes if error is not None)
+        print(f"VectorDBHandler: Bulk indexed {len(outcomes) - failures} documents into '{self.index_name}', {failures} failed.")
+        return outcomes
+
+    def _bulk(self, actions):
+        """Yields (ok, info) per action, in order, without raising on failed documents."""
+        options = dict(
+            chunk_size=self.bulk_max_docs, max_chunk_bytes=self.bulk_max_bytes,
+            raise_on_error=False, raise_on_exception=False
+        )
+        if self.bulk_threads > 1:
+            return helpers.parallel_bulk(self.client, actions, thread_count=self.bulk_threads, **options)
+        return helpers.streaming_bulk(self.client, actions, **options)
+
+    @staticmethod
+    def _is_retryable(status):
+        # Connection errors and timeouts carry no HTTP status and may have been indexed already
+        return isinstance(status, int) and (status == 429 or status >= 500)
+
+    def refresh(self):
+        """Makes everything indexed so far searchable. Called once at the end of a run."""
+        try:
+            self.client.indices.refresh(index=self.index_name)
+            print(f"VectorDBHandler: Refreshed index '{self.index_name}'")
+        except Exception as e:
+            # OpenSearch Serverless refreshes on its own schedule and may reject the call
+            print(f"Warning: Could not refresh index '{self.index_name}': {e}")
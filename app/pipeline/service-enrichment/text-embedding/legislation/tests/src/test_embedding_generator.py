@@ -0,0 +1,111 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from src.embedding_generator import EmbeddingGenerator
+from tests.conftest import MAX_SEQ_LENGTH, WORDS
+
+
+def make_generator(model_path, chunking, **options):
+    with mock.patch("torch.cuda.is_available", return_value=False):
+        return EmbeddingGenerator({'models': {'embedding': {
+            'model_name': model_path, 'chunking': chunking, 'chunk_size': 1500, 'chunk_overlap': 200, **options,
+        }}})
+
+
+def judgment(words, seed=0):
+    rng = np.random.default_rng(seed)
+    return " ".join(rng.choice(WORDS, size=words))
+
+
+def citations(count):
+    return " ".join(f"[{2000 + i % 25}] NSWSC {100 + i} at [{i % 90}];" for i in range(count))
+
+
+def encoded_lengths(generator, chunks):
+    """Token count of each chunk as the model encodes it: instruction, chunk and special tokens."""
+    tokenizer = generator.model.tokenizer
+    return [len(tokenizer(generator.instruction + chunk)['input_ids']) for chunk in chunks]
+
+
+@pytest.mark.parametrize("text", [judgment(3000), citations(400), judgment(800) + " " + citations(150)],
+                         ids=["words", "citations", "mixed"])
+def test_token_chunks_are_never_truncated(model_path, text):
+    generator = make_generator(model_path, 'tokens')
+
+    chunks = generator._chunk_text(text)
+
+    lengths = encoded_lengths(generator, chunks)
+    assert max(lengths) <= MAX_SEQ_LENGTH
+    assert min(lengths[:-1]) > 0.85 * MAX_SEQ_LENGTH # Every chunk but the last fills most of the window
+
+
+def test_character_chunks_of_citations_overflow_the_token_limit(model_path):
+    """The problem token chunking solves: 1500 characters of citations are well over 512 tokens."""
+    generator = make_generator(model_path, 'characters')
+
+    lengths = encoded_lengths(generator, generator._chunk_text(citations(400)))
+
+    assert max(lengths) > MAX_SEQ_LENGTH
+
+
+def test_token_chunks_cover_the_text_with_overlap(model_path):
+    generator = make_generator(model_path, 'tokens', chunk_tokens=100, chunk_overlap_tokens=20)
+    text = judgment(1000)
+
+    chunks = generator._chunk_text(text)
+
+    assert chunks[0] == text[:len(chunks[0])]
+    assert text.endswith(chunks[-1])
+    position = 0
+    for previous, chunk in zip(chunks, chunks[1:]):
+        start = text.index(chunk, position)
+        assert start < position + len(previous) # Overlaps the previous chunk
+        overlap_words = len(text[start:position + len(previous)].split())
+        assert 15 <= overlap_words <= 20
+        position = start
+    for chunk in chunks: # Never cut inside a word
+        assert chunk == chunk.strip() and chunk.split()[0] in WORDS and chunk.split()[-1] in WORDS
+
+
+def test_token_chunking_needs_fewer_encoded_chunks_per_document(model_path):
+    token_generator = make_generator(model_path, 'tokens')
+    character_generator = make_generator(model_path, 'characters')
+    documents = [judgment(words, seed) for seed, words in enumerate([200, 900, 3000, 8000])]
+
+    with mock.patch.object(token_generator.model, 'encode', wraps=token_generator.model.encode) as token_encode, \
+            mock.patch.object(character_generator.model, 'encode', wraps=character_generator.model.encode) as character_encode:
+        for document in documents:
+            token_generator.generate_embedding_for_text(document)
+            character_generator.generate_embedding_for_text(document)
+
+    token_chunks = sum(len(c.args[0]) for c in token_encode.call_args_list)
+    character_chunks = sum(len(c.args[0]) for c in character_encode.call_args_list)
+    assert token_chunks * 2 <= character_chunks
+
+
+def test_token_chunk_limit_leaves_room_for_instruction_and_special_tokens(model_path):
+    generator = make_generator(model_path, 'tokens', chunk_tokens=10_000)
+
+    instruction_tokens = len(generator.model.tokenizer(generator.instruction, add_special_tokens=False)['input_ids'])
+    assert generator.chunk_tokens == MAX_SEQ_LENGTH - 2 - instruction_tokens
+
+
+@pytest.mark.parametrize("options", [{'chunk_tokens': 50, 'chunk_overlap_tokens': 50}, {'chunking': 'sentences'}])
+def test_invalid_chunking_options_are_rejected(model_path, options):
+    with pytest.raises(ValueError):
+        make_generator(model_path, options.pop('chunking', 'tokens'), **options)
+
+
+def test_cross_document_batches_match_single_documents(model_path):
+    generator = make_generator(model_path, 'tokens', encode_batch_size=3)
+    documents = [judgment(words, seed) for seed, words in enumerate([50, 1200, 0, 400, 2500])]
+    documents[2] = "   "
+
+    embeddings = generator.generate_embeddings_for_texts(documents)
+
+    assert embeddings[2] is None
+    for document, embedding in zip(documents, embeddings):
+        if document.strip():
+            np.testing.assert_allclose(embedding, generator.generate_embedding_for_text(document), atol=1e-6)
@@ -0,0 +1,86 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from src.embedding_generator import EmbeddingGenerator
+from tests.conftest import WORDS
+
+pytest.importorskip("onnxruntime")
+
+
+def make_generator(model_path, cache_dir, backend, **onnx_options):
+    with mock.patch("torch.cuda.is_available", return_value=False):
+        return EmbeddingGenerator({'models': {'embedding': {
+            'model_name': model_path, 'chunking': 'tokens', 'chunk_size': 1500, 'chunk_overlap': 200,
+            'backend': backend, 'onnx': {'cache_dir': str(cache_dir), **onnx_options},
+        }}})
+
+
+def documents(count):
+    rng = np.random.default_rng(3)
+    return [" ".join(rng.choice(WORDS, size=size)) for size in rng.integers(5, 900, size=count)]
+
+
+def cosine(a, b):
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+@pytest.fixture(scope="module")
+def torch_generator(model_path, tmp_path_factory):
+    return make_generator(model_path, tmp_path_factory.mktemp("unused"), 'torch')
+
+
+@pytest.mark.parametrize("quantize, min_similarity", [(False, 0.9999), (True, 0.99)])
+def test_onnx_embeddings_match_torch(model_path, tmp_path, torch_generator, quantize, min_similarity):
+    generator = make_generator(model_path, tmp_path, 'onnx', quantize=quantize)
+    texts = documents(12)
+
+    expected = torch_generator.generate_embeddings_for_texts(texts)
+    actual = generator.generate_embeddings_for_texts(texts)
+
+    assert [len(embedding) for embedding in actual] == [len(embedding) for embedding in expected]
+    assert min(cosine(a, b) for a, b in zip(actual, expected)) > min_similarity
+
+
+def test_onnx_backend_chunks_like_torch(model_path, tmp_path, torch_generator):
+    generator = make_generator(model_path, tmp_path, 'onnx')
+    text = documents(1)[0] * 3
+
+    assert generator.device == "cpu"
+    assert generator.chunk_tokens == torch_generator.chunk_tokens
+    assert generator._chunk_text(text) == torch_generator._chunk_text(text)
+
+
+def test_onnx_export_is_cached(model_path, tmp_path):
+    make_generator(model_path, tmp_path, 'onnx')
+    exported = sorted(path.name for path in tmp_path.rglob("*.onnx"))
+    modified = {path: path.stat().st_mtime_ns for path in tmp_path.rglob("*.onnx")}
+
+    make_generator(model_path, tmp_path, 'onnx')
+
+    assert exported == ["model.onnx", "model_int8.onnx"]
+    assert {path: path.stat().st_mtime_ns for path in tmp_path.rglob("*.onnx")} == modified
+
+
+def test_unknown_backend_is_rejected(model_path, tmp_path):
+    with pytest.raises(ValueError, match="Unknown embedding backend"):
+        make_generator(model_path, tmp_path, 'tensorrt')
+
+
+def test_onnx_export_without_dynamo_argument(model_path, tmp_path):
+    """
+    torch releases without the dynamo exporter (e.g. the pinned 2.3) have no `dynamo` argument to pass.
+    """
+    import torch
+    real_export = torch.onnx.export
+
+    def export_without_dynamo(model, args, f, input_names=None, output_names=None, dynamic_axes=None, opset_version=None):
+        real_export(model, args, f, input_names=input_names, output_names=output_names,
+                    dynamic_axes=dynamic_axes, opset_version=opset_version, dynamo=False)
+
+    with mock.patch("torch.onnx.export", side_effect=export_without_dynamo, autospec=export_without_dynamo) as export:
+        make_generator(model_path, tmp_path, 'onnx', quantize=False)
+
+    assert "dynamo" not in export.call_args.kwargs
+    assert [path.name for path in tmp_path.rglob("*.onnx")] == ["model.onnx"]
@@ -0,0 +1,69 @@
+"""
+Benchmarks HtmlParser.extract_text throughput for each text extraction engine over a corpus of
+stored HTML files, and checks every engine's output against the BeautifulSoup engine.
+
+By default the corpus is tests/fixtures/html, with each document's <body> repeated --scale times so
+the documents are the size of a long judgment. Point --corpus at a folder of downloaded
+miniviewer.html files to measure on real pages (use --scale 1).
+
+Usage:
+    python benchmarks/html_text_benchmark.py [--corpus tests/fixtures/html] [--scale 20] [--rounds 5]
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+import warnings
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, PROJECT_ROOT)
+from utils.html_parser import TEXT_ENGINES, HtmlParser  # noqa: E402
+
+
+def load_corpus(corpus_dir, scale):
+    documents = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "**", "*.html"), recursive=True)):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            html_content = f.read()
+        if scale > 1:
+            body = re.search(r"<body[^>]*>(.*)</body>", html_content, re.S | re.I)
+            if body:
+                html_content = html_content.replace(body.group(1), body.group(1) * scale, 1)
+            else:
+                html_content = html_content * scale
+        documents.append(html_content)
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=os.path.join(PROJECT_ROOT, "tests", "fixtures", "html"))
+    parser.add_argument("--scale", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    documents = load_corpus(args.corpus, args.scale)
+    if not documents:
+        sys.exit(f"No .html files found under {args.corpus}")
+    total_mb = sum(len(d.encode("utf-8")) for d in documents) / 1e6
+    print(f"{len(documents)} documents, {total_mb:.2f} MB, {args.rounds} rounds")
+
+    reference = [HtmlParser(engine="bs4").extract_text(d) for d in documents]
+    baseline = None
+    for engine in TEXT_ENGINES:
+        html_parser = HtmlParser(engine=engine)
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            texts = [html_parser.extract_text(d) for d in documents]
+        elapsed = (time.perf_counter() - started) / args.rounds
+        mismatches = sum(1 for text, expected in zip(texts, reference) if text != expected)
+        baseline = baseline or elapsed
+        print(f"  {engine:>5}: {len(documents) / elapsed:8.1f} docs/s, {total_mb / elapsed:6.2f} MB/s, "
+              f"{baseline / elapsed:4.1f}x, {mismatches} mismatches")
+
+
+if __name__ == "__main__":
+    main()
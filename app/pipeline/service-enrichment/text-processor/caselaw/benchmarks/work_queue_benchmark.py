@@ -0,0 +1,134 @@
+"""
+Benchmarks finding the pending text-extraction work in a SQLite registry of 9 jurisdictions x 30 years:
+  - per-slice: the original pattern, one registry LEFT JOIN status query per year x jurisdiction
+  - work queue: WorkQueue.pages, one keyset-paginated query over every slice
+
+Each pattern runs on its own copy of the database with the indexes that suit it best:
+(jurisdiction_code, year, source_id) on the registry for per-slice, and WorkQueue.recommended_indexes
+for the work queue. Both use a (source_id, status) index on the status table. --pass-ratio of the
+cases are already done, the rest are pending or have no status record yet.
+
+Usage:
+    python benchmarks/work_queue_benchmark.py [--rows 1000000] [--pass-ratio 0.99] [--page-size 1000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from sqlalchemy import text
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, PROJECT_ROOT)
+from utils.database_connector import DatabaseConnector  # noqa: E402
+from utils.work_queue import WorkQueue  # noqa: E402
+
+REGISTRY_TABLE = "caselaw_registry"
+STATUS_TABLE = "caselaw_enrichment_status"
+STATUS_COLUMN = "status_text_processor"
+JURISDICTIONS = ["NSW", "VIC", "QLD", "WA", "SA", "TAS", "NT", "ACT", "HCA"]
+YEARS = list(range(1995, 2025))
+
+
+def build_fixture(path, rows, pass_ratio):
+    rng = random.Random(7)
+    connection = sqlite3.connect(path)
+    connection.execute(f"CREATE TABLE {REGISTRY_TABLE} (source_id TEXT PRIMARY KEY, jurisdiction_code TEXT, year INTEGER)")
+    connection.execute(f"CREATE TABLE {STATUS_TABLE} (id TEXT PRIMARY KEY, source_id TEXT, {STATUS_COLUMN} TEXT)")
+    connection.execute(f"CREATE INDEX idx_status ON {STATUS_TABLE} (source_id, {STATUS_COLUMN})")
+
+    registry_rows = [(f"{i:09d}", rng.choice(JURISDICTIONS), rng.choice(YEARS)) for i in range(rows)]
+    connection.executemany(f"INSERT INTO {REGISTRY_TABLE} VALUES (?, ?, ?)", registry_rows)
+    status_rows = []
+    for source_id, _, _ in registry_rows:
+        draw = rng.random()
+        if draw < pass_ratio:
+            status_rows.append((f"s{source_id}", source_id, 'pass'))
+        elif draw < (1 + pass_ratio) / 2: # Half of the pending cases have a status record already
+            status_rows.append((f"s{source_id}", source_id, 'failed'))
+    connection.executemany(f"INSERT INTO {STATUS_TABLE} VALUES (?, ?, ?)", status_rows)
+    connection.commit()
+    connection.close()
+
+
+def connect(path, indexes):
+    db = DatabaseConnector(db_config={'dialect': 'sqlite', 'driver': 'pysqlite', 'host': None, 'port': None, 'name': path})
+    with db.engine.connect() as conn:
+        for statement in indexes:
+            conn.execute(text(statement))
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+    return db
+
+
+def run_per_slice(db):
+    pending, queries = 0, 0
+    for year in YEARS:
+        for jurisdiction in JURISDICTIONS:
+            query = "\n".join([
+                "SELECT reg.source_id, dest.source_id AS status_source_id",
+                f"FROM {REGISTRY_TABLE} AS reg",
+                f"LEFT JOIN {STATUS_TABLE} AS dest ON reg.source_id = dest.source_id",
+                "WHERE reg.jurisdiction_code = :jurisdiction",
+                "AND reg.year = :year",
+                f"AND (dest.source_id IS NULL OR dest.{STATUS_COLUMN} != 'pass')",
+            ])
+            pending += len(db.read_sql(query, params={"jurisdiction": jurisdiction, "year": year}))
+            queries += 1
+    return pending, queries
+
+
+def run_work_queue(work_queue):
+    queries = []
+    read_sql = work_queue.db.read_sql
+    work_queue.db.read_sql = lambda *args, **kwargs: queries.append(1) or read_sql(*args, **kwargs)
+    pending = sum(len(page_df) for page_df in work_queue.pages())
+    return pending, len(queries)
+
+
+def timed(label, func):
+    with contextlib.redirect_stdout(io.StringIO()): # DatabaseConnector logs every query
+        start = time.perf_counter()
+        pending, queries = func()
+        elapsed = time.perf_counter() - start
+    print(f"{label:>10}: {pending:,} pending cases found with {queries:,} queries in {elapsed:.2f}s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--pass-ratio", type=float, default=0.99)
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        template_path = os.path.join(tmp_dir, "template.db")
+        print(f"Building a {args.rows:,}-case registry over {len(JURISDICTIONS)} jurisdictions x {len(YEARS)} years...")
+        build_fixture(template_path, args.rows, args.pass_ratio)
+        per_slice_path = os.path.join(tmp_dir, "per_slice.db")
+        work_queue_path = os.path.join(tmp_dir, "work_queue.db")
+        shutil.copy(template_path, per_slice_path)
+        shutil.copy(template_path, work_queue_path)
+
+        per_slice_db = connect(per_slice_path, [
+            f"CREATE INDEX idx_slice ON {REGISTRY_TABLE} (jurisdiction_code, year, source_id)"
+        ])
+        work_queue = WorkQueue(
+            None, REGISTRY_TABLE, STATUS_TABLE, STATUS_COLUMN, 'year',
+            jurisdictions=JURISDICTIONS, years=YEARS, page_size=args.page_size
+        )
+        work_queue.db = connect(work_queue_path, work_queue.recommended_indexes())
+
+        per_slice_seconds = timed("per-slice", lambda: run_per_slice(per_slice_db))
+        work_queue_seconds = timed("work queue", lambda: run_work_queue(work_queue))
+        print(f"Speedup: {per_slice_seconds / work_queue_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
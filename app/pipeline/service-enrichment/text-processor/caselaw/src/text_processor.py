@@ -3,7 +3,17 @@ import time
 from datetime import datetime, timezone
 from utils.database_connector import DatabaseConnector
 from utils.html_parser import HtmlParser
+from utils.pipeline import StagedPipeline
 from utils.s3_manager import S3Manager
+from utils.work_queue import WorkQueue
+
+DEFAULT_DOWNLOAD_WORKERS = 8
+DEFAULT_PARSE_WORKERS = 4
+DEFAULT_UPLOAD_WORKERS = 8
+DEFAULT_MAX_IN_FLIGHT = 64
+DEFAULT_FLUSH_EVERY = 100
+DEFAULT_FLUSH_INTERVAL_SECONDS = 30.0
+DEFAULT_WORK_QUEUE_PAGE_SIZE = 1000
 
 class TextProcessor:
     """
@@ -18,20 +28,36 @@ class TextProcessor:
             config (dict): The application configuration dictionary.
         """
         self.config = config
-        self.html_parser = HtmlParser()
+        text_extraction_config = config.get('text_extraction', {})
+        self.html_parser = HtmlParser(engine=text_extraction_config.get('engine', 'bs4'))
+
+        # Pool sizes for the download -> parse -> upload pipeline
+        self.download_workers = int(text_extraction_config.get('download_workers', DEFAULT_DOWNLOAD_WORKERS))
+        self.parse_workers = int(text_extraction_config.get('parse_workers', DEFAULT_PARSE_WORKERS))
+        self.upload_workers = int(text_extraction_config.get('upload_workers', DEFAULT_UPLOAD_WORKERS))
+        self.max_in_flight = int(text_extraction_config.get('max_in_flight', DEFAULT_MAX_IN_FLIGHT))
+        self.work_queue_page_size = int(text_extraction_config.get('work_queue_page_size', DEFAULT_WORK_QUEUE_PAGE_SIZE))
         
         # Initialize the S3 manager using the region from the config
-        self.s3_manager = S3Manager(region_name=config['aws']['default_region'])
+        self.s3_manager = S3Manager(
+            region_name=config['aws']['default_region'],
+            max_pool_connections=self.download_workers + self.upload_workers
+        )
         
         # This processor connects to both source and destination databases
         self.source_db = DatabaseConnector(db_config=config['database']['source'])
-        self.dest_db = DatabaseConnector(db_config=config['database']['destination'])
+        # Metadata counts and step results are buffered and flushed as multi-row upserts
+        self.dest_db = DatabaseConnector(
+            db_config=config['database']['destination'],
+            flush_every=int(text_extraction_config.get('flush_every', DEFAULT_FLUSH_EVERY)),
+            flush_interval=float(text_extraction_config.get('flush_interval_seconds', DEFAULT_FLUSH_INTERVAL_SECONDS))
+        )
 
     def process_cases(self):
         """
         Main method to run the text extraction pipeline.
-        It iterates through configured years and jurisdictions (or all if not specified) 
-        to find and process cases.
+        Pages through every pending case of the configured years and jurisdictions (or all if not specified)
+        with a single work-queue query and runs them through the extraction pipeline.
         """
         # Configuration for tables and S3
         dest_table_info = self.config['tables']['tables_to_write'][0]
@@ -45,121 +71,120 @@ class TextProcessor:
 
         registry_table = registry_config['table']
         registry_year_col = registry_config['column']
+        # Empty lists mean no filter: every year, and every jurisdiction configured in 'tables_to_read'
         processing_years = registry_config.get('processing_years', [])
         jurisdictions_to_process = registry_config.get('jurisdiction_codes', [])
 
-        # If processing_years is not specified in the config, we will process all years by not applying a year filter.
-        # We use a list with [None] to signify a single run that queries for all years.
-        years_to_iterate = processing_years if processing_years else [None]
-
-        # If jurisdiction_codes is empty in config, fetch all available jurisdictions from the registry.
-        if not jurisdictions_to_process:
-            print("Config 'jurisdiction_codes' is empty. Fetching all available jurisdictions from the registry.")
-            try:
-                juris_df = self.dest_db.read_sql(f"SELECT DISTINCT jurisdiction_code FROM {registry_table} WHERE jurisdiction_code IS NOT NULL AND jurisdiction_code != ''")
-                jurisdictions_to_process = juris_df['jurisdiction_code'].tolist()
-                if not jurisdictions_to_process:
-                    print("No jurisdictions found in the registry. Aborting.")
-                    return
-            except Exception as e:
-                print(f"FATAL: Could not fetch jurisdictions from registry. Aborting. Error: {e}")
-                return
-
         s3_bucket = self.config['aws']['s3']['bucket_name']
         filenames = self.config['enrichment_filenames']
         
         tables_to_read_config = self.config['tables']['tables_to_read']
         jurisdiction_lookup = {item['jurisdiction']: item for item in tables_to_read_config}
-        
-        print(f"Starting processing for jurisdictions: {jurisdictions_to_process}")
-
-        # Outer loop for years. If years_to_iterate is [None], this loop runs once without a year filter.
-        for year in years_to_iterate:
-            if year:
-                print(f"\n===== Processing Year: {year} =====")
-            else:
-                print(f"\n===== Processing for All Years =====")
 
-            # Inner loop for jurisdictions
+        if jurisdictions_to_process:
             for jurisdiction in jurisdictions_to_process:
-                jurisdiction_info = jurisdiction_lookup.get(jurisdiction)
-                if not jurisdiction_info:
+                if jurisdiction not in jurisdiction_lookup:
                     print(f"WARNING: Configuration for jurisdiction '{jurisdiction}' not found in 'tables_to_read'. Skipping.")
-                    continue
-                    
-                s3_base_folder = jurisdiction_info['s3_folder']
-                print(f"\n--- Checking Jurisdiction: {jurisdiction} ---")
+            jurisdictions_to_process = [j for j in jurisdictions_to_process if j in jurisdiction_lookup]
+            if not jurisdictions_to_process:
+                print("No configured jurisdiction has a 'tables_to_read' entry. Aborting.")
+                return
+        else:
+            jurisdictions_to_process = list(jurisdiction_lookup)
+
+        work_queue = WorkQueue(
+            self.dest_db, registry_table, dest_table, status_column, registry_year_col,
+            jurisdictions=jurisdictions_to_process, years=processing_years, page_size=self.work_queue_page_size
+        )
+        year_log_msg = f"years {processing_years}" if processing_years else "all years"
+        print(f"Starting processing for jurisdictions {jurisdictions_to_process}, {year_log_msg}")
+
+        work_items = self._prepare_cases(work_queue, dest_table, jurisdiction_lookup, filenames)
+        self._extract_texts(s3_bucket, work_items, dest_table)
+            
+        print("\n--- Text extraction check completed for all configured years and jurisdictions. ---")
 
-                try:
-                    # Base query and parameters
-                    query_parts = [
-                        f"SELECT reg.source_id",
-                        f"FROM {registry_table} AS reg",
-                        f"LEFT JOIN {dest_table} AS dest ON reg.source_id = dest.source_id",
-                        f"WHERE reg.jurisdiction_code = :jurisdiction"
-                    ]
-                    params = {"jurisdiction": jurisdiction}
-
-                    # Conditionally add the year filter if a specific year is provided
-                    if year is not None:
-                        query_parts.append(f"AND reg.{registry_year_col} = :year")
-                        params["year"] = year
-                    
-                    # Add the final status check condition
-                    query_parts.append(f"AND (dest.source_id IS NULL OR dest.{status_column} != 'pass')")
-                    
-                    query = "\n".join(query_parts)
-                    
-                    cases_to_process_df = self.dest_db.read_sql(query, params=params)
-                    
-                    log_message_year = f"for year {year} " if year else "for all years "
-                    print(f"Found {len(cases_to_process_df)} cases {log_message_year}from registry requiring processing.")
+    def _prepare_cases(self, work_queue: WorkQueue, status_table: str, jurisdiction_lookup: dict, filenames: dict):
+        """
+        Yields the S3 keys of each pending case, lazily as the pipeline asks for more work.
+        Each work-queue page is fetched, and its missing status records seeded, only when it is reached.
+        """
+        pages = work_queue.pages()
+        while True:
+            try:
+                cases_to_process_df = next(pages, None)
+            except Exception as e:
+                print(f"ERROR: Could not query the registry for cases to process. Stopping. Error: {e}")
+                return
+            if cases_to_process_df is None:
+                return
+            print(f"Found {len(cases_to_process_df)} cases from registry requiring processing.")
 
+            # The LEFT JOIN already tells us which cases have no status record yet: seed them all at once
+            missing_ids = cases_to_process_df.loc[cases_to_process_df['status_source_id'].isna(), 'source_id']
+            missing_ids = list(dict.fromkeys(missing_ids.astype(str)))
+            if missing_ids:
+                print(f"No status record found for {len(missing_ids)} cases. Creating new ones.")
+                try:
+                    self.dest_db.insert_initial_statuses(table_name=status_table, source_ids=missing_ids)
                 except Exception as e:
-                    print(f"ERROR: Could not query the registry for jurisdiction {jurisdiction}. Skipping. Error: {e}")
+                    print(f"ERROR: Failed to insert initial statuses for this page of cases. Skipping it. Error: {e}")
                     continue
 
-                if cases_to_process_df.empty:
-                    continue
+            for row in cases_to_process_df.itertuples(index=False):
+                source_id = str(row.source_id)
+                print(f"- Processing case: {source_id}")
 
-                for index, row in cases_to_process_df.iterrows():
-                    source_id = str(row['source_id'])
-                    print(f"- Processing case: {source_id}")
-                    
-                    status_row = self.dest_db.get_status_by_source_id(dest_table, source_id)
-                    if not status_row:
-                        print(f"No status record found for {source_id}. Creating new one.")
-                        try:
-                            self.dest_db.insert_initial_status(table_name=dest_table, source_id=source_id)
-                        except Exception as e:
-                            print(f"Failed to insert initial status for {source_id}. Skipping. Error: {e}")
-                            continue
-
-                    case_folder = os.path.join(s3_base_folder, source_id)
-                    html_file_key = os.path.join(case_folder, filenames['source_html'])
-                    txt_file_key = os.path.join(case_folder, filenames['extracted_text'])
-                    
-                    self._extract_and_save_text(
-                        s3_bucket, html_file_key, txt_file_key, dest_table, source_id, case_folder
-                    )
-            
-        print("\n--- Text extraction check completed for all configured years and jurisdictions. ---")
+                case_folder = os.path.join(jurisdiction_lookup[row.jurisdiction_code]['s3_folder'], source_id)
+                yield {
+                    'source_id': source_id,
+                    'html_key': os.path.join(case_folder, filenames['source_html']),
+                    'txt_key': os.path.join(case_folder, filenames['extracted_text']),
+                }
 
-    def _extract_and_save_text(self, bucket: str, html_key: str, txt_key: str, status_table: str, source_id: str, case_folder: str):
+    def _extract_texts(self, bucket: str, work_items, status_table: str):
         """
-        Handles HTML download, text extraction, saving artifacts to S3,
-        and updating the status database.
+        Runs cases through a download -> parse -> upload pipeline, each stage on its own thread pool,
+        so S3 round-trips overlap with parsing. At most max_in_flight cases are held at once, and
+        metadata and status rows are written on this thread in the order the cases came in.
         """
-        start_time_utc = datetime.now(timezone.utc)
-        
+        pipeline = StagedPipeline([
+            ('download', lambda case: self._download_html(bucket, case), self.download_workers),
+            ('parse', self._parse_html, self.parse_workers),
+            ('upload', lambda case: self._upload_text(bucket, case), self.upload_workers),
+        ], max_in_flight=self.max_in_flight)
+
+        try:
+            for result in pipeline.run(work_items):
+                self._record_result(result, status_table)
+        finally:
+            # Whatever left the pipeline is committed, even if the run is interrupted
+            self.dest_db.flush_writes()
+
+    def _download_html(self, bucket: str, case: dict) -> dict:
+        return dict(case, html_content=self.s3_manager.get_file_content(bucket, case['html_key']))
+
+    def _parse_html(self, case: dict) -> dict:
+        case = dict(case)
+        case['text_content'] = self.html_parser.extract_text(case.pop('html_content'))
+        return case
+
+    def _upload_text(self, bucket: str, case: dict) -> dict:
+        self.s3_manager.save_text_file(bucket, case['txt_key'], case['text_content'])
+        return case
+
+    def _record_result(self, result, status_table: str):
+        """
+        Writes the metadata counts and step status of one case that left the pipeline.
+        """
+        source_id = result.item['source_id']
         dest_table_info = self.config['tables']['tables_to_write'][0]
         step_columns_config = dest_table_info['step_columns']
         
         try:
-            html_content = self.s3_manager.get_file_content(bucket, html_key)
-            
-            text_content = self.html_parser.extract_text(html_content)
-            self.s3_manager.save_text_file(bucket, txt_key, text_content)
+            if result.error is not None:
+                raise result.error
+            text_content = result.value['text_content']
 
             # --- ADDED: Calculate counts and update metadata table ---
             char_count = len(text_content)
@@ -168,7 +193,7 @@ class TextProcessor:
 
             metadata_config = self.config.get('tables_metadata')
             if metadata_config:
-                self.dest_db.upsert_metadata_counts(
+                self.dest_db.queue_metadata_counts(
                     table_name=metadata_config['table'],
                     source_id=source_id,
                     char_count_col=metadata_config['column_count_char'],
@@ -181,18 +206,20 @@ class TextProcessor:
             # --- END ADDED ---
             
             end_time_utc = datetime.now(timezone.utc)
-            duration = (end_time_utc - start_time_utc).total_seconds()
+            duration = (end_time_utc - result.start_time).total_seconds()
             
             print(f"Successfully extracted text for {source_id}.")
-            self.dest_db.update_step_result(
+            self.dest_db.queue_step_result(
                 status_table, source_id, 'text_extract', 'pass', duration, 
-                start_time_utc, end_time_utc, step_columns_config
+                result.start_time, end_time_utc, step_columns_config
             )
         except Exception as e:
             end_time_utc = datetime.now(timezone.utc)
-            duration = (end_time_utc - start_time_utc).total_seconds()
+            duration = (end_time_utc - result.start_time).total_seconds()
             print(f"Text extraction FAILED for {source_id}. Error: {e}")
-            self.dest_db.update_step_result(
+            self.dest_db.queue_step_result(
                 status_table, source_id, 'text_extract', 'failed', duration,
-                start_time_utc, end_time_utc, step_columns_config
+                result.start_time, end_time_utc, step_columns_config
             )
+
+        self.dest_db.flush_writes_if_due()
@@ -0,0 +1,202 @@
+import threading
+import time
+from unittest import mock
+
+import boto3
+import pandas as pd
+import pytest
+from moto import mock_aws
+
+from src import text_processor
+from src.text_processor import TextProcessor
+from utils.pipeline import StagedPipeline
+
+BUCKET = "legal-store"
+S3_LATENCY = 0.05 # Seconds added to every GetObject and PutObject call
+
+
+def make_config(workers):
+    return {
+        'aws': {'default_region': 'ap-southeast-2', 's3': {'bucket_name': BUCKET}},
+        'database': {'source': {}, 'destination': {}},
+        'tables': {
+            'tables_to_read': [{'jurisdiction': 'NSW', 's3_folder': 'case-laws/nsw/'}],
+            'tables_to_write': [{
+                'table': 'caselaw_enrichment_status',
+                'step_columns': {'text_extract': {'status': 'status_text_extract'}},
+            }],
+        },
+        'tables_registry': {'table': 'caselaw_registry', 'column': 'year', 'jurisdiction_codes': ['NSW']},
+        'tables_metadata': {
+            'table': 'caselaw_metadata', 'column_count_char': 'count_char', 'column_word_char': 'count_word'
+        },
+        'enrichment_filenames': {'source_html': 'miniviewer.html', 'extracted_text': 'miniviewer.txt'},
+        'text_extraction': {
+            'engine': 'lxml', 'download_workers': workers, 'parse_workers': workers,
+            'upload_workers': workers, 'max_in_flight': 4 * workers,
+        },
+    }
+
+
+def add_latency(s3_client, seconds):
+    """Makes every GetObject and PutObject on `s3_client` take at least `seconds` longer."""
+    def sleep(**kwargs):
+        time.sleep(seconds)
+    s3_client.meta.events.register('before-call.s3.GetObject', sleep)
+    s3_client.meta.events.register('before-call.s3.PutObject', sleep)
+
+
+@pytest.fixture
+def s3():
+    with mock_aws():
+        client = boto3.client('s3', region_name='ap-southeast-2')
+        client.create_bucket(Bucket=BUCKET, CreateBucketConfiguration={'LocationConstraint': 'ap-southeast-2'})
+        yield client
+
+
+def make_processor(workers, source_ids, config=None, jurisdiction_codes=None):
+    with mock.patch.object(text_processor, 'DatabaseConnector'):
+        processor = TextProcessor(config or make_config(workers))
+    processor.dest_db.read_sql.return_value = pd.DataFrame({
+        'source_id': source_ids, 'jurisdiction_code': jurisdiction_codes or ['NSW'] * len(source_ids),
+        'status_source_id': [None] * len(source_ids)
+    })
+    add_latency(processor.s3_manager.s3_client, S3_LATENCY)
+    return processor
+
+
+def put_cases(s3, source_ids):
+    for source_id in source_ids:
+        s3.put_object(
+            Bucket=BUCKET, Key=f"case-laws/nsw/{source_id}/miniviewer.html",
+            Body=f"<html><body><p>Case {source_id}</p><p>three more words</p></body></html>"
+        )
+
+
+def step_results(processor):
+    return [(c.args[1], c.args[3]) for c in processor.dest_db.queue_step_result.call_args_list]
+
+
+def timed_run(s3, workers, count):
+    source_ids = [f"case-{i:03d}" for i in range(count)]
+    put_cases(s3, source_ids)
+    processor = make_processor(workers, source_ids)
+    start = time.perf_counter()
+    processor.process_cases()
+    return time.perf_counter() - start, processor
+
+
+def test_every_case_is_extracted_and_committed_in_order(s3):
+    source_ids = [f"case-{i:03d}" for i in range(20)]
+    put_cases(s3, source_ids)
+    processor = make_processor(4, source_ids)
+
+    processor.process_cases()
+
+    assert step_results(processor) == [(source_id, 'pass') for source_id in source_ids]
+    processor.dest_db.flush_writes.assert_called_once_with()
+    metadata_calls = processor.dest_db.queue_metadata_counts.call_args_list
+    assert [c.kwargs['source_id'] for c in metadata_calls] == source_ids
+    assert metadata_calls[0].kwargs['word_count'] == 5
+    processor.dest_db.insert_initial_statuses.assert_called_once_with(
+        table_name='caselaw_enrichment_status', source_ids=source_ids
+    )
+    processor.dest_db.get_status_by_source_id.assert_not_called()
+    processor.dest_db.insert_initial_status.assert_not_called()
+    text = s3.get_object(Bucket=BUCKET, Key="case-laws/nsw/case-007/miniviewer.txt")['Body'].read().decode('utf-8')
+    assert text == "Case case-007 three more words"
+
+
+def test_all_years_and_jurisdictions_come_from_one_work_queue_query(s3):
+    config = make_config(2)
+    config['tables']['tables_to_read'].append({'jurisdiction': 'VIC', 's3_folder': 'case-laws/vic/'})
+    config['tables_registry'].update(jurisdiction_codes=['NSW', 'VIC', 'QLD'], processing_years=[2020, 2021])
+    s3.put_object(Bucket=BUCKET, Key="case-laws/nsw/case-000/miniviewer.html", Body="<p>nsw</p>")
+    s3.put_object(Bucket=BUCKET, Key="case-laws/vic/case-001/miniviewer.html", Body="<p>vic</p>")
+    processor = make_processor(2, ["case-000", "case-001"], config=config, jurisdiction_codes=['NSW', 'VIC'])
+
+    processor.process_cases()
+
+    processor.dest_db.read_sql.assert_called_once()
+    query, params = processor.dest_db.read_sql.call_args.args[0], processor.dest_db.read_sql.call_args.kwargs['params']
+    assert "ORDER BY reg.source_id" in query
+    # QLD has no 'tables_to_read' entry, so it is left out of the query
+    assert [params[key] for key in ('jurisdiction_0', 'jurisdiction_1', 'year_0', 'year_1')] == ['NSW', 'VIC', 2020, 2021]
+    assert 'jurisdiction_2' not in params
+    assert step_results(processor) == [('case-000', 'pass'), ('case-001', 'pass')]
+    text = s3.get_object(Bucket=BUCKET, Key="case-laws/vic/case-001/miniviewer.txt")['Body'].read().decode('utf-8')
+    assert text == "vic"
+
+
+def test_only_cases_without_a_status_record_are_seeded(s3):
+    source_ids = ["case-000", "case-001", "case-002"]
+    put_cases(s3, source_ids)
+    processor = make_processor(2, source_ids)
+    processor.dest_db.read_sql.return_value['status_source_id'] = ["case-000", None, "case-002"]
+
+    processor.process_cases()
+
+    processor.dest_db.insert_initial_statuses.assert_called_once_with(
+        table_name='caselaw_enrichment_status', source_ids=["case-001"]
+    )
+    assert step_results(processor) == [(source_id, 'pass') for source_id in source_ids]
+
+
+def test_failed_seeding_skips_the_page(s3):
+    source_ids = ["case-000", "case-001"]
+    put_cases(s3, source_ids)
+    processor = make_processor(2, source_ids)
+    processor.dest_db.insert_initial_statuses.side_effect = RuntimeError("database unavailable")
+
+    processor.process_cases()
+
+    processor.dest_db.queue_step_result.assert_not_called()
+
+
+def test_missing_html_is_recorded_as_failed_without_stopping_the_run(s3):
+    source_ids = ["case-000", "case-001", "case-002"]
+    put_cases(s3, ["case-000", "case-002"])
+    processor = make_processor(2, source_ids)
+
+    processor.process_cases()
+
+    assert step_results(processor) == [('case-000', 'pass'), ('case-001', 'failed'), ('case-002', 'pass')]
+    assert processor.dest_db.queue_metadata_counts.call_count == 2
+
+
+def test_throughput_scales_with_pool_size(s3):
+    """
+    With S3 latency injected, eight workers per stage should beat a single worker by a wide margin.
+    With one worker per stage the downloads alone are sequential, one round-trip per case.
+    """
+    count = 24
+    sequential_seconds, _ = timed_run(s3, 1, count)
+    pooled_seconds, processor = timed_run(s3, 8, count)
+
+    assert sequential_seconds >= count * S3_LATENCY
+    assert pooled_seconds * 3 < sequential_seconds
+    assert [status for _, status in step_results(processor)] == ['pass'] * count
+
+
+def test_pipeline_bounds_items_in_flight():
+    started = []
+    release = threading.Event()
+
+    def slow_stage(item):
+        started.append(item)
+        release.wait(5)
+        return item
+
+    pipeline = StagedPipeline([('slow', slow_stage, 8)], max_in_flight=3)
+    results = pipeline.run(range(10))
+    time.sleep(0.1) # Nothing starts until the consumer asks for the first result
+    assert started == []
+
+    consumer = threading.Thread(target=lambda: next(results))
+    consumer.start()
+    time.sleep(0.2)
+    assert started == [0, 1, 2] # The consumer is blocked on item 0, so no fourth item is read
+    release.set()
+    consumer.join()
+
+    assert [result.value for result in results] == list(range(1, 10))
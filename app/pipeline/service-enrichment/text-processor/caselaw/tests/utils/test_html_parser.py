@@ -0,0 +1,66 @@
+import glob
+import os
+import pytest
+
+from utils.html_parser import TEXT_ENGINES, HtmlParser
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "..", "fixtures", "html")
+FIXTURES = sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html")))
+
+
+def read(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("engine", sorted(TEXT_ENGINES))
+@pytest.mark.parametrize("fixture", FIXTURES, ids=os.path.basename)
+def test_engine_matches_golden_text(engine, fixture):
+    """
+    Every engine extracts byte-identical text from the stored HTML fixtures.
+    The golden .txt files are the output of the original BeautifulSoup extraction.
+    """
+    golden = read(fixture[:-len(".html")] + ".txt")
+
+    assert HtmlParser(engine=engine).extract_text(read(fixture)) == golden
+
+
+@pytest.mark.filterwarnings("ignore::bs4.XMLParsedAsHTMLWarning")
+@pytest.mark.parametrize("engine", sorted(TEXT_ENGINES))
+@pytest.mark.parametrize("html_content, expected", [
+    ("", ""),
+    ("   \n ", ""),
+    ("<!-- only a comment -->", ""),
+    ("<p>a<!-- c -->b</p>", "a b"),
+    ("<html><head><script>var x = 1;</script><style>p {}</style></head><body>text</body></html>", "text"),
+    ("<template>hidden</template><noscript>shown</noscript>", "shown"),
+    ("<p>x&nbsp;&amp;&nbsp;y</p><p>&nbsp;z&nbsp;</p>", "x\xa0&\xa0y z"),
+    ('<?xml version="1.0" encoding="iso-8859-1"?><p>café</p>', "café"),
+])
+def test_whitespace_and_skipped_content(engine, html_content, expected):
+    assert HtmlParser(engine=engine).extract_text(html_content) == expected
+
+
+@pytest.mark.parametrize("html_content, bs4_text, lxml_text", [
+    ("<p>a\r\nb</p>", "a\r\nb", "a\nb"),
+    ("<i>Smith J</p>&nbsp;text</i>", "Smith J text", "Smith J\xa0text"),
+])
+def test_documented_lxml_whitespace_differences(html_content, bs4_text, lxml_text):
+    """
+    Line endings and text split around a stray end tag differ only in whitespace.
+    """
+    assert HtmlParser(engine="bs4").extract_text(html_content) == bs4_text
+    assert HtmlParser(engine="lxml").extract_text(html_content) == lxml_text
+    assert bs4_text.split() == lxml_text.split()
+
+
+def test_documented_lxml_unknown_entity_difference():
+    html_content = "<p>&unknown; entity</p>"
+
+    assert HtmlParser(engine="bs4").extract_text(html_content) == "&unknown entity"
+    assert HtmlParser(engine="lxml").extract_text(html_content) == "&unknown; entity"
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError, match="Unknown text extraction engine"):
+        HtmlParser(engine="regex")
@@ -0,0 +1,123 @@
+from unittest import mock
+
+import pytest
+from sqlalchemy import text
+
+from utils.database_connector import DatabaseConnector
+from utils.work_queue import WorkQueue
+
+REGISTRY_TABLE = "caselaw_registry"
+STATUS_TABLE = "caselaw_enrichment_status"
+STATUS_COLUMN = "status_text_processor"
+JURISDICTIONS = ["NSW", "VIC", "QLD", "WA", "SA", "TAS", "NT", "ACT", "HCA"]
+YEARS = list(range(1995, 2025))
+CASES_PER_SLICE = 4
+
+
+def expected_status(i):
+    """Cycles through: no status record, 'pass', 'failed', 'not started', 'pass'."""
+    return [None, 'pass', 'failed', 'not started', 'pass'][i % 5]
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A registry of 9 jurisdictions x 30 years, with a third of its cases still pending."""
+    connector = DatabaseConnector(db_config={
+        'dialect': 'sqlite', 'driver': 'pysqlite', 'host': None, 'port': None, 'name': str(tmp_path / "store.db"),
+    })
+    registry_rows, status_rows = [], []
+    for i in range(len(JURISDICTIONS) * len(YEARS) * CASES_PER_SLICE):
+        source_id = f"{i:06d}"
+        registry_rows.append({
+            'source_id': source_id, 'jurisdiction_code': JURISDICTIONS[i % len(JURISDICTIONS)],
+            'year': YEARS[(i // len(JURISDICTIONS)) % len(YEARS)],
+        })
+        if expected_status(i) is not None:
+            status_rows.append({'id': f"s-{source_id}", 'source_id': source_id, 'status': expected_status(i)})
+
+    with connector.engine.connect() as conn:
+        conn.execute(text(f"CREATE TABLE {REGISTRY_TABLE} (source_id TEXT PRIMARY KEY, jurisdiction_code TEXT, year INTEGER)"))
+        conn.execute(text(f"CREATE TABLE {STATUS_TABLE} (id TEXT PRIMARY KEY, source_id TEXT UNIQUE, {STATUS_COLUMN} TEXT)"))
+        conn.execute(text(f"INSERT INTO {REGISTRY_TABLE} VALUES (:source_id, :jurisdiction_code, :year)"), registry_rows)
+        conn.execute(text(f"INSERT INTO {STATUS_TABLE} VALUES (:id, :source_id, :status)"), status_rows)
+        conn.commit()
+    connector.registry_rows = registry_rows
+    return connector
+
+
+def pending_ids(db, jurisdictions=None, years=None):
+    return [
+        row['source_id'] for i, row in enumerate(db.registry_rows)
+        if expected_status(i) != 'pass'
+        and (not jurisdictions or row['jurisdiction_code'] in jurisdictions)
+        and (not years or row['year'] in years)
+    ]
+
+
+def collect(work_queue):
+    pages = list(work_queue.pages())
+    return pages, [source_id for page in pages for source_id in page['source_id']]
+
+
+def test_pages_return_every_pending_case_once_in_order(db):
+    work_queue = WorkQueue(db, REGISTRY_TABLE, STATUS_TABLE, STATUS_COLUMN, 'year', page_size=100)
+
+    pages, source_ids = collect(work_queue)
+
+    assert source_ids == pending_ids(db)
+    assert [len(page) for page in pages] == [100] * 6 + [48]
+    missing = pages[0].loc[pages[0]['status_source_id'].isna(), 'source_id']
+    last_index = int(pages[0]['source_id'].iloc[-1])
+    assert missing.tolist() == [f"{i:06d}" for i in range(0, last_index + 1, 5)]
+
+
+def test_filters_apply_across_all_slices_in_one_query(db):
+    jurisdictions, years = ["VIC", "TAS"], [2001, 2002, 2003]
+    work_queue = WorkQueue(
+        db, REGISTRY_TABLE, STATUS_TABLE, STATUS_COLUMN, 'year',
+        jurisdictions=jurisdictions, years=years, page_size=1000
+    )
+    with mock.patch.object(db, 'read_sql', wraps=db.read_sql) as read_sql:
+        pages, source_ids = collect(work_queue)
+
+    assert source_ids == pending_ids(db, jurisdictions, years)
+    assert set(pages[0]['jurisdiction_code']) == set(jurisdictions)
+    assert read_sql.call_count == 1 # Instead of one query per year x jurisdiction
+
+
+def test_registry_conditions_are_added_and_indexed(db):
+    work_queue = WorkQueue(
+        db, REGISTRY_TABLE, STATUS_TABLE, STATUS_COLUMN, 'year',
+        registry_conditions=["reg.status_registration = 'pass'", "reg.status_content_download = 'pass'"]
+    )
+
+    query, _ = work_queue.build_query()
+
+    assert "AND reg.status_registration = 'pass'\nAND reg.status_content_download = 'pass'" in query
+    assert work_queue.recommended_indexes()[0] == (
+        f"CREATE INDEX idx_{REGISTRY_TABLE}_work_queue ON {REGISTRY_TABLE} "
+        "(source_id, jurisdiction_code, year, status_registration, status_content_download)"
+    )
+
+
+def test_page_query_is_an_index_range_scan_with_the_recommended_indexes(db):
+    """
+    EXPLAIN QUERY PLAN on SQLite, standing in for MySQL: with the recommended indexes, a later page
+    is a range scan over the registry's covering index from the cursor, in index order (no sort),
+    with one covering-index lookup into the status table per case.
+    """
+    work_queue = WorkQueue(
+        db, REGISTRY_TABLE, STATUS_TABLE, STATUS_COLUMN, 'year', jurisdictions=JURISDICTIONS, years=YEARS
+    )
+    query, params = work_queue.build_query(after_source_id="000500")
+    with db.engine.connect() as conn:
+        for statement in work_queue.recommended_indexes():
+            conn.execute(text(statement))
+        conn.execute(text("ANALYZE"))
+        plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {query}"), params)]
+
+    assert plan == [
+        f"SEARCH reg USING COVERING INDEX idx_{REGISTRY_TABLE}_work_queue (source_id>?)",
+        f"SEARCH dest USING COVERING INDEX idx_{STATUS_TABLE}_{STATUS_COLUMN} (source_id=?) LEFT-JOIN",
+    ]
+
@@ -1,8 +1,81 @@
 from bs4 import BeautifulSoup
+from lxml import etree
+
+class BeautifulSoupTextEngine:
+    """ Extracts text by building a BeautifulSoup tree with Python's built-in html.parser. """
+
+    def extract_text(self, html_content: str) -> str:
+        soup = BeautifulSoup(html_content, 'html.parser')
+        return soup.get_text(separator=' ', strip=True)
+
+class LxmlTextEngine:
+    """
+    Extracts text with libxml2's HTML parser, several times faster than BeautifulSoup.
+
+    Produces the same string as BeautifulSoupTextEngine: every text node is stripped, empty ones are
+    dropped and the rest are joined with single spaces; comments, processing instructions and the
+    contents of <script>, <style> and <template> are left out. Documented differences, all on input
+    the two parsers read differently:
+      - '\\r\\n' line endings inside text are normalised to '\\n';
+      - text around invalid nesting (e.g. <a> inside <a>, a block inside an inline element) or stray
+        end tags can be split into, or joined from, different text nodes;
+      - unknown entities such as '&foo;' keep their trailing semicolon.
+    """
+    SKIPPED_TAGS = frozenset({'script', 'style', 'template'})
+
+    def extract_text(self, html_content: str) -> str:
+        if not html_content or not html_content.strip():
+            return ''
+
+        # Always parse UTF-8 bytes: libxml2 rejects str input that carries an XML encoding declaration.
+        parser = etree.HTMLParser(encoding='utf-8', huge_tree=True)
+        root = etree.fromstring(html_content.encode('utf-8'), parser)
+        if root is None:
+            return ''
+
+        # Walk the tree in document order without recursion: an element's text, then its children,
+        # each followed by its tail (the text after its end tag, which belongs to the parent).
+        parts = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                text = node.strip()
+                if text:
+                    parts.append(text)
+                continue
+            if not isinstance(node.tag, str) or node.tag in self.SKIPPED_TAGS:
+                continue # Comments and processing instructions have a non-string tag
+            if node.text:
+                text = node.text.strip()
+                if text:
+                    parts.append(text)
+            for child in reversed(node):
+                if child.tail:
+                    stack.append(child.tail)
+                stack.append(child)
+        return ' '.join(parts)
+
+TEXT_ENGINES = {
+    'bs4': BeautifulSoupTextEngine,
+    'lxml': LxmlTextEngine,
+}
 
 class HtmlParser:
     """ A utility class to parse and extract text from HTML content. """
-    
+
+    def __init__(self, engine: str = 'bs4'):
+        """
+        Initializes the HtmlParser.
+
+        Args:
+            engine (str): The text extraction backend, one of TEXT_ENGINES ('bs4' or 'lxml').
+        """
+        if engine not in TEXT_ENGINES:
+            raise ValueError(f"Unknown text extraction engine '{engine}'. Choose one of: {', '.join(TEXT_ENGINES)}")
+        self.engine = engine
+        self._text_engine = TEXT_ENGINES[engine]()
+
     def extract_text(self, html_content: str) -> str:
         """
         Extracts text from the given HTML content.
@@ -13,7 +86,4 @@ class HtmlParser:
         Returns:
             str: The extracted text.
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
-        return soup.get_text(separator=' ', strip=True)
-
-    
\ No newline at end of file
+        return self._text_engine.extract_text(html_content)
@@ -0,0 +1,104 @@
+from collections import deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+@dataclass
+class PipelineResult:
+    """ The outcome of one item that went through every stage of a StagedPipeline. """
+    item: Any
+    value: Any = None
+    error: Optional[BaseException] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+
+class StagedPipeline:
+    """
+    A bounded producer/consumer pipeline. Each stage runs on its own thread pool and hands its
+    result to the next stage as soon as it is ready, so e.g. downloads of upcoming items overlap
+    with parsing and uploading of earlier ones.
+
+    At most `max_in_flight` items are between the input and the consumer at any time: the input
+    iterable is only read further once the oldest item has been handed back. Results are yielded
+    in input order, so whatever the consumer commits is committed in order.
+    """
+
+    def __init__(self, stages: List[Tuple[str, Callable[[Any], Any], int]], max_in_flight: int):
+        """
+        Args:
+            stages: (name, function, worker_count) per stage. The first function receives the input
+                    item, every later one the previous stage's return value.
+            max_in_flight (int): The most items started but not yet yielded back.
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage.")
+        self.stages = stages
+        self.max_in_flight = max(1, max_in_flight)
+
+    def run(self, items: Iterable[Any]) -> Iterator[PipelineResult]:
+        """
+        Feeds `items` through every stage and yields a PipelineResult per item, in input order.
+        An exception in any stage ends that item's run; it is returned on the result, not raised.
+        """
+        pools = [
+            ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix=f"pipeline-{name}")
+            for name, _, workers in self.stages
+        ]
+        in_flight = deque()
+        try:
+            for item in items:
+                if len(in_flight) >= self.max_in_flight:
+                    yield self._finish(*in_flight.popleft())
+                in_flight.append((item, *self._start(item, pools)))
+            while in_flight:
+                yield self._finish(*in_flight.popleft())
+        finally:
+            # Earlier stages are shut down first so their last callbacks can still reach later pools.
+            for pool in pools:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+    def _start(self, item: Any, pools: List[ThreadPoolExecutor]) -> Tuple[Future, dict]:
+        """ Submits `item` to the first stage. Returns a future for its last stage and its timing. """
+        done = Future()
+        timing = {}
+
+        def run_first_stage(value: Any):
+            timing['start_time'] = datetime.now(timezone.utc) # When work starts, not when it was queued
+            return self.stages[0][1](value)
+
+        def submit(stage_index: int, value: Any):
+            stage_function = run_first_stage if stage_index == 0 else self.stages[stage_index][1]
+            try:
+                future = pools[stage_index].submit(stage_function, value)
+            except RuntimeError as e: # The pool was shut down because the consumer stopped early
+                done.set_exception(e)
+                return
+            future.add_done_callback(lambda f: advance(stage_index, f))
+
+        def advance(stage_index: int, future: Future):
+            if future.cancelled():
+                done.set_exception(CancelledError())
+            elif future.exception() is not None:
+                done.set_exception(future.exception())
+            elif stage_index + 1 < len(self.stages):
+                submit(stage_index + 1, future.result())
+            else:
+                timing['end_time'] = datetime.now(timezone.utc)
+                done.set_result(future.result())
+
+        submit(0, item)
+        return done, timing
+
+    @staticmethod
+    def _finish(item: Any, done: Future, timing: dict) -> PipelineResult:
+        """ Waits for `item` to leave the last stage. """
+        try:
+            value, error = done.result(), None
+        except BaseException as e:
+            value, error = None, e
+        end_time = timing.get('end_time') or datetime.now(timezone.utc)
+        return PipelineResult(
+            item=item, value=value, error=error,
+            start_time=timing.get('start_time') or end_time, end_time=end_time
+        )
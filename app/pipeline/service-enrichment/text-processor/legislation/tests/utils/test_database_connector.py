@@ -0,0 +1,145 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+
+from utils.database_connector import DatabaseConnector
+
+STATUS_TABLE = "legislation_enrichment_status"
+METADATA_TABLE = "legislation_metadata"
+STEP_COLUMNS = {'text_extract': {
+    'status': 'status_text_extract', 'duration': 'duration_text_extract',
+    'start_time': 'start_time_text_extract', 'end_time': 'end_time_text_extract',
+}}
+START_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+END_TIME = datetime(2025, 1, 1, 0, 0, 2, tzinfo=timezone.utc)
+
+
+def make_buffered_connector(tmp_path, name, source_ids, **buffer_options):
+    """A connector over empty status and metadata tables: every other id has metadata, no id has a status."""
+    connector = DatabaseConnector(db_config={
+        'dialect': 'sqlite', 'driver': 'pysqlite', 'host': None, 'port': None, 'name': str(tmp_path / name),
+    }, **buffer_options)
+    with connector.engine.connect() as conn:
+        conn.execute(text(
+            f"CREATE TABLE {STATUS_TABLE} (id TEXT PRIMARY KEY, source_id TEXT UNIQUE, "
+            "status_text_extract TEXT, duration_text_extract REAL, start_time_text_extract TEXT, end_time_text_extract TEXT)"
+        ))
+        conn.execute(text(
+            f"CREATE TABLE {METADATA_TABLE} (id TEXT PRIMARY KEY, source_id TEXT, count_char INTEGER, count_word INTEGER)"
+        ))
+        conn.execute(
+            text(f"INSERT INTO {METADATA_TABLE} (id, source_id, count_char, count_word) VALUES (:id, :source_id, 0, 0)"),
+            [{'id': f"m-{source_id}", 'source_id': source_id} for source_id in source_ids[::2]]
+        )
+        conn.commit()
+    return connector
+
+
+def count_statements(connector):
+    statements = []
+    event.listen(connector.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def document_counts(i):
+    return {'char_count': 100 + i, 'word_count': 10 + i}
+
+
+def read_tables(connector):
+    status = connector.read_sql(
+        f"SELECT source_id, status_text_extract, duration_text_extract FROM {STATUS_TABLE} ORDER BY source_id"
+    )
+    metadata = connector.read_sql(
+        f"SELECT source_id, count_char, count_word FROM {METADATA_TABLE} ORDER BY source_id"
+    )
+    return status, metadata
+
+
+def queue_document(connector, source_id, i, status='pass'):
+    connector.queue_metadata_counts(METADATA_TABLE, source_id, 'count_char', 'count_word', **document_counts(i))
+    connector.queue_step_result(STATUS_TABLE, source_id, 'text_extract', status, 2.0, START_TIME, END_TIME, STEP_COLUMNS)
+
+
+def test_buffered_writes_cut_statements_per_1000_documents(tmp_path):
+    source_ids = [f"act-{i:04d}" for i in range(1000)]
+
+    unbuffered = make_buffered_connector(tmp_path, "unbuffered.db", source_ids)
+    unbuffered_statements = count_statements(unbuffered)
+    for i, source_id in enumerate(source_ids):
+        unbuffered.upsert_metadata_counts(METADATA_TABLE, source_id, 'count_char', 'count_word', **document_counts(i))
+        unbuffered.upsert_step_result(STATUS_TABLE, source_id, 'text_extract', 'pass', 2.0, START_TIME, END_TIME, STEP_COLUMNS)
+
+    buffered = make_buffered_connector(tmp_path, "buffered.db", source_ids, flush_every=100, flush_interval=3600)
+    buffered_statements = count_statements(buffered)
+    for i, source_id in enumerate(source_ids):
+        queue_document(buffered, source_id, i)
+        buffered.flush_writes_if_due()
+    buffered.flush_writes()
+
+    # Per document: a metadata SELECT, an UPDATE or INSERT, then a status SELECT and INSERT
+    assert len(unbuffered_statements) == 4000
+    # Per flush of 100 documents: metadata SELECT, UPDATE and INSERT, then status SELECT and INSERT
+    assert len(buffered_statements) == 50
+
+    buffered_status, buffered_metadata = read_tables(buffered)
+    unbuffered_status, unbuffered_metadata = read_tables(unbuffered)
+    assert buffered_status.equals(unbuffered_status)
+    assert buffered_metadata.equals(unbuffered_metadata)
+    assert set(buffered_status['status_text_extract']) == {'pass'}
+
+
+def test_queued_documents_are_only_marked_done_once_flushed(tmp_path):
+    source_ids = [f"act-{i:04d}" for i in range(5)]
+    connector = make_buffered_connector(tmp_path, "store.db", source_ids, flush_every=100, flush_interval=3600)
+
+    for i, source_id in enumerate(source_ids):
+        queue_document(connector, source_id, i)
+        assert connector.flush_writes_if_due() == 0
+
+    status, _ = read_tables(connector)
+    assert status.empty
+
+    assert connector.flush_writes() == 5
+    status, metadata = read_tables(connector)
+    assert set(status['status_text_extract']) == {'pass'}
+    assert metadata['count_char'].tolist() == [100, 101, 102, 103, 104]
+
+
+def test_flush_is_due_after_the_interval(tmp_path):
+    source_ids = ["act-0000", "act-0001"]
+    connector = make_buffered_connector(tmp_path, "store.db", source_ids, flush_every=100, flush_interval=0)
+
+    queue_document(connector, source_ids[0], 0)
+    assert connector.flush_writes_if_due() == 1
+    queue_document(connector, source_ids[1], 1, status='failed')
+    assert connector.flush_writes_if_due() == 1
+
+    status, _ = read_tables(connector)
+    assert status['status_text_extract'].tolist() == ['pass', 'failed']
+
+
+def test_failed_flush_commits_nothing_and_keeps_rows_queued(tmp_path):
+    source_ids = ["act-0000", "act-0001"]
+    connector = make_buffered_connector(tmp_path, "store.db", source_ids, flush_every=100, flush_interval=3600)
+    for i, source_id in enumerate(source_ids):
+        queue_document(connector, source_id, i)
+    with connector.engine.connect() as conn:
+        conn.execute(text(f"ALTER TABLE {STATUS_TABLE} RENAME TO {STATUS_TABLE}_moved"))
+        conn.commit()
+
+    with pytest.raises(OperationalError):
+        connector.flush_writes()
+
+    with connector.engine.connect() as conn:
+        conn.execute(text(f"ALTER TABLE {STATUS_TABLE}_moved RENAME TO {STATUS_TABLE}"))
+        conn.commit()
+    status, metadata = read_tables(connector)
+    assert status.empty
+    assert metadata['count_char'].tolist() == [0] # The metadata writes were rolled back too
+
+    assert connector.flush_writes() == 2
+    status, metadata = read_tables(connector)
+    assert set(status['status_text_extract']) == {'pass'}
+    assert metadata['count_char'].tolist() == [100, 101]
@@ -1,8 +1,9 @@
 import os
+import time
 import pandas as pd
 import uuid
 from datetime import datetime
-from sqlalchemy import create_engine, text, Row
+from sqlalchemy import bindparam, create_engine, text, Row
 from sqlalchemy.engine import URL
 from sqlalchemy.orm import sessionmaker
 from typing import Optional, Dict, Any
@@ -10,10 +11,23 @@ from typing import Optional, Dict, Any
 class DatabaseConnector:
     """Handles all database interactions."""
     
-    def __init__(self, db_config: dict):
+    def __init__(self, db_config: dict, flush_every: int = 100, flush_interval: float = 30.0, write_batch_size: int = 500):
+        """
+        Args:
+            db_config (dict): Connection details of the database.
+            flush_every (int): Queued documents that trigger a flush of the write buffer.
+            flush_interval (float): Seconds after which a queued document triggers a flush anyway.
+            write_batch_size (int): Records per multi-row statement when the buffer is flushed.
+        """
         self.db_config = db_config
         self.engine = self._create_db_engine()
         self.Session = sessionmaker(bind=self.engine)
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = flush_interval
+        self.write_batch_size = max(1, write_batch_size)
+        self._pending_rows = {} # {table_name: {source_id: {column: value}}}, in queue order
+        self._pending_documents = 0
+        self._last_flush = time.monotonic()
         
     def _create_db_engine(self):
         try:
@@ -145,3 +159,116 @@ class DatabaseConnector:
             raise
         finally:
             session.close()
+
+    # -- Write-behind buffer --------------------------------------------------------------------
+    # Metadata counts and step results can be queued instead of written one statement and commit
+    # per document. Queued rows are flushed together, in one transaction, every `flush_every`
+    # documents or `flush_interval` seconds, so a document's counts and its status land together:
+    # a document is only marked done once its flush has committed, and anything still queued when
+    # the process dies is simply picked up again on the next run.
+
+    def queue_metadata_counts(self, table_name: str, source_id: str, char_count_col: str, word_count_col: str, char_count: int, word_count: int):
+        """
+        Queues the character and word counts of a document for the next flush.
+        """
+        self._queue_row(table_name, source_id, {char_count_col: char_count, word_count_col: word_count})
+
+    def queue_step_result(self, table_name: str, source_id: str, step: str, status: str, duration: float, start_time: datetime, end_time: datetime, step_columns: dict):
+        """
+        Queues a step result for the next flush, which inserts the status record if it is missing.
+        A step result completes a document, so queue it after the document's other writes.
+        """
+        if step not in step_columns:
+            raise ValueError(f"Invalid step name provided: {step}")
+        if status not in ['pass', 'failed']:
+            raise ValueError("Invalid status value. Must be 'pass' or 'failed'.")
+
+        step_config = step_columns[step]
+        self._queue_row(table_name, source_id, {
+            step_config['status']: status,
+            step_config['duration']: duration,
+            step_config['start_time']: start_time,
+            step_config['end_time']: end_time,
+        })
+        self._pending_documents += 1
+
+    def flush_writes_if_due(self) -> int:
+        """
+        Flushes the buffer once `flush_every` documents are queued or `flush_interval` seconds have passed.
+        Returns the number of documents flushed.
+        """
+        if not self._pending_documents:
+            return 0
+        if self._pending_documents >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            return self.flush_writes()
+        return 0
+
+    def flush_writes(self) -> int:
+        """
+        Writes every queued row as multi-row upserts in a single transaction.
+        If the flush fails, the rows stay queued and the error is raised.
+        Returns the number of documents whose step result was flushed.
+        """
+        self._last_flush = time.monotonic()
+        if not self._pending_rows:
+            return 0
+
+        session = self.Session()
+        try:
+            for table_name, rows in self._pending_rows.items():
+                self._upsert_rows(session, table_name, rows)
+            session.commit()
+        except Exception as e:
+            print(f"Error flushing queued writes: {e}")
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        flushed = self._pending_documents
+        print(f"Flushed queued writes for {flushed} document(s).")
+        self._pending_rows = {}
+        self._pending_documents = 0
+        return flushed
+
+    def _queue_row(self, table_name: str, source_id: str, values: dict):
+        self._pending_rows.setdefault(table_name, {}).setdefault(source_id, {}).update(values)
+
+    def _upsert_rows(self, session, table_name: str, rows: Dict[str, dict]):
+        """
+        Upserts {source_id: {column: value}} without relying on a unique key over source_id:
+        one SELECT finds which records exist, one multi-row UPDATE (a CASE per column) rewrites
+        them, and one executemany INSERT adds the rest. Done per batch of `write_batch_size` ids.
+        """
+        source_ids = list(rows)
+        for start in range(0, len(source_ids), self.write_batch_size):
+            batch_ids = source_ids[start:start + self.write_batch_size]
+            stmt_select = text(f"SELECT source_id FROM {table_name} WHERE source_id IN :source_ids").bindparams(
+                bindparam("source_ids", expanding=True)
+            )
+            existing = {row[0] for row in session.execute(stmt_select, {"source_ids": batch_ids})}
+
+            updates, inserts = {}, {}
+            for source_id in batch_ids:
+                target = updates if source_id in existing else inserts
+                target.setdefault(tuple(rows[source_id]), []).append(source_id)
+
+            for columns, ids in updates.items():
+                params = {f"k{i}": source_id for i, source_id in enumerate(ids)}
+                assignments = []
+                for j, column in enumerate(columns):
+                    cases = " ".join(f"WHEN :k{i} THEN :v{j}_{i}" for i in range(len(ids)))
+                    assignments.append(f"{column} = CASE source_id {cases} END")
+                    params.update({f"v{j}_{i}": rows[source_id][column] for i, source_id in enumerate(ids)})
+                keys = ", ".join(f":k{i}" for i in range(len(ids)))
+                session.execute(
+                    text(f"UPDATE {table_name} SET {', '.join(assignments)} WHERE source_id IN ({keys})"), params
+                )
+
+            for columns, ids in inserts.items():
+                column_list = ", ".join(columns)
+                value_list = ", ".join(f":{column}" for column in columns)
+                stmt_insert = text(f"INSERT INTO {table_name} (id, source_id, {column_list}) VALUES (:id, :source_id, {value_list})")
+                session.execute(stmt_insert, [
+                    {"id": str(uuid.uuid4()), "source_id": source_id, **rows[source_id]} for source_id in ids
+                ])
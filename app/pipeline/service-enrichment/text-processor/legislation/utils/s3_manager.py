@@ -1,12 +1,13 @@
 import boto3
 import os
+from botocore.config import Config
 from botocore.exceptions import NoCredentialsError, PartialCredentialsError, ClientError
 
 class S3Manager:
     """
     Handles all interactions with AWS S3.
     """
-    def __init__(self, region_name: str):
+    def __init__(self, region_name: str, max_pool_connections: int = None):
         """
         Initializes the S3 client.
         
@@ -16,13 +17,16 @@ class S3Manager:
 
         Args:
             region_name (str): The AWS region for the S3 bucket.
+            max_pool_connections (int, optional): Size of the client's HTTP connection pool. Set it to at
+                least the number of threads sharing this manager; botocore defaults to 10.
         """
         try:
             self.s3_client = boto3.client(
                 's3',
                 region_name=region_name,
                 aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
+                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                config=Config(max_pool_connections=max_pool_connections) if max_pool_connections else None
             )
             print("S3Manager initialized successfully.")
         except (NoCredentialsError, PartialCredentialsError) as e:
@@ -0,0 +1,111 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import pandas as pd
+
+class WorkQueue:
+    """
+    Finds every registry document whose enrichment step is still pending, across all configured
+    jurisdictions and years, with one keyset-paginated query instead of one query per
+    year x jurisdiction slice.
+
+    A document is pending when it has no status record yet, or its step status is not 'pass'.
+    Pages are ordered by the registry's source_id and each page resumes after the last source_id of
+    the previous one, so every page is an index range scan no matter how far the run has got.
+    """
+
+    def __init__(self, db, registry_table: str, status_table: str, status_column: str, year_column: str,
+                 jurisdictions: Optional[Sequence[str]] = None, years: Optional[Sequence[int]] = None,
+                 registry_conditions: Sequence[str] = (), page_size: int = 1000):
+        """
+        Args:
+            db (DatabaseConnector): The connector for the database holding both tables.
+            registry_table (str): The registry listing every document.
+            status_table (str): The enrichment status table, joined on source_id.
+            status_column (str): The status column of the step being run.
+            year_column (str): The registry's year column.
+            jurisdictions (list, optional): Jurisdiction codes to include; all when empty.
+            years (list, optional): Years to include; all when empty.
+            registry_conditions (list): Extra SQL conditions on the registry, aliased `reg`.
+            page_size (int): The most documents returned per page.
+        """
+        self.db = db
+        self.registry_table = registry_table
+        self.status_table = status_table
+        self.status_column = status_column
+        self.year_column = year_column
+        self.jurisdictions = list(jurisdictions or [])
+        self.years = list(years or [])
+        self.registry_conditions = list(registry_conditions)
+        self.page_size = max(1, page_size)
+
+    def build_query(self, after_source_id: Optional[str] = None) -> Tuple[str, Dict]:
+        """
+        Returns the SQL and parameters of the page that starts after `after_source_id`.
+        """
+        query_parts = [
+            f"SELECT reg.source_id, reg.jurisdiction_code, dest.source_id AS status_source_id",
+            f"FROM {self.registry_table} AS reg",
+            f"LEFT JOIN {self.status_table} AS dest ON reg.source_id = dest.source_id",
+            f"WHERE (dest.source_id IS NULL OR dest.{self.status_column} != 'pass')",
+        ]
+        params = {"page_size": self.page_size}
+
+        if after_source_id is not None:
+            query_parts.append("AND reg.source_id > :after_source_id")
+            params["after_source_id"] = after_source_id
+        if self.jurisdictions:
+            query_parts.append(f"AND reg.jurisdiction_code IN ({self._in_list('jurisdiction', self.jurisdictions, params)})")
+        if self.years:
+            query_parts.append(f"AND reg.{self.year_column} IN ({self._in_list('year', self.years, params)})")
+        query_parts.extend(f"AND {condition}" for condition in self.registry_conditions)
+
+        query_parts.append("ORDER BY reg.source_id")
+        query_parts.append("LIMIT :page_size")
+        return "\n".join(query_parts), params
+
+    def pages(self) -> Iterator[pd.DataFrame]:
+        """
+        Yields DataFrames of pending documents (source_id, jurisdiction_code, status_source_id),
+        page by page, until no pending document is left after the cursor.
+        The next page is only queried once the previous one has been consumed.
+        """
+        after_source_id = None
+        while True:
+            query, params = self.build_query(after_source_id)
+            page_df = self.db.read_sql(query, params=params)
+            if page_df.empty:
+                return
+            yield page_df
+            if len(page_df) < self.page_size:
+                return
+            after_source_id = str(page_df['source_id'].iloc[-1])
+
+    def recommended_indexes(self) -> List[str]:
+        """
+        Returns CREATE INDEX statements that make the page query an in-order index range scan:
+        a covering index over the registry columns it filters on, led by the keyset column, and a
+        covering (source_id, status) index for the status lookup.
+        """
+        registry_columns = ["source_id", "jurisdiction_code", self.year_column]
+        registry_columns += [column for column in self._condition_columns() if column not in registry_columns]
+        return [
+            f"CREATE INDEX idx_{self.registry_table}_work_queue ON {self.registry_table} ({', '.join(registry_columns)})",
+            f"CREATE INDEX idx_{self.status_table}_{self.status_column} ON {self.status_table} (source_id, {self.status_column})",
+        ]
+
+    def _condition_columns(self) -> List[str]:
+        """The `reg.<column>` names used in registry_conditions."""
+        columns = []
+        for condition in self.registry_conditions:
+            for token in condition.replace("(", " ").replace(")", " ").split():
+                if token.startswith("reg.") and token[4:] not in columns:
+                    columns.append(token[4:])
+        return columns
+
+    @staticmethod
+    def _in_list(name: str, values: Sequence, params: Dict) -> str:
+        """Adds one named parameter per value and returns the placeholders for an IN (...) list."""
+        placeholders = []
+        for i, value in enumerate(values):
+            params[f"{name}_{i}"] = value
+            placeholders.append(f":{name}_{i}")
+        return ", ".join(placeholders)
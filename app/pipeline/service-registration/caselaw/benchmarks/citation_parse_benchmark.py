@@ -0,0 +1,140 @@
+"""
+Benchmarks citation parsing on synthetic neutral citations:
+  - the original per-record parser, which filters, sorts and iterrows the codes DataFrame per call
+  - parse_citation with codes compiled once by compile_codes
+  - parse_citations, the vectorized batch API over a whole Series
+
+The original parser is only timed on a sample (`--baseline-sample`) because it costs milliseconds
+per record; the batch result is also checked against it on that sample.
+
+Usage:
+    python benchmarks/citation_parse_benchmark.py [--records 100000] [--baseline-sample 2000]
+"""
+import argparse
+import logging
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+import pandas as pd
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, PROJECT_ROOT)
+from utils.parsing import compile_codes, load_json_config, parse_citation, parse_citations  # noqa: E402
+
+MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+          "August", "September", "October", "November", "December"]
+CODES = ["NSWCATAP", "NSWSC", "NSWDC", "VICSC", "QLDCAT", "WASAT", "SAFC", "TASMC", "ACTSC",
+         "NTSC", "FEDFCA", "FEDHCA", "FEDAAT", "NZCA", "NZHC", "NZMaoriLC", "HCA", "XYZ"]
+
+
+def original_deconstruct(combined_code, all_codes, jurisdiction_hint=None):
+    """The per-record DataFrame scan used before the codes were compiled."""
+    code_details = {'jurisdiction_code': None, 'tribunal_code': None, 'panel_or_division': None}
+    remaining_code = combined_code
+    if jurisdiction_hint:
+        code_details['jurisdiction_code'] = jurisdiction_hint
+        if remaining_code.startswith(jurisdiction_hint):
+            remaining_code = remaining_code[len(jurisdiction_hint):]
+    else:
+        jurisdictions = all_codes[all_codes['type'] == 'jurisdiction'].copy()
+        jurisdictions['code_len'] = jurisdictions['code'].str.len()
+        jurisdictions = jurisdictions.sort_values(by='code_len', ascending=False)
+        for _, row in jurisdictions.iterrows():
+            if remaining_code.startswith(row['code']):
+                code_details['jurisdiction_code'] = row['code']
+                remaining_code = remaining_code[len(row['code']):]
+                break
+    if code_details['jurisdiction_code']:
+        tribunals = all_codes[all_codes['type'] == 'tribunal'].copy()
+        tribunals['code_len'] = tribunals['code'].str.len()
+        tribunals = tribunals.sort_values(by='code_len', ascending=False)
+        for _, row in tribunals.iterrows():
+            if remaining_code.startswith(row['code']):
+                code_details['tribunal_code'] = row['code']
+                remaining_code = remaining_code[len(row['code']):]
+                break
+    if remaining_code:
+        code_details['panel_or_division'] = remaining_code
+    return code_details
+
+
+def original_parse(citation_str, all_codes, jurisdiction_hint=None):
+    """The original parse_citation, with its per-call pattern compile."""
+    details = {'year': None, 'jurisdiction_code': None, 'tribunal_code': None,
+               'panel_or_division': None, 'decision_date': None, 'members': None}
+    if not citation_str:
+        return details
+    pattern = re.compile(r'\[(\d{4})\]\s+([A-Z]+)\s+\d+\s+\((.*?)\)\s*(?:\((.*?)\))?$')
+    match = pattern.match(citation_str)
+    if not match:
+        return details
+    year_str, combined_code, date_str, members_str = match.groups()
+    details['year'] = int(year_str)
+    details['members'] = members_str.strip() if members_str else None
+    try:
+        details['decision_date'] = datetime.strptime(date_str.strip(), '%d %B %Y').date()
+    except ValueError:
+        pass
+    details.update(original_deconstruct(combined_code, all_codes, jurisdiction_hint))
+    return details
+
+
+def synthetic_citations(count, seed=7):
+    """Citations in the jade.io book_context format, with a few malformed and empty values mixed in."""
+    rng = random.Random(seed)
+    citations = []
+    for n in range(count):
+        roll = rng.random()
+        if roll < 0.01:
+            citations.append(None)
+        elif roll < 0.02:
+            citations.append(f"Unreported decision {n}")
+        else:
+            members = f" ({rng.choice(['M Deane', 'J Smith, Senior Member', 'A Lee J'])})" if roll < 0.6 else ""
+            date = f"{rng.randint(1, 28)} {rng.choice(MONTHS)} {rng.randint(1990, 2025)}"
+            citations.append(f"[{rng.randint(1990, 2025)}] {rng.choice(CODES)} {rng.randint(1, 2000)} ({date}){members}")
+    return pd.Series(citations, dtype=object)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--baseline-sample", type=int, default=2000)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    all_codes = pd.concat([
+        load_json_config(os.path.join(PROJECT_ROOT, "config", "australia_config.json")),
+        load_json_config(os.path.join(PROJECT_ROOT, "config", "new_zealand_config.json")),
+    ], ignore_index=True)
+    codes = compile_codes(all_codes)
+    citations = synthetic_citations(args.records)
+    sample = citations.iloc[:args.baseline_sample]
+
+    started = time.perf_counter()
+    expected = [original_parse(c, all_codes) for c in sample]
+    original_us = (time.perf_counter() - started) / len(sample) * 1e6
+
+    started = time.perf_counter()
+    for c in citations:
+        parse_citation(c, codes)
+    compiled_us = (time.perf_counter() - started) / len(citations) * 1e6
+
+    started = time.perf_counter()
+    batch = parse_citations(citations, codes)
+    batch_us = (time.perf_counter() - started) / len(citations) * 1e6
+
+    mismatches = sum(1 for row, exp in zip(batch.iloc[:len(sample)].to_dict('records'), expected) if row != exp)
+
+    print(f"{args.records} synthetic citations (original parser timed on {len(sample)})")
+    print(f"  original per-record parser: {original_us:10.1f} us/record")
+    print(f"  compiled per-record parser: {compiled_us:10.1f} us/record")
+    print(f"  vectorized batch parser:    {batch_us:10.1f} us/record")
+    print(f"  batch vs original: {original_us / batch_us:.0f}x faster, {mismatches} mismatches on the sample")
+
+
+if __name__ == "__main__":
+    main()
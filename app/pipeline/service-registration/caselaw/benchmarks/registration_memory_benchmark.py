@@ -0,0 +1,146 @@
+"""
+Benchmarks peak memory of registering one large source table into a SQLite registry:
+  - full: the original pattern, which reads the whole source table with pd.read_sql_table,
+    parses every citation up front and iterrows over the lot
+  - chunked: register_source_table, which reads keyset chunks and commits each chunk with its checkpoint
+
+The S3 content check is patched to 'pass' so only the database and parsing work is measured.
+Each mode runs in its own subprocess so its peak RSS (ru_maxrss) is measured in isolation.
+The full mode writes in batches of --chunk-size too, so the difference is only what is held in memory.
+
+Usage:
+    python benchmarks/registration_memory_benchmark.py [--rows 1000000] [--chunk-size 1000]
+"""
+import argparse
+import logging
+import os
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+import pandas as pd
+from sqlalchemy import create_engine
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, PROJECT_ROOT)
+from src import processing  # noqa: E402
+from utils.database import ensure_checkpoint_table  # noqa: E402
+from utils.parsing import compile_codes, load_json_config, parse_citations  # noqa: E402
+
+SOURCE_TABLE = "l2_scan_jade_io_caselaw_nsw"
+DEST_TABLE = "caselaw_registry"
+CHECKPOINT_TABLE = "registration_checkpoint"
+MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+          "August", "September", "October", "November", "December"]
+CODES = ["NSWSC", "NSWCA", "NSWDC", "NSWLEC", "NSWCATAP", "NSWIRComm"]
+
+
+def build_fixture(path, rows):
+    """Writes a synthetic L2 source table of `rows` records and an empty registry table."""
+    rng = random.Random(7)
+    connection = sqlite3.connect(path)
+    connection.execute(f"CREATE TABLE {SOURCE_TABLE} (id TEXT PRIMARY KEY, book_name TEXT, book_context TEXT, book_url TEXT)")
+    connection.execute(
+        f"CREATE TABLE {DEST_TABLE} (source_id TEXT PRIMARY KEY, neutral_citation TEXT, jurisdiction_code TEXT, "
+        "year INTEGER, decision_date DATE, file_path TEXT, source_url TEXT, book_name TEXT, "
+        "status_content_download TEXT, status_registration TEXT, reason_failed TEXT, "
+        "start_time_registration DATETIME, end_time_registration DATETIME, duration_registration REAL)"
+    )
+
+    def records():
+        for i in range(rows):
+            year = rng.randint(1990, 2024)
+            citation = f"[{year}] {rng.choice(CODES)} {rng.randint(1, 999)} ({rng.randint(1, 28)} {rng.choice(MONTHS)} {year})"
+            yield (f"{i:09d}", f"Applicant {i} v Respondent {i}", citation, f"https://jade.io/article/{i}")
+
+    connection.executemany(f"INSERT INTO {SOURCE_TABLE} VALUES (?, ?, ?, ?)", records())
+    connection.commit()
+    connection.close()
+
+
+def run_full(engine, all_codes, chunk_size, program_start_time):
+    source_df = pd.read_sql_table(SOURCE_TABLE, engine)
+    dest_df = pd.read_sql(f"SELECT source_id, status_registration FROM {DEST_TABLE}", engine)
+    existing_records = dest_df.set_index('source_id').to_dict('index')
+    citations_df = parse_citations(source_df['book_context'], all_codes, 'NSW')
+    batch = []
+    for index, row in source_df.iterrows():
+        batch.append(processing.build_registration_record(
+            row, citations_df.loc[index], 'NSW', 's3://legal-store', 'nsw', program_start_time
+        ))
+        if len(batch) == chunk_size:
+            with engine.connect() as conn:
+                processing.write_registration_chunk(conn, DEST_TABLE, batch, existing_records, chunk_size)
+                conn.commit()
+            batch = []
+    if batch:
+        with engine.connect() as conn:
+            processing.write_registration_chunk(conn, DEST_TABLE, batch, existing_records, chunk_size)
+            conn.commit()
+    return len(source_df) - len(existing_records)
+
+
+def run_chunked(engine, all_codes, chunk_size, program_start_time):
+    ensure_checkpoint_table(engine, CHECKPOINT_TABLE)
+    source_info = {'table': SOURCE_TABLE, 'jurisdiction': 'NSW', 'storage_folder': 'nsw'}
+    totals = processing.register_source_table(
+        engine, engine, source_info, DEST_TABLE, 's3://legal-store', all_codes,
+        program_start_time, 'registration_memory_benchmark', chunk_size, CHECKPOINT_TABLE, 500
+    )
+    return totals['passed'] + totals['failed']
+
+
+def run_mode(mode, db_path, chunk_size):
+    """Runs one mode in this process and prints '<records> <seconds> <peak MiB>'."""
+    logging.disable(logging.CRITICAL)
+    processing.verify_content_files = lambda s3_path, source_id: 'pass'
+    all_codes = compile_codes(pd.concat([
+        load_json_config(os.path.join(PROJECT_ROOT, 'config', 'australia_config.json')),
+        load_json_config(os.path.join(PROJECT_ROOT, 'config', 'new_zealand_config.json')),
+    ], ignore_index=True))
+    engine = create_engine(f"sqlite:///{db_path}")
+
+    runner = run_full if mode == 'full' else run_chunked
+    start = time.perf_counter()
+    written = runner(engine, all_codes, chunk_size, datetime.now(timezone.utc))
+    elapsed = time.perf_counter() - start
+    peak_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 # KiB on Linux
+    print(f"{written} {elapsed:.2f} {peak_mib:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--mode", choices=["full", "chunked"], help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.db, args.chunk_size)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        template_path = os.path.join(tmp_dir, "template.db")
+        print(f"Building a {args.rows:,}-row source table...")
+        build_fixture(template_path, args.rows)
+
+        for mode in ("full", "chunked"):
+            db_path = os.path.join(tmp_dir, f"{mode}.db")
+            with open(template_path, "rb") as src, open(db_path, "wb") as dst:
+                dst.write(src.read())
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--mode", mode, "--db", db_path,
+                 "--chunk-size", str(args.chunk_size)],
+                check=True, capture_output=True, text=True, cwd=PROJECT_ROOT
+            ).stdout.split()
+            written, elapsed, peak_mib = int(output[0]), float(output[1]), float(output[2])
+            print(f"{mode:>8}: {written:,} records registered in {elapsed:.1f}s, peak RSS {peak_mib:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmarks writing registration results to a SQLite caselaw_registry:
+  - per-record: the original pattern, one to_sql INSERT (or UPDATE for a re-registered id) and commit per record
+  - upsert: upsert_rows, an executemany UPDATE for registered ids and INSERT for the rest in batches, one commit per chunk
+
+Half of the records are already in the registry as failures, so both paths mix inserts and updates.
+The per-record path is only timed on a sample (`--baseline-sample`) because it costs a commit per record.
+
+Usage:
+    python benchmarks/registry_upsert_benchmark.py [--records 100000] [--batch-size 500] [--baseline-sample 5000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, PROJECT_ROOT)
+from utils.database import upsert_rows  # noqa: E402
+
+DEST_TABLE = "caselaw_registry"
+CHUNK_SIZE = 1000
+
+
+def create_registry(engine, existing_ids):
+    with engine.connect() as conn:
+        conn.execute(text(
+            f"CREATE TABLE {DEST_TABLE} (source_id TEXT PRIMARY KEY, neutral_citation TEXT, jurisdiction_code TEXT, "
+            "year INTEGER, decision_date DATE, file_path TEXT, source_url TEXT, book_name TEXT, "
+            "status_content_download TEXT, status_registration TEXT, reason_failed TEXT, "
+            "start_time_registration DATETIME, end_time_registration DATETIME, duration_registration REAL)"
+        ))
+        conn.execute(
+            text(f"INSERT INTO {DEST_TABLE} (source_id, status_registration) VALUES (:source_id, 'fail')"),
+            [{'source_id': source_id} for source_id in existing_ids]
+        )
+        conn.commit()
+
+
+def make_records(count):
+    now = datetime.now(timezone.utc)
+    return [{
+        'source_id': f"{i:09d}",
+        'neutral_citation': f"[2020] NSWSC {i} (1 March 2020)",
+        'jurisdiction_code': 'NSW',
+        'year': 2020,
+        'decision_date': date(2020, 3, 1),
+        'file_path': f"s3://legal-store/case-laws/nsw/{i:09d}",
+        'source_url': f"https://jade.io/article/{i}",
+        'book_name': f"Applicant {i} v Respondent {i}",
+        'status_content_download': 'pass',
+        'status_registration': 'pass',
+        'reason_failed': None,
+        'start_time_registration': now,
+        'end_time_registration': now,
+        'duration_registration': 0.01,
+    } for i in range(count)]
+
+
+def write_per_record(engine, records, existing_ids):
+    for record_data in records:
+        with engine.connect() as conn:
+            if record_data['source_id'] in existing_ids:
+                update_cols = ", ".join([f"{key} = :{key}" for key in record_data])
+                conn.execute(text(f"UPDATE {DEST_TABLE} SET {update_cols} WHERE source_id = :source_id"), record_data)
+            else:
+                pd.DataFrame([record_data]).to_sql(DEST_TABLE, conn, if_exists='append', index=False)
+            conn.commit()
+
+
+def write_upsert(engine, records, existing_ids, batch_size):
+    for start in range(0, len(records), CHUNK_SIZE):
+        with engine.connect() as conn:
+            upsert_rows(conn, DEST_TABLE, records[start:start + CHUNK_SIZE], existing_ids, batch_size=batch_size)
+            conn.commit()
+
+
+def timed(label, count, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:>11}: {count:,} records in {elapsed:.2f}s ({count / elapsed:,.0f} rows/s)")
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--baseline-sample", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        records = make_records(args.records)
+        existing_ids = {record['source_id'] for record in records[::2]}
+
+        sample = records[:args.baseline_sample]
+        baseline_engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'per_record.db')}")
+        create_registry(baseline_engine, existing_ids)
+        baseline_rate = timed("per-record", len(sample), lambda: write_per_record(baseline_engine, sample, existing_ids))
+
+        upsert_engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'upsert.db')}")
+        create_registry(upsert_engine, existing_ids)
+        upsert_rate = timed("upsert", len(records), lambda: write_upsert(upsert_engine, records, existing_ids, args.batch_size))
+
+        with upsert_engine.connect() as conn:
+            passed = conn.execute(text(f"SELECT COUNT(*) FROM {DEST_TABLE} WHERE status_registration = 'pass'")).scalar()
+        print(f"Speedup: {upsert_rate / baseline_rate:.1f}x ({passed:,} of {args.records:,} rows registered as 'pass')")
+
+
+if __name__ == "__main__":
+    main()
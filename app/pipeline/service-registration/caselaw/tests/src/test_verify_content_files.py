@@ -0,0 +1,75 @@
+import boto3
+import pytest
+from collections import Counter
+from moto import mock_aws
+
+from src.processing import verify_content_files
+from utils import s3_utils
+from utils.s3_utils import get_s3_client
+
+BUCKET = "legal-store"
+STORAGE_FOLDER = "s3://legal-store/case-laws/nsw/"
+CONTENT_FILES = ["excerpt.html", "miniviewer.html", "summary.html"]
+RECORDS = 700
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """
+    Starts a mock S3 holding all three content files for records 0-699, plus one record with an
+    empty summary, and counts every S3 API call the shared client makes by operation name.
+    """
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        s3_utils.reset_s3_client()
+        setup = boto3.client("s3", region_name="us-east-1")
+        setup.create_bucket(Bucket=BUCKET)
+        for record_id in range(RECORDS):
+            for file_name in CONTENT_FILES:
+                setup.put_object(Bucket=BUCKET, Key=f"case-laws/nsw/{record_id}/{file_name}", Body=b"<html></html>")
+        setup.put_object(Bucket=BUCKET, Key="case-laws/nsw/empty/excerpt.html", Body=b"<html></html>")
+        setup.put_object(Bucket=BUCKET, Key="case-laws/nsw/empty/miniviewer.html", Body=b"<html></html>")
+        setup.put_object(Bucket=BUCKET, Key="case-laws/nsw/empty/summary.html", Body=b"")
+
+        calls = Counter()
+        get_s3_client().meta.events.register(
+            "before-call.s3.*", lambda model, **kwargs: calls.update([model.name])
+        )
+        yield calls
+        s3_utils.reset_s3_client()
+
+
+def test_one_listing_page_per_thousand_keys(s3):
+    """
+    Checking every record in a storage folder costs one ListObjectsV2 page per 1000 keys
+    instead of three HeadObject calls per record.
+    """
+    statuses = [verify_content_files(STORAGE_FOLDER, record_id) for record_id in range(RECORDS)]
+
+    assert statuses == ["pass"] * RECORDS
+    assert s3 == Counter({"ListObjectsV2": 3}) # 2103 keys
+
+
+def test_missing_and_empty_files_fail_without_extra_calls(s3):
+    """
+    Missing and empty content files are answered from the cached listing.
+    """
+    verify_content_files(STORAGE_FOLDER, 0)
+    s3.clear()
+
+    assert verify_content_files(STORAGE_FOLDER, "empty") == "fail"
+    assert verify_content_files(STORAGE_FOLDER, RECORDS + 1) == "fail"
+    assert s3 == Counter()
+
+
+def test_falls_back_to_head_object_when_listing_fails(s3, monkeypatch):
+    """
+    If the storage folder cannot be listed, each file is checked with a HeadObject.
+    """
+    monkeypatch.setattr("src.processing.get_prefix_listing", lambda bucket_name, prefix: None)
+
+    assert verify_content_files(STORAGE_FOLDER, 0) == "pass"
+    assert verify_content_files(STORAGE_FOLDER, "empty") == "fail"
+    assert s3 == Counter({"HeadObject": 6})
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from utils.parsing import compile_codes, load_json_config, parse_citation, parse_citations
+
+CITATIONS = [
+    "[2025] NSWCATAP 123 (11 July 2025) (M Deane, Senior Member)",
+    "[2024] WASAT 7 (3 March 2024)",
+    "[2023] VSCA 45 (30 February 2023)",
+    "[2025] NSWSC 12 (1 July 2025) ( )",
+    "[2025] NSWSC 12 (1 July 2025) ()",
+    "Re X [2025] NSWSC 12 (1 July 2025)",
+    "[2025] NSWSC 12 (1 July 2025) (A Member) trailing text",
+    "[2022] XYZ 1 (5 May 2022)",
+    "Not a citation",
+    "",
+    None,
+]
+
+
+@pytest.fixture(scope="module")
+def codes():
+    return compile_codes(load_json_config("config/australia_config.json"))
+
+
+@pytest.mark.parametrize("jurisdiction_hint", [None, "NSW"])
+def test_batch_parse_matches_single_parse(codes, jurisdiction_hint):
+    """
+    parse_citations is the vectorized form of parse_citation and must give the same result for every record.
+    """
+    batch = parse_citations(pd.Series(CITATIONS, dtype=object), codes, jurisdiction_hint).to_dict('records')
+
+    assert batch == [parse_citation(citation, codes, jurisdiction_hint) for citation in CITATIONS]
+
+def test_citation_must_start_the_string(codes):
+    parsed = parse_citations(pd.Series(["Re X [2025] NSWSC 12 (1 July 2025)"], dtype=object), codes)
+
+    assert parsed.iloc[0]['year'] is None
+
+def test_blank_members_are_kept_as_empty_string(codes):
+    parsed = parse_citations(pd.Series(["[2025] NSWSC 12 (1 July 2025) ( )", "[2025] NSWSC 12 (1 July 2025) ()"], dtype=object), codes)
+
+    assert parsed['members'].tolist() == ['', None]
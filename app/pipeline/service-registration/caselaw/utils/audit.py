@@ -2,7 +2,24 @@ import logging
 import pandas as pd
 from datetime import datetime
 
-def write_audit_log(engine, table_name, job_name, job_id, start_time, end_time, status, message):
+def summarize_batch_timings(batch_timings):
+    """
+    Summarizes (row_count, seconds) write batches as one line, e.g.
+    'Wrote 12000 rows in 24 batches: 0.35s total, 14.6ms avg / 31.0ms max per batch, 34286 rows/s.'
+    """
+    if not batch_timings:
+        return "No rows written."
+    total_rows = sum(rows for rows, _ in batch_timings)
+    durations = [seconds for _, seconds in batch_timings]
+    total_seconds = sum(durations)
+    rows_per_second = total_rows / total_seconds if total_seconds else float('inf')
+    return (
+        f"Wrote {total_rows} rows in {len(batch_timings)} batches: {total_seconds:.2f}s total, "
+        f"{1000 * total_seconds / len(durations):.1f}ms avg / {1000 * max(durations):.1f}ms max per batch, "
+        f"{rows_per_second:.0f} rows/s."
+    )
+
+def write_audit_log(engine, table_name, job_name, job_id, start_time, end_time, status, message, batch_timings=None):
     """
     Writes a final log entry to the audit_log table.
 
@@ -15,8 +32,12 @@ def write_audit_log(engine, table_name, job_name, job_id, start_time, end_time,
         end_time (datetime): The end time of the job.
         status (str): The final status of the job ('success' or 'fail').
         message (str): A summary message for the job run.
+        batch_timings (list, optional): (row_count, seconds) for each registry write batch;
+                                        summarized and appended to the message.
     """
     try:
+        if batch_timings is not None:
+            message = f"{message} {summarize_batch_timings(batch_timings)}"
         duration = (end_time - start_time).total_seconds()
         audit_record = {
             'job_name': job_name,
@@ -1,5 +1,11 @@
 import logging
-from sqlalchemy import create_engine
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from sqlalchemy import Column, DateTime, MetaData, String, Table, bindparam, create_engine, delete, insert, select, text
+
+_metadata = MetaData()
 
 def create_db_engine(db_config, username, password):
     """
@@ -31,3 +37,140 @@ def create_db_engine(db_config, username, password):
     except Exception as e:
         logging.error(f"Failed to create database engine for '{db_config['name']}'. Error: {e}")
         return None
+
+
+def read_source_chunks(engine, table_name, chunk_size, start_after=None, key_column='id'):
+    """
+    Reads a source table in primary-key order, `chunk_size` rows at a time, using keyset
+    pagination (WHERE key > last key seen) so each chunk costs an index range scan and only
+    one chunk is held in memory.
+
+    Args:
+        engine: The SQLAlchemy engine for the source database.
+        table_name (str): The source table to read.
+        chunk_size (int): Rows per chunk.
+        start_after: Resume after this key value (e.g. from a checkpoint); None reads from the start.
+        key_column (str): The primary key column to paginate on.
+
+    Yields:
+        pd.DataFrame: The next chunk of rows, ordered by `key_column`.
+    """
+    last_key = start_after
+    while True:
+        where_clause = f"WHERE {key_column} > :last_key " if last_key is not None else ""
+        query = text(f"SELECT * FROM {table_name} {where_clause}ORDER BY {key_column} LIMIT :chunk_size")
+        with engine.connect() as connection:
+            chunk_df = pd.read_sql(query, connection, params={'last_key': last_key, 'chunk_size': chunk_size})
+        if chunk_df.empty:
+            return
+        yield chunk_df
+        if len(chunk_df) < chunk_size:
+            return
+        last_key = chunk_df[key_column].iloc[-1]
+
+
+def fetch_registration_status(engine, table_name, source_ids):
+    """
+    Returns {source_id: status_registration} for those of `source_ids` already in the registry table.
+    """
+    if not source_ids:
+        return {}
+    query = text(f"SELECT source_id, status_registration FROM {table_name} WHERE source_id IN :source_ids")
+    query = query.bindparams(bindparam('source_ids', expanding=True))
+    with engine.connect() as connection:
+        rows = connection.execute(query, {'source_ids': list(source_ids)}).fetchall()
+    return {source_id: status for source_id, status in rows}
+
+
+def _to_db_value(value):
+    """Converts numpy scalars and pandas missing values, which DB drivers reject, to plain Python."""
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def upsert_rows(connection, table_name, rows, existing_keys, key_column='source_id', batch_size=500):
+    """
+    Writes `rows` (a list of dicts with the same keys) to `table_name` in batches of `batch_size`:
+    rows whose `key_column` is in `existing_keys` are updated in place with one executemany UPDATE,
+    the rest are added with one executemany INSERT, which the MySQL drivers send as a multi-row INSERT.
+    The registry has no unique key on `key_column`, so `existing_keys` must hold every key already
+    in the table (e.g. the ids returned by fetch_registration_status). The caller commits.
+
+    Returns:
+        list: (row_count, seconds) for each batch written.
+    """
+    if not rows:
+        return []
+    columns = list(rows[0])
+    update_cols = ", ".join(f"{name} = :{name}" for name in columns if name != key_column)
+    update_query = text(f"UPDATE {table_name} SET {update_cols} WHERE {key_column} = :{key_column}")
+    insert_query = text(f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(f':{name}' for name in columns)})")
+    batch_timings = []
+    for start in range(0, len(rows), batch_size):
+        batch_start = time.perf_counter()
+        batch = [{name: _to_db_value(row[name]) for name in columns} for row in rows[start:start + batch_size]]
+        updates = [row for row in batch if row[key_column] in existing_keys]
+        inserts = [row for row in batch if row[key_column] not in existing_keys]
+        if updates:
+            connection.execute(update_query, updates)
+        if inserts:
+            connection.execute(insert_query, inserts)
+        batch_timings.append((len(batch), time.perf_counter() - batch_start))
+    return batch_timings
+
+
+def _checkpoint_table(table_name):
+    return Table(
+        table_name, _metadata,
+        Column('job_name', String(100), primary_key=True),
+        Column('source_table', String(255), primary_key=True),
+        Column('last_source_id', String(255), nullable=False),
+        Column('updated_at', DateTime, nullable=False),
+        extend_existing=True
+    )
+
+
+def ensure_checkpoint_table(engine, table_name):
+    """Creates the registration checkpoint table if it does not exist yet."""
+    _checkpoint_table(table_name).create(engine, checkfirst=True)
+
+
+def load_checkpoint(engine, table_name, job_name, source_table):
+    """Returns the last source id committed by an interrupted run of `job_name` over `source_table`, or None."""
+    checkpoints = _checkpoint_table(table_name)
+    query = select(checkpoints.c.last_source_id).where(
+        checkpoints.c.job_name == job_name, checkpoints.c.source_table == source_table
+    )
+    with engine.connect() as connection:
+        return connection.execute(query).scalar()
+
+
+def save_checkpoint(connection, table_name, job_name, source_table, last_source_id):
+    """
+    Records `last_source_id` as the resume point for `source_table`.
+    Call it on the connection that wrote the chunk, before its commit, so the checkpoint
+    and the chunk's registry rows are committed together.
+    """
+    checkpoints = _checkpoint_table(table_name)
+    connection.execute(delete(checkpoints).where(
+        checkpoints.c.job_name == job_name, checkpoints.c.source_table == source_table
+    ))
+    connection.execute(insert(checkpoints).values(
+        job_name=job_name, source_table=source_table,
+        last_source_id=str(last_source_id), updated_at=datetime.now(timezone.utc)
+    ))
+
+
+def clear_checkpoint(engine, table_name, job_name, source_table):
+    """Removes the resume point once `source_table` has been read to the end."""
+    checkpoints = _checkpoint_table(table_name)
+    with engine.connect() as connection:
+        connection.execute(delete(checkpoints).where(
+            checkpoints.c.job_name == job_name, checkpoints.c.source_table == source_table
+        ))
+        connection.commit()
@@ -2,8 +2,23 @@ import logging
 import re
 import yaml
 import pandas as pd
+from collections import namedtuple
 from datetime import datetime
 
+# Matches e.g. "[2025] NSWCATAP 123 (11 July 2025) (M Deane, Senior Member)".
+# The decision number is matched but not captured. Anchored at both ends so that
+# parse_citations (str.extract searches) accepts exactly what parse_citation (re.match) does.
+CITATION_PATTERN = re.compile(
+    r'^\[(?P<year>\d{4})\]\s+'          # Year in brackets, e.g., [2025]
+    r'(?P<combined_code>[A-Z]+)\s+'      # Combined code, e.g., NSWCATAP
+    r'\d+\s+'                           # Decision number (matched, but not captured)
+    r'\((?P<date>.*?)\)\s*'              # Decision date, e.g., (11 July 2025)
+    r'(?:\((?P<members>.*?)\))?$'        # Optional members list, e.g., (M Deane...)
+)
+
+# Court codes compiled into longest-first alternation regexes, one per code type.
+CompiledCodes = namedtuple('CompiledCodes', ['jurisdiction', 'tribunal'])
+
 def load_config(path='config/config.yaml'):
     """
     Loads the main YAML configuration file.
@@ -42,10 +57,30 @@ def parse_parties(book_name):
     secondary_party = parts[1].strip() if len(parts) > 1 else None
     return primary_party, secondary_party
 
+def _prefix_alternation(codes):
+    """Builds an alternation of `codes`, longest first, so a regex match picks the longest prefix."""
+    unique_codes = sorted(set(codes), key=len, reverse=True)
+    return '|'.join(re.escape(code) for code in unique_codes) or r'(?!)'
+
+def compile_codes(all_codes):
+    """
+    Compiles the codes DataFrame (from australia_config.json/new_zealand_config.json) once,
+    so deconstructing a citation code no longer filters and sorts the DataFrame per record.
+    """
+    if isinstance(all_codes, CompiledCodes):
+        return all_codes
+    compiled = {}
+    for code_type in CompiledCodes._fields:
+        codes = all_codes.loc[all_codes['type'] == code_type, 'code'] if not all_codes.empty else []
+        compiled[code_type] = re.compile(f"(?:{_prefix_alternation(codes)})")
+    return CompiledCodes(**compiled)
+
 def deconstruct_citation_code(combined_code, all_codes, jurisdiction_hint=None):
     """
     Deconstructs a combined code (e.g., 'NSWCATAP', 'WASAT') into its parts.
+    `all_codes` is the codes DataFrame or, preferably, the result of compile_codes().
     """
+    codes = compile_codes(all_codes)
     code_details = {
         'jurisdiction_code': None,
         'tribunal_code': None,
@@ -60,25 +95,17 @@ def deconstruct_citation_code(combined_code, all_codes, jurisdiction_hint=None):
             remaining_code = remaining_code[len(jurisdiction_hint):]
     else:
         # Fallback to searching if no hint is provided.
-        jurisdictions = all_codes[all_codes['type'] == 'jurisdiction'].copy()
-        jurisdictions['code_len'] = jurisdictions['code'].str.len()
-        jurisdictions = jurisdictions.sort_values(by='code_len', ascending=False)
-        for _, row in jurisdictions.iterrows():
-            if remaining_code.startswith(row['code']):
-                code_details['jurisdiction_code'] = row['code']
-                remaining_code = remaining_code[len(row['code']):]
-                break
+        match = codes.jurisdiction.match(remaining_code)
+        if match:
+            code_details['jurisdiction_code'] = match.group()
+            remaining_code = remaining_code[match.end():]
     
     # 2. Find Tribunal from the remaining part of the code
     if code_details['jurisdiction_code']:
-        tribunals = all_codes[all_codes['type'] == 'tribunal'].copy()
-        tribunals['code_len'] = tribunals['code'].str.len()
-        tribunals = tribunals.sort_values(by='code_len', ascending=False)
-        for _, row in tribunals.iterrows():
-            if remaining_code.startswith(row['code']):
-                code_details['tribunal_code'] = row['code']
-                remaining_code = remaining_code[len(row['code']):]
-                break
+        match = codes.tribunal.match(remaining_code)
+        if match:
+            code_details['tribunal_code'] = match.group()
+            remaining_code = remaining_code[match.end():]
     
     # 3. The rest is the panel/division
     if remaining_code:
@@ -100,15 +127,7 @@ def parse_citation(citation_str, all_codes, jurisdiction_hint=None):
     if not citation_str:
         return details
 
-    # Updated pattern to match the decision number but not capture it.
-    pattern = re.compile(
-        r'\[(\d{4})\]\s+'        # Group 1: Year in brackets, e.g., [2025]
-        r'([A-Z]+)\s+'           # Group 2: Combined code, e.g., NSWCATAP
-        r'\d+\s+'                # Decision number (matched, but not captured)
-        r'\((.*?)\)\s*'          # Group 3: Decision date, e.g., (11 July 2025)
-        r'(?:\((.*?)\))?$'       # Group 4: Optional members list, e.g., (M Deane...)
-    )
-    match = pattern.match(citation_str)
+    match = CITATION_PATTERN.match(citation_str)
     if not match:
         logging.warning(f"Could not parse citation format: {citation_str}")
         return details
@@ -129,3 +148,50 @@ def parse_citation(citation_str, all_codes, jurisdiction_hint=None):
     details.update(code_details)
             
     return details
+
+def parse_citations(citations, all_codes, jurisdiction_hint=None):
+    """
+    Batch version of parse_citation: parses a whole Series of citation strings with vectorized
+    pandas string operations instead of one regex and code lookup per record.
+
+    Returns:
+        pd.DataFrame: Indexed like `citations`, with the same columns as parse_citation's dict.
+                      Unparseable values are None.
+    """
+    codes = compile_codes(all_codes)
+    parts = citations.astype('string').str.extract(CITATION_PATTERN)
+    matched = parts['year'].notna()
+    unparsed = citations.notna() & (citations.astype('string') != '') & ~matched
+    if unparsed.any():
+        logging.warning(f"Could not parse citation format for {int(unparsed.sum())} of {len(citations)} records.")
+
+    result = pd.DataFrame(index=citations.index)
+    result['year'] = pd.to_numeric(parts['year']).astype('Int64')
+
+    decision_dates = pd.to_datetime(parts['date'].str.strip(), format='%d %B %Y', errors='coerce')
+    bad_dates = matched & decision_dates.isna()
+    if bad_dates.any():
+        logging.warning(f"Could not parse the decision date of {int(bad_dates.sum())} citations.")
+    result['decision_date'] = decision_dates.dt.date
+
+    # As in parse_citation, an empty "()" gives None and a blank "( )" gives ''.
+    result['members'] = parts['members'].str.strip().where(parts['members'].str.len() > 0)
+
+    combined = parts['combined_code']
+    if jurisdiction_hint:
+        split = combined.str.extract(f"^(?:{re.escape(jurisdiction_hint)})?(?P<rest>.*)$")
+        jurisdiction = pd.Series(jurisdiction_hint, index=citations.index, dtype='string').where(matched)
+    else:
+        split = combined.str.extract(f"^(?P<code>{codes.jurisdiction.pattern})?(?P<rest>.*)$")
+        jurisdiction = split['code']
+    result['jurisdiction_code'] = jurisdiction
+
+    # Tribunals are only looked for once a jurisdiction is known; otherwise the whole code is the panel.
+    split_tribunal = split['rest'].str.extract(f"^(?P<code>{codes.tribunal.pattern})?(?P<rest>.*)$")
+    has_jurisdiction = jurisdiction.notna()
+    result['tribunal_code'] = split_tribunal['code'].where(has_jurisdiction)
+    remaining = split_tribunal['rest'].where(has_jurisdiction, split['rest'])
+    result['panel_or_division'] = remaining.where(remaining != '')
+
+    result = result[['year', 'jurisdiction_code', 'tribunal_code', 'panel_or_division', 'decision_date', 'members']]
+    return result.astype(object).where(result.notna(), None)
@@ -2,12 +2,17 @@ import logging
 import os
 from datetime import datetime, timezone
 import pandas as pd
-import boto3
-from botocore.exceptions import ClientError
-from sqlalchemy import text
-from utils.database import create_db_engine
-from utils.parsing import load_config, parse_legislation_context
+from utils.database import (
+    create_db_engine, read_source_chunks, fetch_registration_status, upsert_rows,
+    ensure_checkpoint_table, load_checkpoint, save_checkpoint, clear_checkpoint
+)
+from utils.parsing import load_config, parse_legislation_contexts
 from utils.audit import write_audit_log
+from utils.s3_utils import split_s3_path, get_prefix_listing, is_non_empty_object, clear_prefix_listings
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_CHECKPOINT_TABLE = 'registration_checkpoint'
+DEFAULT_WRITE_BATCH_SIZE = 500
 
 def verify_content_files(s3_path, source_id):
     """
@@ -25,38 +30,151 @@ def verify_content_files(s3_path, source_id):
         logging.error(f"Invalid S3 path provided to verify_content_files: {s3_path}")
         return 'fail'
 
-    s3 = boto3.client('s3')
     # Assuming the same file structure for legislation content
     files_to_check = ['excerpt.html', 'miniviewer.html', 'summary.html']
-    
-    parts = s3_path.replace('s3://', '').split('/')
-    bucket_name = parts[0]
-    base_prefix = '/'.join(parts[1:]) if len(parts) > 1 else ''
-    
-    if base_prefix and not base_prefix.endswith('/'):
-        base_prefix += '/'
+    bucket_name, base_prefix = split_s3_path(s3_path)
 
     try:
+        # One cached listing of the storage folder answers the check for every record in it;
+        # a HEAD request per file is only made if the folder could not be listed.
+        non_empty_keys = get_prefix_listing(bucket_name, base_prefix)
         for file_name in files_to_check:
-            s3_key = f"{base_prefix}{source_id}/{file_name}"
-            try:
-                response = s3.head_object(Bucket=bucket_name, Key=s3_key)
-                if response['ContentLength'] == 0:
-                    logging.warning(f"S3 file check failed for s3://{bucket_name}/{s3_key}. Object is empty.")
+            relative_key = f"{source_id}/{file_name}"
+            if non_empty_keys is not None:
+                if relative_key not in non_empty_keys:
+                    logging.warning(f"S3 file check failed for s3://{bucket_name}/{base_prefix}{relative_key}. Object is missing or empty.")
                     return 'fail'
-            except ClientError as e:
-                if e.response['Error']['Code'] == '404':
-                    logging.warning(f"S3 file check failed for s3://{bucket_name}/{s3_key}. Object is missing.")
-                    return 'fail'
-                else:
-                    logging.error(f"An unexpected AWS error occurred checking {s3_key}: {e}")
-                    raise
+            elif not is_non_empty_object(bucket_name, f"{base_prefix}{relative_key}"):
+                return 'fail'
         logging.info(f"All content files verified in S3 for source_id {source_id}.")
         return 'pass'
     except Exception as e:
         logging.error(f"Error during S3 file verification for source_id {source_id}. Error: {e}")
         return 'fail'
 
+def build_registration_record(row, context_details, jurisdiction_code, filepath_from_config, storage_folder, program_start_time):
+    """
+    Builds the legislation_registry row for one source record, including its S3 content check
+    and pass/fail status.
+    """
+    source_id = row['id']
+    record_start_time = datetime.now(timezone.utc)
+
+    start_date = context_details.get('start_date')
+    book_version = context_details.get('book_version') # Extract book_version
+    
+    storage_folder_s3_path = f"{filepath_from_config}{storage_folder}/"
+    file_path = f"{filepath_from_config}{storage_folder}/{source_id}"
+    content_download_status = verify_content_files(storage_folder_s3_path, source_id)
+
+    record_data = {
+        'source_id': source_id,
+        'book_name': row['book_name'],
+        'book_version': book_version, # Add book_version to record
+        'jurisdiction_code': jurisdiction_code,
+        'start_date': start_date,
+        'year': start_date.year if start_date else None,
+        'file_path': file_path,
+        'source_url': row.get('book_url'),
+        'status_content_download': content_download_status,
+    }
+
+    failure_reasons = []
+    if content_download_status == 'fail':
+        failure_reasons.append("Missing or empty content files")
+
+    mandatory_fields = ['book_name', 'jurisdiction_code', 'start_date', 'year']
+    missing_fields = [field for field in mandatory_fields if not record_data.get(field)]
+    if missing_fields:
+        failure_reasons.append(f"Missing mandatory fields: {', '.join(missing_fields)}")
+    
+    if failure_reasons:
+        final_status = 'fail'
+        reason_for_failure = '; '.join(failure_reasons)
+        logging.warning(f"Record {source_id}: Marking as 'fail'. Reason(s): {reason_for_failure}")
+    else:
+        final_status = 'pass'
+        reason_for_failure = None
+    
+    record_end_time = datetime.now(timezone.utc)
+    record_data.update({
+        'status_registration': final_status,
+        'reason_failed': reason_for_failure,
+        'start_time_registration': program_start_time,
+        'end_time_registration': record_end_time,
+        'duration_registration': (record_end_time - record_start_time).total_seconds()
+    })
+    return record_data
+
+def write_registration_chunk(connection, dest_table, records, existing_source_ids, batch_size):
+    """
+    Writes one chunk of registry rows keyed on source_id: new source ids are inserted and ids
+    already in the registry (`existing_source_ids`, e.g. earlier failures) are updated. The caller commits.
+
+    Returns:
+        list: (row_count, seconds) for each batch written.
+    """
+    return upsert_rows(connection, dest_table, records, existing_source_ids, key_column='source_id', batch_size=batch_size)
+
+def register_source_table(source_engine, dest_engine, source_info, dest_table, filepath_from_config,
+                          program_start_time, job_name, chunk_size, checkpoint_table, write_batch_size):
+    """
+    Registers one source table chunk by chunk. Each chunk is read by keyset pagination, parsed in
+    one vectorized pass, and written and checkpointed in a single transaction before the next
+    chunk is read, so memory stays flat and an interrupted run resumes after its last committed chunk.
+
+    Returns:
+        dict: Counts of records read, skipped as already registered, passed and failed, and
+              the (row_count, seconds) of every write batch under 'batch_timings'.
+    """
+    source_table = source_info['table']
+    jurisdiction_code = source_info.get('jurisdiction')
+    storage_folder = source_info.get('storage_folder')
+    totals = {'read': 0, 'skipped': 0, 'passed': 0, 'failed': 0, 'batch_timings': []}
+
+    last_source_id = load_checkpoint(dest_engine, checkpoint_table, job_name, source_table)
+    if last_source_id is not None:
+        logging.info(f"Resuming {source_table} after source id {last_source_id}.")
+
+    for chunk_num, chunk_df in enumerate(read_source_chunks(source_engine, source_table, chunk_size, start_after=last_source_id), start=1):
+        chunk_start_time = datetime.now(timezone.utc)
+        totals['read'] += len(chunk_df)
+
+        # Skip records that are already registered successfully.
+        registration_status = fetch_registration_status(dest_engine, dest_table, chunk_df['id'].tolist())
+        records_to_process_df = chunk_df[chunk_df['id'].map(registration_status) != 'pass']
+        totals['skipped'] += len(chunk_df) - len(records_to_process_df)
+
+        records = []
+        if not records_to_process_df.empty:
+            contexts_df = parse_legislation_contexts(records_to_process_df['book_context'])
+            for row, context_details in zip(records_to_process_df.to_dict('records'), contexts_df.to_dict('records')):
+                try:
+                    record_data = build_registration_record(row, context_details, jurisdiction_code, filepath_from_config, storage_folder, program_start_time)
+                except Exception as e:
+                    logging.error(f"Record {row['id']}: Failed to process. Error: {e}", exc_info=True)
+                    continue
+                totals['passed' if record_data['status_registration'] == 'pass' else 'failed'] += 1
+                records.append(record_data)
+
+        with dest_engine.connect() as conn:
+            batch_timings = write_registration_chunk(conn, dest_table, records, registration_status.keys(), write_batch_size)
+            save_checkpoint(conn, checkpoint_table, job_name, source_table, chunk_df['id'].iloc[-1])
+            conn.commit()
+
+        totals['batch_timings'].extend(batch_timings)
+
+        chunk_duration = (datetime.now(timezone.utc) - chunk_start_time).total_seconds()
+        write_duration = sum(seconds for _, seconds in batch_timings)
+        logging.info(
+            f"{source_table} chunk {chunk_num}: {len(chunk_df)} read, {len(records)} written in "
+            f"{len(batch_timings)} batch(es) taking {write_duration:.2f} seconds; chunk took {chunk_duration:.2f} seconds."
+        )
+
+    clear_checkpoint(dest_engine, checkpoint_table, job_name, source_table)
+    clear_prefix_listings()
+    return totals
+
 def process_legislation_data():
     """
     Main ETL function to extract, transform, and load legislation data.
@@ -89,6 +207,12 @@ def process_legislation_data():
     audit_log_config = config.get('audit_log_table', [{}])[0]
     audit_table_name = audit_log_config.get('table')
 
+    registration_config = config.get('registration') or {}
+    chunk_size = int(registration_config.get('chunk_size', DEFAULT_CHUNK_SIZE))
+    checkpoint_table = registration_config.get('checkpoint_table', DEFAULT_CHECKPOINT_TABLE)
+    write_batch_size = int(registration_config.get('write_batch_size', DEFAULT_WRITE_BATCH_SIZE))
+    batch_timings = []
+
     try:
         source_engine = create_db_engine(config['database']['source'], db_user, db_password)
         if not source_engine:
@@ -96,6 +220,7 @@ def process_legislation_data():
             
         dest_table = config['tables']['tables_to_write'][0]['table']
         filepath_from_config = config.get('filepath', 's3://legal-store/legislation/')
+        ensure_checkpoint_table(dest_engine, checkpoint_table)
         
         logging.info(f"Program run started at: {program_start_time.isoformat()}")
 
@@ -109,111 +234,16 @@ def process_legislation_data():
                 continue
 
             logging.info(f"--- Processing source table: {source_table} (Jurisdiction: {jurisdiction_code}, Storage Folder: {storage_folder}) ---")
-            
-            source_df = pd.read_sql_table(source_table, source_engine)
-            logging.info(f"Read {len(source_df)} records from {source_table}.")
-
-            # Efficiently check for already processed records
-            try:
-                with dest_engine.connect() as connection:
-                    query = text(f"SELECT source_id, status_registration FROM {dest_table} WHERE jurisdiction_code = :jurisdiction_code")
-                    dest_df = pd.read_sql(query, connection, params={'jurisdiction_code': jurisdiction_code})
-                
-                processed_ids = dest_df[dest_df['status_registration'] == 'pass']['source_id'].tolist()
-                existing_records = dest_df.set_index('source_id').to_dict('index')
-
-            except Exception as e:
-                logging.error(f"Could not query destination table '{dest_table}' for existing records. Error: {e}")
-                processed_ids = []
-                existing_records = {}
-            
-            # Filter out records that have already been successfully processed
-            if processed_ids:
-                records_to_process_df = source_df[~source_df['id'].isin(processed_ids)].copy()
-            else:
-                records_to_process_df = source_df.copy()
-
-            total_to_process = len(records_to_process_df)
-            if total_to_process == 0:
-                logging.info(f"No new or failed records to process for {source_table}.")
-                continue
-            
-            logging.info(f"Found {total_to_process} records to process for {source_table}.")
-
-            for index, row in records_to_process_df.iterrows():
-                record_num = index + 1
-                source_id = row['id']
-                log_prefix = f"Record {record_num}/{total_to_process} (ID: {source_id})"
-                
-                logging.info(f"{log_prefix}: Starting processing.")
-                record_start_time = datetime.now(timezone.utc)
-                
-                try:
-                    record_exists = source_id in existing_records
-
-                    context_details = parse_legislation_context(row['book_context'])
-                    start_date = context_details.get('start_date')
-                    book_version = context_details.get('book_version') # Extract book_version
-                    
-                    storage_folder_s3_path = f"{filepath_from_config}{storage_folder}/"
-                    file_path = f"{filepath_from_config}{storage_folder}/{source_id}"
-                    content_download_status = verify_content_files(storage_folder_s3_path, source_id)
-
-                    record_data = {
-                        'source_id': source_id,
-                        'book_name': row['book_name'],
-                        'book_version': book_version, # Add book_version to record
-                        'jurisdiction_code': jurisdiction_code,
-                        'start_date': start_date,
-                        'year': start_date.year if start_date else None,
-                        'file_path': file_path,
-                        'source_url': row.get('book_url'),
-                        'status_content_download': content_download_status,
-                    }
-
-                    failure_reasons = []
-                    if content_download_status == 'fail':
-                        failure_reasons.append("Missing or empty content files")
-
-                    mandatory_fields = ['book_name', 'jurisdiction_code', 'start_date', 'year']
-                    missing_fields = [field for field in mandatory_fields if not record_data.get(field)]
-                    if missing_fields:
-                        failure_reasons.append(f"Missing mandatory fields: {', '.join(missing_fields)}")
-                    
-                    if failure_reasons:
-                        final_status = 'fail'
-                        reason_for_failure = '; '.join(failure_reasons)
-                        logging.warning(f"{log_prefix}: Marking as 'fail'. Reason(s): {reason_for_failure}")
-                    else:
-                        final_status = 'pass'
-                        reason_for_failure = None
-                    
-                    record_end_time = datetime.now(timezone.utc)
-                    record_duration = (record_end_time - record_start_time).total_seconds()
-
-                    record_data.update({
-                        'status_registration': final_status,
-                        'reason_failed': reason_for_failure,
-                        'start_time_registration': program_start_time,
-                        'end_time_registration': record_end_time,
-                        'duration_registration': record_duration
-                    })
-
-                    with dest_engine.connect() as conn:
-                        if record_exists:
-                            # Prepare for UPDATE
-                            update_cols = ", ".join([f"{key} = :{key}" for key in record_data])
-                            update_query = text(f"UPDATE {dest_table} SET {update_cols} WHERE source_id = :source_id")
-                            conn.execute(update_query, record_data)
-                        else:
-                            # Prepare for INSERT
-                            insert_df = pd.DataFrame([record_data])
-                            insert_df.to_sql(dest_table, conn, if_exists='append', index=False)
-                        conn.commit()
-                    logging.info(f"{log_prefix}: Successfully processed in {record_duration:.4f} seconds. Final status: {final_status}")
 
-                except Exception as e:
-                    logging.error(f"{log_prefix}: Failed to process. Error: {e}", exc_info=True)
+            totals = register_source_table(
+                source_engine, dest_engine, source_info, dest_table, filepath_from_config,
+                program_start_time, job_name_from_config, chunk_size, checkpoint_table, write_batch_size
+            )
+            logging.info(
+                f"Finished {source_table}: {totals['read']} read, {totals['skipped']} already registered, "
+                f"{totals['passed']} passed, {totals['failed']} failed."
+            )
+            batch_timings.extend(totals['batch_timings'])
 
     except Exception as e:
         job_status = 'fail'
@@ -234,7 +264,8 @@ def process_legislation_data():
                 start_time=program_start_time,
                 end_time=program_end_time,
                 status=job_status,
-                message=message
+                message=message,
+                batch_timings=batch_timings
             )
         else:
             logging.warning("audit_log_table not configured in config.yaml. Skipping audit log.")
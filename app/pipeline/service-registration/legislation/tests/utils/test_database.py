@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+from datetime import date
+from sqlalchemy import create_engine, text
+
+from utils.database import fetch_registration_status, upsert_rows
+
+TABLE = "legislation_registry"
+
+
+@pytest.fixture
+def connection():
+    """An in-memory SQLite registry which, like the production one, has no unique key on source_id."""
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        conn.execute(text(
+            f"CREATE TABLE {TABLE} (source_id TEXT, year INTEGER, start_date DATE, status_registration TEXT)"
+        ))
+        yield conn
+
+
+def read_registry(conn):
+    return conn.execute(text(f"SELECT * FROM {TABLE} ORDER BY source_id")).fetchall()
+
+
+def test_rows_are_written_in_batches(connection):
+    rows = [{'source_id': f"{i:03d}", 'year': 2020, 'start_date': None, 'status_registration': 'pass'} for i in range(7)]
+
+    batch_timings = upsert_rows(connection, TABLE, rows, set(), batch_size=3)
+
+    assert [count for count, _ in batch_timings] == [3, 3, 1]
+    assert len(read_registry(connection)) == 7
+
+
+def test_existing_rows_are_updated_in_place(connection):
+    """
+    Re-writing a registered source_id updates its row instead of adding a second one.
+    """
+    upsert_rows(connection, TABLE, [
+        {'source_id': '001', 'year': 2020, 'start_date': None, 'status_registration': 'fail'},
+        {'source_id': '002', 'year': 2021, 'start_date': None, 'status_registration': 'pass'},
+    ], set())
+    upsert_rows(connection, TABLE, [
+        {'source_id': '001', 'year': 2020, 'start_date': date(2020, 3, 1), 'status_registration': 'pass'},
+        {'source_id': '003', 'year': 2022, 'start_date': None, 'status_registration': 'fail'},
+    ], {'001', '002'})
+
+    assert read_registry(connection) == [
+        ('001', 2020, '2020-03-01', 'pass'),
+        ('002', 2021, None, 'pass'),
+        ('003', 2022, None, 'fail'),
+    ]
+
+
+def test_numpy_and_missing_values_are_converted(connection):
+    """
+    Values taken from DataFrames (numpy ints, NaN, NaT) are written as plain ints and NULLs.
+    """
+    df = pd.DataFrame({'source_id': ['001', '002'], 'year': [2020, 2021], 'start_date': [pd.NaT, pd.NaT],
+                       'status_registration': ['pass', float('nan')]})
+
+    upsert_rows(connection, TABLE, df.to_dict('records'), set())
+
+    assert read_registry(connection) == [('001', 2020, None, 'pass'), ('002', 2021, None, None)]
+
+
+def test_empty_input_writes_nothing(connection):
+    assert upsert_rows(connection, TABLE, [], set()) == []
+
+
+def test_reprocessed_failures_are_not_duplicated(connection):
+    """
+    A failed record registered again is updated, using the ids fetch_registration_status found.
+    """
+    engine = connection.engine
+    upsert_rows(connection, TABLE, [{'source_id': '001', 'year': 2020, 'start_date': None, 'status_registration': 'fail'}], set())
+    connection.commit()
+
+    for _ in range(2):
+        existing = fetch_registration_status(engine, TABLE, ['001', '002'])
+        upsert_rows(connection, TABLE, [
+            {'source_id': '001', 'year': 2020, 'start_date': None, 'status_registration': 'pass'},
+            {'source_id': '002', 'year': 2021, 'start_date': None, 'status_registration': 'fail'},
+        ], existing.keys())
+        connection.commit()
+
+    assert read_registry(connection) == [('001', 2020, None, 'pass'), ('002', 2021, None, 'fail')]
@@ -2,7 +2,8 @@ import logging
 import re
 import yaml
 import pandas as pd
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
 
 def load_config(path='config/config.yaml'):
     """
@@ -31,6 +32,45 @@ def load_json_config(path):
         logging.error(f"Error loading JSON config from {path}: {e}")
         return pd.DataFrame()
 
+VERSION_PATTERN = re.compile(r'Version\s*(?P<book_version>\d+)', re.IGNORECASE)
+
+# One pass finds the date label and tells the two date formats apart, so each date string
+# is parsed by exactly one format instead of trying each in turn.
+DATE_PATTERN = re.compile(
+    r'(?:Start date|Currency date|Date published|Date of assent|Date made):\s*'
+    r'(?:(?P<numeric_date>\d{1,2}/\d{1,2}/\d{4})|(?P<long_date>\d{1,2}\s+\w+\s+\d{4}))',
+    re.IGNORECASE
+)
+
+MONTHS = {datetime(2000, month, 1).strftime('%B').lower(): month for month in range(1, 13)}
+
+@lru_cache(maxsize=8192)
+def parse_numeric_date(date_str):
+    """
+    Parses a 'dd/mm/yyyy' date string, as datetime.strptime(date_str, '%d/%m/%Y') would.
+    Returns None for impossible dates. Results are cached, since many acts share a start date.
+    """
+    day, month, year = date_str.split('/')
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=8192)
+def parse_long_date(date_str):
+    """
+    Parses a 'd Month yyyy' date string, as datetime.strptime(date_str, '%d %B %Y') would.
+    Returns None for unknown month names or impossible dates. Results are cached.
+    """
+    day, month_name, year = date_str.split()
+    month = MONTHS.get(month_name.lower())
+    if month is None:
+        return None
+    try:
+        return date(int(year), month, int(day))
+    except ValueError:
+        return None
+
 def parse_legislation_context(context_str):
     """
     Parses the book_context string to extract the start date and book version.
@@ -54,25 +94,21 @@ def parse_legislation_context(context_str):
         return details
 
     # 1. Extract book version if present
-    version_match = re.search(r'Version\s*(\d+)', context_str, re.IGNORECASE)
+    version_match = VERSION_PATTERN.search(context_str)
     if version_match:
-        details['book_version'] = version_match.group(1)
+        details['book_version'] = version_match.group('book_version')
         logging.info(f"Successfully parsed book version: {details['book_version']}")
 
-    # 2. Extract date using a flexible pattern for various labels and formats
-    date_pattern = r'(?:Start date|Currency date|Date published|Date of assent|Date made):\s*(\d{1,2}/\d{1,2}/\d{4}|\d{1,2}\s+\w+\s+\d{4})'
-    date_match = re.search(date_pattern, context_str, re.IGNORECASE)
+    # 2. Extract the date and parse it with the format its family was matched by
+    date_match = DATE_PATTERN.search(context_str)
     
     if date_match:
-        date_str = date_match.group(1).strip()
-        parsed_date = None
-        # Attempt to parse multiple known date string formats
-        for fmt in ('%d/%m/%Y', '%d %B %Y'):
-            try:
-                parsed_date = datetime.strptime(date_str, fmt).date()
-                break  # Stop on the first successful parse
-            except ValueError:
-                continue # If parsing fails, try the next format
+        if date_match.group('numeric_date'):
+            date_str = date_match.group('numeric_date')
+            parsed_date = parse_numeric_date(date_str)
+        else:
+            date_str = date_match.group('long_date')
+            parsed_date = parse_long_date(date_str)
         
         if parsed_date:
             details['start_date'] = parsed_date
@@ -82,4 +118,34 @@ def parse_legislation_context(context_str):
     else:
         logging.warning(f"Could not find a valid date pattern in context: {context_str}")
 
-    return details
\ No newline at end of file
+    return details
+
+def parse_legislation_contexts(contexts):
+    """
+    Batch version of parse_legislation_context: extracts the version and date of a whole Series
+    of book_context strings with vectorized regex passes, and parses each distinct date string once.
+
+    Returns:
+        pd.DataFrame: Indexed like `contexts`, with 'start_date' and 'book_version' columns.
+                      Missing or unparseable values are None.
+    """
+    strings = contexts.where(contexts.map(lambda value: isinstance(value, str))).astype('string')
+    versions = strings.str.extract(VERSION_PATTERN)['book_version']
+    dates = strings.str.extract(DATE_PATTERN)
+
+    numeric_dates = dates['numeric_date'].dropna()
+    long_dates = dates['long_date'].dropna()
+    start_dates = pd.concat([
+        numeric_dates.map({value: parse_numeric_date(value) for value in numeric_dates.unique()}),
+        long_dates.map({value: parse_long_date(value) for value in long_dates.unique()}),
+    ]).reindex(contexts.index)
+
+    unmatched = strings.notna() & dates['numeric_date'].isna() & dates['long_date'].isna()
+    if unmatched.any():
+        logging.warning(f"Could not find a valid date pattern in {int(unmatched.sum())} of {len(contexts)} contexts.")
+    unparsed = (dates['numeric_date'].notna() | dates['long_date'].notna()) & start_dates.isna()
+    if unparsed.any():
+        logging.warning(f"Could not parse the date of {int(unparsed.sum())} of {len(contexts)} contexts.")
+
+    result = pd.DataFrame({'start_date': start_dates, 'book_version': versions}, index=contexts.index)
+    return result.astype(object).where(result.notna(), None)
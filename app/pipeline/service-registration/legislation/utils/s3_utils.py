@@ -0,0 +1,92 @@
+import logging
+import threading
+import boto3
+from botocore.exceptions import ClientError, NoCredentialsError
+
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+# {(bucket, prefix): set of keys under prefix (relative to it) holding a non-empty object}
+_listings = {}
+_listings_lock = threading.Lock()
+
+def get_s3_client():
+    """
+    Returns the process-wide S3 client, creating it on first use.
+    """
+    global _s3_client
+    with _s3_client_lock:
+        if _s3_client is None:
+            _s3_client = boto3.client('s3')
+        return _s3_client
+
+def reset_s3_client():
+    """Drops the shared client and any cached listings, e.g. after credentials change or in tests."""
+    global _s3_client
+    with _s3_client_lock:
+        _s3_client = None
+    clear_prefix_listings()
+
+def split_s3_path(s3_path):
+    """
+    Splits 's3://bucket/some/prefix' into ('bucket', 'some/prefix/').
+    """
+    parts = s3_path.replace('s3://', '').split('/')
+    bucket_name = parts[0]
+    prefix = '/'.join(parts[1:]) if len(parts) > 1 else ''
+    if prefix and not prefix.endswith('/'):
+        prefix += '/'
+    return bucket_name, prefix
+
+def get_prefix_listing(bucket_name, prefix):
+    """
+    Lists every object under `prefix` once (1000 keys per request) and caches the set of
+    non-empty keys, relative to `prefix`, for the rest of the table.
+    Returns None if the listing could not be fetched.
+    """
+    cache_key = (bucket_name, prefix)
+    with _listings_lock:
+        if cache_key in _listings:
+            return _listings[cache_key]
+
+    non_empty_keys = set()
+    try:
+        paginator = get_s3_client().get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                if obj['Size'] > 0:
+                    non_empty_keys.add(obj['Key'][len(prefix):])
+    except NoCredentialsError:
+        logging.error("Credentials not available for AWS S3.")
+        return None
+    except ClientError as e:
+        logging.error(f"An S3 client error occurred when listing s3://{bucket_name}/{prefix}: {e}")
+        return None
+
+    logging.info(f"Listed {len(non_empty_keys)} non-empty object(s) under s3://{bucket_name}/{prefix}")
+    with _listings_lock:
+        _listings[cache_key] = non_empty_keys
+    return non_empty_keys
+
+def clear_prefix_listings():
+    """Frees the cached listings, e.g. once a source table has been registered."""
+    with _listings_lock:
+        _listings.clear()
+
+def is_non_empty_object(bucket_name, s3_key):
+    """
+    Checks a single key with a HEAD request.
+    Returns True if the object exists and is non-empty, False if it is missing or empty.
+    Other client errors are raised.
+    """
+    try:
+        response = get_s3_client().head_object(Bucket=bucket_name, Key=s3_key)
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+            logging.warning(f"S3 file check failed for s3://{bucket_name}/{s3_key}. Object is missing.")
+            return False
+        raise
+    if response['ContentLength'] == 0:
+        logging.warning(f"S3 file check failed for s3://{bucket_name}/{s3_key}. Object is empty.")
+        return False
+    return True